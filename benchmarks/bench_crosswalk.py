@@ -0,0 +1,168 @@
+"""
+Compare the speed of the fabfile's precinct to tract crosswalk generation
+against the original implementation, which tested every precinct against
+every tract, and check that both write the same bytes.
+
+The fixture is generated locally: a 36 x 36 grid of tracts with 200-vertex
+boundaries, about as many as Cook County has, and 4,000 precincts scattered
+across them.
+
+    PYTHONPATH=. python benchmarks/bench_crosswalk.py
+"""
+import csv
+import json
+import math
+import multiprocessing
+import os.path
+import shutil
+import tempfile
+import time
+
+from shapely.geometry import shape
+
+import fabfile
+
+GRID = 36
+CELL = 0.01
+MIN_LON, MIN_LAT = -87.94, 41.64
+VERTICES_PER_SIDE = 50
+PRECINCTS = 4000
+
+TRACT_PROPERTIES = (('GEOID', 'geoid'),)
+PRECINCT_PROPERTIES = (
+    ('idpct', 'precinct_number'),
+    ('objectid', 'precinct_objectid'),
+)
+CROSSWALK_TRACT_PROPERTIES = (('geoid', 'tract_geoid'),)
+
+
+def reference_crosswalk(tracts_path, precincts_path, dest,
+        tract_properties, precinct_properties, crosswalk_tract_properties):
+    """The original implementation, with a nested loop over all tracts"""
+    with open(precincts_path) as fh:
+        precincts = json.loads(fh.read())
+
+    with open(tracts_path) as fh:
+        tracts = json.loads(fh.read())
+
+    tract_geos = []
+    for tract in tracts['features']:
+        tract_geo = {}
+        for src_prop, dst_prop in tract_properties:
+            tract_geo[dst_prop] = tract['properties'].get(src_prop, '')
+
+        tract_geo['shape'] = shape(tract['geometry'])
+        tract_geos.append(tract_geo)
+
+    with open(dest, 'w') as fh:
+        fieldnames = [dst_prop for src_prop, dst_prop in precinct_properties]
+        fieldnames += [dst_prop for src_prop, dst_prop in crosswalk_tract_properties]
+        writer = csv.DictWriter(fh, sorted(fieldnames))
+        writer.writeheader()
+
+        for precinct in precincts['features']:
+            centroid = shape(precinct['geometry']).centroid
+
+            cw = {}
+
+            for src_prop, dst_prop in precinct_properties:
+                cw[dst_prop] = precinct['properties'].get(src_prop, None)
+
+            for tract in tract_geos:
+                if tract['shape'].contains(centroid):
+                    for src_prop, dst_prop in crosswalk_tract_properties:
+                        cw[dst_prop] = tract[src_prop]
+
+                    break
+
+            assert cw['tract_geoid']
+
+            writer.writerow(cw)
+
+
+def _tract_ring(col, row):
+    x0 = MIN_LON + col * CELL
+    y0 = MIN_LAT + row * CELL
+    ring = []
+    for side in range(4):
+        for k in range(VERTICES_PER_SIDE):
+            s = k / float(VERTICES_PER_SIDE)
+            ring.append([
+                (x0 + s * CELL, x0 + CELL, x0 + CELL - s * CELL, x0)[side],
+                (y0, y0 + s * CELL, y0 + CELL, y0 + CELL - s * CELL)[side],
+            ])
+    return ring + [ring[0]]
+
+
+def _precinct_ring(i):
+    span = GRID * CELL
+    size = CELL / 4
+    x0 = MIN_LON + (i * 0.618034 % 1) * (span - size)
+    y0 = MIN_LAT + (i * 0.414214 % 1) * (span - size)
+    ring = [[x0 + size / 2 + size / 2 * math.cos(a / 10.0),
+        y0 + size / 2 + size / 2 * math.sin(a / 10.0)] for a in range(63)]
+    return ring + [ring[0]]
+
+
+def write_fixture(directory):
+    tracts = {'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature',
+        'properties': {'GEOID': '17031{:06d}'.format(col * 100 + row)},
+        'geometry': {'type': 'Polygon',
+            'coordinates': [_tract_ring(col, row)]},
+    } for col in range(GRID) for row in range(GRID)]}
+    precincts = {'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature',
+        'properties': {'idpct': str(7000000 + i), 'objectid': i + 1},
+        'geometry': {'type': 'Polygon', 'coordinates': [_precinct_ring(i)]},
+    } for i in range(PRECINCTS)]}
+
+    tracts_path = os.path.join(directory, 'tracts.geojson')
+    precincts_path = os.path.join(directory, 'precincts.geojson')
+    with open(tracts_path, 'w') as f:
+        json.dump(tracts, f)
+    with open(precincts_path, 'w') as f:
+        json.dump(precincts, f)
+    return tracts_path, precincts_path
+
+
+def _time(label, func, *args, **kwargs):
+    start = time.time()
+    func(*args, **kwargs)
+    elapsed = time.time() - start
+    print("{}: {:.2f}s".format(label, elapsed))
+    return elapsed
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        tracts_path, precincts_path = write_fixture(directory)
+        args = (TRACT_PROPERTIES, PRECINCT_PROPERTIES,
+            CROSSWALK_TRACT_PROPERTIES)
+        outputs = {}
+
+        dest = outputs['reference'] = os.path.join(directory, 'reference.csv')
+        reference = _time("Nested loop", reference_crosswalk, tracts_path,
+            precincts_path, dest, *args)
+
+        for processes in sorted(set([1, multiprocessing.cpu_count()])):
+            dest = outputs[processes] = os.path.join(directory,
+                'indexed_{}.csv'.format(processes))
+            elapsed = _time("Indexed, {} process(es)".format(processes),
+                fabfile._generate_precinct_tract_crosswalk, tracts_path,
+                precincts_path, dest, *args, processes=processes)
+            print("  {:.1f}x faster".format(reference / elapsed))
+
+        with open(outputs['reference'], 'rb') as f:
+            expected = f.read()
+        for key, path in outputs.items():
+            with open(path, 'rb') as f:
+                assert f.read() == expected, "{} output differs".format(key)
+        print("All outputs are byte-identical")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Report how much private memory forked workers gain by reading every row of
+the package's collections, which are loaded before forking.
+
+    PYTHONPATH=. python benchmarks/bench_fork_memory.py
+    CHICAGO_SHARED_TABLES=1 PYTHONPATH=. python benchmarks/bench_fork_memory.py
+
+Linux only, since it reads /proc/self/smaps_rollup.
+"""
+import gc
+import os
+import sys
+
+import chicago
+from chicago.snapshot import shared_tables_enabled
+
+WORKERS = 4
+
+COLLECTIONS = ['COMMUNITY_AREAS', 'NEIGHBORHOODS', 'PRECINCTS', 'TRACTS',
+    'COUNTIES', 'COOK_SUBURBAN_PRECINCTS']
+
+
+def private_dirty_kb():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1])
+
+
+def work():
+    for name in COLLECTIONS:
+        collection = chicago.DATASETS[name]
+        fields = collection.get_model().fields
+        for item in collection:
+            for field in fields:
+                getattr(item, field)
+
+
+def main():
+    chicago.preload()
+    gc.collect()
+
+    children = []
+    for i in range(WORKERS):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            before = private_dirty_kb()
+            work()
+            os.write(write_fd, str(private_dirty_kb() - before).encode())
+            os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    growth = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, 'rb') as f:
+            growth.append(int(f.read()))
+        os.waitpid(pid, 0)
+
+    print("Shared tables: {}".format(shared_tables_enabled()))
+    print("Parent private memory: {} KB".format(private_dirty_kb()))
+    for i, kb in enumerate(growth):
+        print("Worker {} copied {} KB".format(i, kb))
+    print("Total across {} workers: {} KB".format(WORKERS, sum(growth)))
+
+
+if __name__ == '__main__':
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit("This benchmark needs /proc/self/smaps_rollup")
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure point-in-polygon geocoding throughput.
+
+The packaged boundaries are built from downloads, so this uses a synthetic
+layer about the size of Chicago's census tracts: a 28 x 28 grid of cells
+with jagged, 200-vertex boundaries.
+
+    PYTHONPATH=. python benchmarks/bench_geocoder.py
+"""
+import json
+import math
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from chicago.geometry import decode_layer, encode_features
+
+GRID = 28
+VERTICES_PER_SIDE = 50
+MIN_LON, MIN_LAT = -87.94, 41.64
+CELL = 0.01
+
+
+def _jag(i, j, k):
+    # Shared between neighboring cells, so the grid has no gaps or overlaps
+    return 0.0003 * math.sin(i * 12.9898 + j * 78.233 + k * 0.7)
+
+
+def _cell(col, row):
+    x0 = MIN_LON + col * CELL
+    y0 = MIN_LAT + row * CELL
+    steps = [k / float(VERTICES_PER_SIDE) for k in range(VERTICES_PER_SIDE)]
+    bottom = [(x0 + s * CELL, y0 + _jag(col, row, k))
+        for k, s in enumerate(steps)]
+    right = [(x0 + CELL + _jag(col + 1, row + 1000, k), y0 + s * CELL)
+        for k, s in enumerate(steps)]
+    top = [(x0 + CELL - s * CELL,
+            y0 + CELL + _jag(col, row + 1, VERTICES_PER_SIDE - k))
+        for k, s in enumerate(steps)]
+    left = [(x0 + _jag(col, row + 1000, VERTICES_PER_SIDE - k),
+            y0 + CELL - s * CELL) for k, s in enumerate(steps)]
+    ring = [list(vertex) for vertex in bottom + right + top + left]
+    return ring + [ring[0]]
+
+
+def build_layer():
+    features = [{
+            'properties': {'id': '{}-{}'.format(col, row)},
+            'geometry': {'type': 'Polygon', 'coordinates': [_cell(col, row)]},
+        } for col in range(GRID) for row in range(GRID)]
+    encoded = encode_features(features, 'id')
+    return features, encoded
+
+
+def main():
+    features, encoded = build_layer()
+    start = time.time()
+    layer = decode_layer(encoded)
+    print("{} features, {} encoded bytes, decoded in {:.3f}s".format(
+        len(layer), len(encoded), time.time() - start))
+
+    print("GeoJSON: {} bytes".format(len(json.dumps(features))))
+
+    span = GRID * CELL
+    point_count = 20000
+    lats = [MIN_LAT + (i * 0.618034 % 1) * span for i in range(point_count)]
+    lons = [MIN_LON + (i * 0.414214 % 1) * span for i in range(point_count)]
+    start = time.time()
+    for lat, lon in zip(lats, lons):
+        layer.locate(lat, lon)
+    elapsed = time.time() - start
+    print("locate(): {:.0f} points/s ({:.1f}M points/minute)".format(
+        point_count / elapsed, point_count / elapsed * 60 / 1e6))
+
+    if numpy is None:
+        print("NumPy is not installed, skipping locate_many()")
+        return
+
+    point_count = 1000000
+    rng = numpy.random.RandomState(0)
+    lats = MIN_LAT + rng.uniform(0, span, point_count)
+    lons = MIN_LON + rng.uniform(0, span, point_count)
+    start = time.time()
+    layer.locate_many(lats, lons)
+    elapsed = time.time() - start
+    print("locate_many(): {:.0f} points/s ({:.1f}M points/minute)".format(
+        point_count / elapsed, point_count / elapsed * 60 / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Report how much memory each dataset uses per record once it's loaded.
+
+    PYTHONPATH=. python benchmarks/bench_memory.py
+"""
+import gc
+import tracemalloc
+
+from chicago.community_areas import load_community_areas
+from chicago.neighborhoods import load_neighborhoods
+from chicago.crosswalk import load_chicago_crosswalk
+from chicago.illinois.counties import load_counties
+from chicago.cook_suburbs.precincts import (load_cook_suburban_precincts,
+    load_cook_suburban_crosswalk)
+
+LOADERS = [
+    ('COMMUNITY_AREAS', load_community_areas),
+    ('NEIGHBORHOODS', load_neighborhoods),
+    ('CHICAGO_CROSSWALK', load_chicago_crosswalk),
+    ('COUNTIES', load_counties),
+    ('COOK_SUBURBAN_PRECINCTS', load_cook_suburban_precincts),
+    ('COOK_SUBURBAN_CROSSWALK', load_cook_suburban_crosswalk),
+]
+
+
+def measure(load):
+    """Return the dataset built by ``load`` and the bytes it holds on to"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        dataset = load()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return dataset, after - before
+
+
+def main():
+    print("{:<26} {:>8} {:>12} {:>14}".format(
+        'dataset', 'records', 'bytes', 'bytes/record'))
+    for name, load in LOADERS:
+        # Measure loading from CSV rather than from a snapshot
+        dataset, size = measure(load.__wrapped__)
+        if hasattr(dataset, 'links'):
+            records = len(dataset.links)
+        else:
+            records = len(dataset)
+        print("{:<26} {:>8} {:>12} {:>14.1f}".format(name, records,
+            size, float(size) / records))
+
+
+if __name__ == '__main__':
+    main()
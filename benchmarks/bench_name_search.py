@@ -0,0 +1,79 @@
+"""
+Time name searches over a stream of queries like the ones a search box
+sends: names typed a few letters at a time, with typos, in any case.
+
+    PYTHONPATH=. python benchmarks/bench_name_search.py [queries]
+"""
+import random
+import sys
+import time
+
+import chicago
+from chicago.search import SEARCHABLE_DATASETS
+
+
+def typo(name, rng):
+    """Drop, repeat, swap or replace one letter of ``name``"""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return name[:i] + name[i + 1:]
+    if kind == 1:
+        return name[:i] + name[i] + name[i:]
+    if kind == 2:
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + name[i + 1:]
+
+
+def query_stream(names, count, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        name = rng.choice(names)
+        if rng.random() < 0.5:
+            name = name.lower()
+        # Typed letter by letter, some with a typo
+        if rng.random() < 0.3:
+            name = typo(name, rng)
+        for length in range(2, len(name) + 1, rng.randrange(1, 4)):
+            queries.append(name[:length])
+    return queries[:count]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(count=20000):
+    names = []
+    for dataset in SEARCHABLE_DATASETS:
+        collection = chicago.DATASETS[dataset]
+        names.extend(getattr(item, collection.name_field)
+            for item in collection)
+
+    start = time.time()
+    chicago.search('warm up')
+    print("Built indexes over {} names in {:.1f} ms".format(len(names),
+        (time.time() - start) * 1000))
+
+    queries = query_stream(names, count)
+    timings = []
+    clock = time.perf_counter
+    for query in queries:
+        start = clock()
+        chicago.search(query)
+        timings.append(clock() - start)
+
+    timings.sort()
+    print("{} queries, {:.0f} per second".format(len(queries),
+        len(queries) / sum(timings)))
+    for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        print("{}: {:.1f} us".format(label,
+            percentile(timings, fraction) * 1e6))
+    print("max: {:.1f} us".format(timings[-1] * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,149 @@
+"""
+Load test the lookup service with concurrent keep-alive connections, and
+report latency percentiles and requests per second.
+
+    PYTHONPATH=. python benchmarks/bench_server.py --requests 20000
+    PYTHONPATH=. python benchmarks/bench_server.py --port 8000
+
+Without ``--port``, a server is started with ``--workers`` workers on a free
+port and stopped afterwards.  Requests are a mix of item lookups,
+crosswalks, misses and batches of paths.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import chicago
+
+
+def get_paths():
+    paths = []
+    for precinct in chicago.PRECINCTS:
+        paths.append('/precincts/{}'.format(precinct.full_name))
+        paths.append('/precincts/{}/tract'.format(precinct.full_name))
+    for tract in chicago.TRACTS:
+        paths.append('/tracts/{}'.format(tract.geoid))
+        paths.append('/tracts/{}/precincts'.format(tract.geoid))
+    for precinct in chicago.COOK_SUBURBAN_PRECINCTS:
+        paths.append('/cook_suburban_precincts/{}/tract'.format(
+            precinct.precinctid))
+    for community_area in chicago.COMMUNITY_AREAS:
+        paths.append('/community_areas/{}'.format(community_area.number))
+    for county in chicago.COUNTIES:
+        paths.append('/counties/{}'.format(county.countyfp))
+    return paths
+
+
+def make_requests(paths, count, batch_size, seed=0):
+    """
+    Return a list of raw requests: mostly single lookups, with some misses
+    and some batches
+    """
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            body = json.dumps(rng.sample(paths, batch_size)).encode('utf-8')
+            requests.append(('POST /batch HTTP/1.1\r\nHost: bench\r\n'
+                'Content-Length: {}\r\n\r\n'.format(len(body))).encode(
+                    'latin-1') + body)
+            continue
+        if kind < 0.1:
+            path = '/precincts/{}'.format(rng.randrange(60000, 99999))
+        else:
+            path = rng.choice(paths)
+        requests.append('GET {} HTTP/1.1\r\nHost: bench\r\n\r\n'.format(
+            path).encode('latin-1'))
+    return requests
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = int(re.search(br'Content-Length: (\d+)', head).group(1))
+    await reader.readexactly(length)
+    return int(head.split(None, 2)[1])
+
+
+async def client(host, port, requests, timings, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    clock = time.perf_counter
+    for request in requests:
+        start = clock()
+        writer.write(request)
+        status = await read_response(reader)
+        timings.append(clock() - start)
+        if status >= 500:
+            errors.append(status)
+    writer.close()
+
+
+async def run(host, port, requests, concurrency):
+    timings = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, requests[i::concurrency],
+        timings, errors) for i in range(concurrency)])
+    return timings, errors, time.perf_counter() - start
+
+
+def start_server(workers):
+    process = subprocess.Popen([sys.executable, '-m', 'chicago', 'serve',
+        '--port', '0', '--workers', str(workers)], stderr=subprocess.PIPE,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+    line = process.stderr.readline().decode('utf-8')
+    match = re.search(r'http://([^:]+):(\d+)/', line)
+    if match is None:
+        process.terminate()
+        sys.exit("Couldn't start the server: {}".format(line))
+    return process, match.group(1), int(match.group(2))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--workers', type=int,
+        default=multiprocessing.cpu_count())
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    requests = make_requests(get_paths(), args.requests, args.batch_size)
+    process = None
+    host, port = args.host, args.port
+    if port is None:
+        process, host, port = start_server(args.workers)
+    try:
+        timings, errors, seconds = asyncio.run(run(host, port, requests,
+            args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    timings.sort()
+    print("{} requests over {} connections in {:.2f}s: {:.0f} requests "
+        "per second".format(len(timings), args.concurrency, seconds,
+            len(timings) / seconds))
+    for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        print("{}: {:.2f} ms".format(label,
+            percentile(timings, fraction) * 1000))
+    if errors:
+        print("{} server errors".format(len(errors)))
+
+
+if __name__ == '__main__':
+    main()
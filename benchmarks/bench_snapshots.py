@@ -0,0 +1,55 @@
+"""
+Compare loading each dataset from its CSV file with loading it from a
+snapshot.
+
+    PYTHONPATH=. python benchmarks/bench_snapshots.py
+"""
+import os
+import shutil
+import tempfile
+import timeit
+
+# Keep the benchmark's snapshots out of the real cache directory
+SNAPSHOT_DIR = tempfile.mkdtemp(prefix='chicago-snapshots-')
+os.environ['CHICAGO_SNAPSHOT_DIR'] = SNAPSHOT_DIR
+
+from chicago.community_areas import load_community_areas
+from chicago.neighborhoods import load_neighborhoods
+from chicago.crosswalk import load_chicago_crosswalk
+from chicago.illinois.counties import load_counties
+from chicago.cook_suburbs.precincts import (load_cook_suburban_precincts,
+    load_cook_suburban_crosswalk)
+
+LOADERS = [
+    ('CommAreas.csv', load_community_areas),
+    ('Neighborhoods_2012b.csv', load_neighborhoods),
+    ('chicago_precinct_census_tract_crosswalk.csv', load_chicago_crosswalk),
+    ('county_fips.csv', load_counties),
+    ('cook_suburban_precincts_as_of_2016.csv', load_cook_suburban_precincts),
+    ('suburban_cook_precinct_census_tract_crosswalk.csv',
+        load_cook_suburban_crosswalk),
+]
+
+
+def best_of(func, repeat=5, number=10):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def main():
+    print("{:<58} {:>10} {:>10} {:>8}".format(
+        'file', 'csv (ms)', 'snap (ms)', 'speedup'))
+    try:
+        for label, load in LOADERS:
+            # Write the snapshot before timing snapshot loads
+            load()
+            csv_time = best_of(load.__wrapped__)
+            snapshot_time = best_of(load)
+            print("{:<58} {:>10.2f} {:>10.2f} {:>7.1f}x".format(label,
+                csv_time * 1000, snapshot_time * 1000,
+                csv_time / snapshot_time))
+    finally:
+        shutil.rmtree(SNAPSHOT_DIR)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,61 @@
+from multiprocessing.pool import ThreadPool
+
 from .community_areas import COMMUNITY_AREAS
 from .neighborhoods import NEIGHBORHOODS
 from .precincts import PRECINCTS, get_precincts_from_tract_geoid
-from .tracts import TRACTS, get_tract_from_ward_and_precinct, get_tract_from_precinct_id
-from illinois.counties import COUNTIES
-from cook_suburbs.precincts import COOK_SUBURBAN_PRECINCTS, COOK_SUBURBAN_CROSSWALK, get_suburban_cook_precincts_from_tract_geoid, get_suburban_cook_tract_from_precinct_number
\ No newline at end of file
+from .crosswalk import CHICAGO_CROSSWALK
+from .tracts import TRACTS, get_tract_from_ward_and_precinct, get_tract_from_precinct_id, get_tracts_from_precinct_ids, get_tracts_from_wards_and_precincts
+from .illinois.counties import COUNTIES
+from .cook_suburbs.precincts import COOK_SUBURBAN_PRECINCTS, COOK_SUBURBAN_CROSSWALK, get_suburban_cook_precincts_from_tract_geoid, get_suburban_cook_tract_from_precinct_number, get_suburban_cook_tracts_from_precinct_numbers
+from .base import load_together
+from .hierarchy import HIERARCHY, ancestors, descendants, get_rollup
+from .registry import dataset, register, register_vintage, vintages
+from .search import search
+from .watch import watch
+
+# Datasets are loaded the first time they're used.  Use ``preload()`` to
+# load them ahead of time.
+DATASETS = {
+    'COMMUNITY_AREAS': COMMUNITY_AREAS,
+    'NEIGHBORHOODS': NEIGHBORHOODS,
+    'PRECINCTS': PRECINCTS,
+    'TRACTS': TRACTS,
+    'CHICAGO_CROSSWALK': CHICAGO_CROSSWALK,
+    'COUNTIES': COUNTIES,
+    'COOK_SUBURBAN_PRECINCTS': COOK_SUBURBAN_PRECINCTS,
+    'COOK_SUBURBAN_CROSSWALK': COOK_SUBURBAN_CROSSWALK,
+    'HIERARCHY': HIERARCHY,
+}
+
+
+def preload(names=None, threads=None):
+    """
+    Load datasets concurrently on a thread pool.
+
+    ``names`` is an iterable of dataset names, like ``['COUNTIES', 'TRACTS']``.
+    If it's omitted, all datasets are loaded.
+    """
+    if names is None:
+        names = sorted(DATASETS.keys())
+    elif isinstance(names, str):
+        names = [names]
+
+    try:
+        datasets = [DATASETS[name.upper()] for name in names]
+    except KeyError as e:
+        raise ValueError("Unknown dataset {}".format(e.args[0]))
+
+    if threads is None:
+        threads = len(datasets)
+
+    if threads <= 1 or len(datasets) <= 1:
+        for dataset in datasets:
+            dataset.load()
+        return
+
+    pool = ThreadPool(min(threads, len(datasets)))
+    try:
+        pool.map(lambda dataset: dataset.load(), datasets)
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,104 @@
+"""
+Command line interface.
+
+    python -m chicago annotate results.csv -o annotated.csv --workers 4
+    python -m chicago serve --port 8000 --workers 4
+"""
+import argparse
+import io
+import multiprocessing
+import sys
+
+from .annotate import FORMATS, annotate, guess_format
+
+
+def _open(filename, mode):
+    if filename == '-':
+        stream = sys.stdin if 'r' in mode else sys.stdout
+        return io.open(stream.fileno(), mode, newline='', closefd=False)
+    return io.open(filename, mode, newline='')
+
+
+def annotate_command(args):
+    input_format = args.format or guess_format(args.input)
+    output_format = args.output_format
+    if output_format is None:
+        output_format = (guess_format(args.output) if args.output != '-'
+            else input_format)
+
+    with _open(args.input, 'r') as infile:
+        with _open(args.output, 'w') as outfile:
+            stats = annotate(infile, outfile, input_format=input_format,
+                output_format=output_format, workers=args.workers,
+                chunk_size=args.chunk_size, ward_field=args.ward_column,
+                precinct_field=args.precinct_column,
+                precinct_id_field=args.precinct_id_column)
+
+    if not args.quiet:
+        sys.stderr.write(str(stats) + '\n')
+
+
+def serve_command(args):
+    from .server import serve
+    serve(args.host, args.port, workers=args.workers,
+        cache_size=args.cache_size,
+        watch_interval=args.watch_interval if args.watch else None)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m chicago')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    annotate_parser = subparsers.add_parser('annotate',
+        help="Add census tract, community area and county columns to rows "
+             "with Chicago wards and precincts")
+    annotate_parser.add_argument('input',
+        help="CSV or JSON lines file to annotate, or - for standard input")
+    annotate_parser.add_argument('-o', '--output', default='-',
+        help="File to write annotated rows to (default: standard output)")
+    annotate_parser.add_argument('--format', choices=FORMATS,
+        help="Input format (default: guessed from the file extension)")
+    annotate_parser.add_argument('--output-format', choices=FORMATS,
+        help="Output format (default: the input format)")
+    annotate_parser.add_argument('--ward-column', default='ward')
+    annotate_parser.add_argument('--precinct-column', default='precinct')
+    annotate_parser.add_argument('--precinct-id-column',
+        help="Column of full precinct IDs, like 39012, to use instead of "
+             "ward and precinct columns")
+    annotate_parser.add_argument('-w', '--workers', type=int,
+        default=multiprocessing.cpu_count(),
+        help="Number of worker processes (default: one per core)")
+    annotate_parser.add_argument('--chunk-size', type=int, default=10000,
+        help="Rows per chunk handed to a worker (default: 10000)")
+    annotate_parser.add_argument('-q', '--quiet', action='store_true',
+        help="Don't report throughput on standard error")
+    annotate_parser.set_defaults(func=annotate_command)
+
+    serve_parser = subparsers.add_parser('serve',
+        help="Serve lookups over HTTP")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('-p', '--port', type=int, default=8000,
+        help="Port to listen on, or 0 for any free port (default: 8000)")
+    serve_parser.add_argument('-w', '--workers', type=int,
+        default=multiprocessing.cpu_count(),
+        help="Number of worker processes (default: one per core)")
+    serve_parser.add_argument('--cache-size', type=int, default=10000,
+        help="Responses to cache beyond the preserialized ones "
+             "(default: 10000)")
+    serve_parser.add_argument('--watch', action='store_true',
+        help="Reload datasets when their data files change")
+    serve_parser.add_argument('--watch-interval', type=float, default=1.0,
+        help="Seconds between checks for changed files (default: 1)")
+    serve_parser.set_defaults(func=serve_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Annotate streams of Chicago precinct-level rows, like election results,
+with the census tract, community area and county of each precinct.
+
+Input is read as CSV or JSON lines in chunks, and annotated rows are written
+as soon as their chunk is done, so files of any size can be processed in
+bounded memory.  Chunks can be annotated in parallel by a pool of worker
+processes.  The lookup tables are loaded before the pool is started so
+forked workers share them, and output keeps the order of the input.
+
+This is also available from the command line::
+
+    python -m chicago annotate results.csv -o annotated.csv --workers 4
+"""
+import collections
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import time
+
+from . import preload
+from .community_areas import COMMUNITY_AREAS
+from .illinois.counties import COUNTIES
+from .tracts import get_tract_from_precinct_id, get_tract_from_ward_and_precinct
+
+FORMATS = ('csv', 'jsonl')
+
+ANNOTATION_FIELDS = [
+    'tract_geoid',
+    'community_area_number',
+    'community_area_name',
+    'county_fips',
+    'county_name',
+]
+
+# Datasets the annotations are looked up in
+DATASETS = ['CHICAGO_CROSSWALK', 'COMMUNITY_AREAS', 'COUNTIES']
+
+
+class AnnotationStats(object):
+    """Counts and timing for a run of ``annotate()``"""
+
+    def __init__(self, rows, matched, seconds, workers):
+        self.rows = rows
+        self.matched = matched
+        self.seconds = seconds
+        self.workers = workers
+
+    @property
+    def rows_per_second(self):
+        if not self.seconds:
+            return 0.0
+        return self.rows / self.seconds
+
+    @property
+    def rows_per_second_per_core(self):
+        return self.rows_per_second / self.workers
+
+    def __str__(self):
+        return ("Annotated {s.rows} rows ({s.matched} matched) in "
+            "{s.seconds:.2f}s with {s.workers} worker(s): "
+            "{rps:.0f} rows/s, {rpsc:.0f} rows/s per core").format(s=self,
+                rps=self.rows_per_second, rpsc=self.rows_per_second_per_core)
+
+
+def guess_format(filename):
+    if filename.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+def _check_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError("Unknown format '{}', expected one of {}".format(fmt,
+            ', '.join(FORMATS)))
+
+
+def chunked(iterable, size):
+    """Iterate over lists of up to ``size`` items from ``iterable``"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_annotations(tract):
+    """Return a dict of the annotations for a precinct in ``tract``"""
+    if tract is None:
+        return dict((field, None) for field in ANNOTATION_FIELDS)
+
+    community_area = COMMUNITY_AREAS.get_by('number', tract.commarea_num, None)
+    county = COUNTIES.get_by_fips(tract.countyfp)
+    return {
+        'tract_geoid': tract.geoid,
+        'community_area_number': tract.commarea_num,
+        'community_area_name': community_area and community_area.name,
+        'county_fips': tract.countyfp,
+        'county_name': county and county.countyname,
+    }
+
+
+def annotate_rows(rows, ward_field='ward', precinct_field='precinct',
+        precinct_id_field=None):
+    """
+    Return a list of copies of ``rows`` with the annotations added.
+
+    Precincts are identified by the ``ward_field`` and ``precinct_field``
+    columns, or by a single ``precinct_id_field`` column of full precinct
+    names like ``39012``.
+    """
+    # Results files repeat the same precincts many times over
+    annotations = {}
+    annotated = []
+    for row in rows:
+        if precinct_id_field is not None:
+            key = row.get(precinct_id_field)
+        else:
+            key = (row.get(ward_field), row.get(precinct_field))
+
+        try:
+            row_annotations = annotations[key]
+        except KeyError:
+            if precinct_id_field is not None:
+                tract = get_tract_from_precinct_id(key)
+            else:
+                tract = get_tract_from_ward_and_precinct(*key)
+            row_annotations = annotations[key] = get_annotations(tract)
+
+        annotated_row = dict(row)
+        annotated_row.update(row_annotations)
+        annotated.append(annotated_row)
+
+    return annotated
+
+
+def _load_datasets():
+    preload(DATASETS)
+
+
+def read_records(infile, fmt='csv'):
+    """
+    Iterate over the unparsed records of a CSV or JSON lines file, each as a
+    string ending in a newline.
+
+    A CSV record continues onto the next line while it has an unclosed
+    quoted field.
+    """
+    _check_format(fmt)
+    if fmt == 'jsonl':
+        for line in infile:
+            if line.strip():
+                yield line if line.endswith('\n') else line + '\n'
+        return
+
+    record = ''
+    for line in infile:
+        record += line
+        if record.count('"') % 2 == 0:
+            if not record.endswith('\n'):
+                record += '\n'
+            yield record
+            record = ''
+    if record:
+        yield record + '\n'
+
+
+class _ChunkAnnotator(object):
+    """
+    Parses, annotates and serializes chunks of raw records.
+
+    Workers do all of the per-row work and hand back text, so the parent
+    process only splits the input into records and writes output.
+    """
+
+    def __init__(self, input_format, output_format, input_fields,
+            output_fields, **kwargs):
+        self.input_format = input_format
+        self.output_format = output_format
+        self.input_fields = input_fields
+        self.output_fields = output_fields
+        self.kwargs = kwargs
+
+    def _parse(self, records):
+        if self.input_format == 'csv':
+            return csv.DictReader(records, fieldnames=self.input_fields)
+        return (json.loads(record) for record in records)
+
+    def _serialize(self, rows):
+        if self.output_format == 'jsonl':
+            return ''.join(json.dumps(row, sort_keys=True) + '\n'
+                for row in rows)
+
+        out = io.StringIO()
+        writer = csv.DictWriter(out, self.output_fields,
+            extrasaction='ignore', lineterminator='\n')
+        writer.writerows(rows)
+        return out.getvalue()
+
+    def __call__(self, records):
+        rows = annotate_rows(self._parse(records), **self.kwargs)
+        matched = sum(1 for row in rows if row['tract_geoid'] is not None)
+        return self._serialize(rows), len(rows), matched
+
+
+def _map_ordered(func, chunks, workers):
+    """
+    Iterate over ``func(chunk)`` for each of ``chunks``, in order, using a
+    pool of ``workers`` processes.
+
+    At most two chunks per worker are in flight at once, so memory use
+    doesn't grow with the size of the input.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    pool = multiprocessing.Pool(workers, initializer=_load_datasets)
+    try:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, (chunk,)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _output_fields(input_fields):
+    return list(input_fields) + [field for field in ANNOTATION_FIELDS
+        if field not in input_fields]
+
+
+def annotate(infile, outfile, input_format='csv', output_format=None,
+        workers=1, chunk_size=10000, ward_field='ward',
+        precinct_field='precinct', precinct_id_field=None):
+    """
+    Read rows from ``infile``, annotate them and write them to ``outfile``.
+
+    Input is split into chunks of ``chunk_size`` records, which are annotated
+    by ``workers`` processes and written in input order.  Returns an
+    ``AnnotationStats``.
+    """
+    _check_format(input_format)
+    if output_format is None:
+        output_format = input_format
+    _check_format(output_format)
+
+    start = time.time()
+    records = read_records(infile, input_format)
+    input_fields = None
+    if input_format == 'csv':
+        header = next(records, '')
+        input_fields = next(csv.reader([header]), [])
+    elif output_format == 'csv':
+        # Without a CSV header to go on, use the first row's fields
+        first = next(records, None)
+        if first is not None:
+            records = itertools.chain([first], records)
+            input_fields = sorted(json.loads(first).keys())
+
+    output_fields = None
+    if output_format == 'csv':
+        output_fields = _output_fields(input_fields or [])
+        csv.DictWriter(outfile, output_fields,
+            lineterminator='\n').writeheader()
+
+    # Load the lookup tables once, before any workers are forked
+    _load_datasets()
+    annotator = _ChunkAnnotator(input_format, output_format, input_fields,
+        output_fields, ward_field=ward_field, precinct_field=precinct_field,
+        precinct_id_field=precinct_id_field)
+
+    row_count = 0
+    matched = 0
+    for text, chunk_rows, chunk_matched in _map_ordered(annotator,
+            chunked(records, chunk_size), workers):
+        outfile.write(text)
+        row_count += chunk_rows
+        matched += chunk_matched
+
+    return AnnotationStats(row_count, matched, time.time() - start,
+        max(workers, 1))
@@ -0,0 +1,338 @@
+"""
+Apportion precinct-level values, like vote counts, to census tracts,
+community areas and counties.
+
+A precinct's value is split between the tracts it overlaps in proportion to
+the share of the precinct's area in each tract.  The weights are computed
+from precinct and tract boundaries when the data is built, and stored in
+``data/*_weights.csv``.  The weights files aren't shipped yet, because
+building them downloads the boundaries.  Until they're built with
+``fab build_precinct_to_tract_crosswalks``, each precinct is assigned to the
+tract that contains its centroid, from the crosswalks.
+
+Weights are held as a sparse matrix with a row for each area and a column
+for each precinct, so aggregating is one sparse matrix-vector product.  That
+uses scipy.sparse if it's installed, and pure Python otherwise.
+
+    >>> from chicago.apportion import aggregate
+    >>> votes_by_tract = aggregate({'39012': 120, '39013': 98}, to='tracts')
+"""
+import functools
+import itertools
+import os.path
+from array import array
+from csv import DictReader
+
+from .base import LazyDataset, DATA_DIRECTORY
+from .batch import is_array
+from .cook_suburbs.precincts import (COOK_SUBURBAN_CROSSWALK,
+    COOK_SUBURBAN_PRECINCTS)
+from .crosswalk import CHICAGO_CROSSWALK
+from .tracts import TRACTS
+
+try:
+    import numpy
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+CHICAGO_WEIGHTS_CSV_FILENAME = os.path.join(DATA_DIRECTORY,
+    'chicago_precinct_census_tract_weights.csv')
+COOK_SUBURBAN_WEIGHTS_CSV_FILENAME = os.path.join(DATA_DIRECTORY,
+    'suburban_cook_precinct_census_tract_weights.csv')
+
+GEOGRAPHIES = ('chicago', 'cook_suburbs')
+LEVELS = ('tracts', 'community_areas', 'counties')
+
+
+def _sort_key(value):
+    try:
+        return (0, int(value), value)
+    except (TypeError, ValueError):
+        return (1, 0, value)
+
+
+class Apportionment(object):
+    """
+    Sparse weights for splitting the values of ``sources``, like precincts,
+    between ``targets``, like tracts.
+
+    Entries are ``(target position, source position, weight)`` triples.
+    Repeated entries for the same target and source are added together.
+    ``source_key`` normalizes source IDs before they're compared, like the
+    ``key()`` of the index on the sources' collection.
+    """
+
+    # Path of the area weights file the apportionment was read from, or
+    # ``None`` if it assigns each precinct to the tract with its centroid
+    weights_filename = None
+
+    def __init__(self, sources, targets, entries, source_key=str):
+        self.sources = list(sources)
+        self.targets = list(targets)
+        self.source_key = source_key
+        self._source_positions = dict((source_key(source), i)
+            for i, source in enumerate(self.sources))
+        self._rows = array('l')
+        self._columns = array('l')
+        self._weights = array('d')
+        for row, column, weight in entries:
+            self._rows.append(row)
+            self._columns.append(column)
+            self._weights.append(weight)
+        self._matrix = None
+
+    @classmethod
+    def from_links(cls, links, sources=(), source_key=str):
+        """
+        Create an apportionment from ``(source, target, weight)`` links.
+
+        Sources are ordered like ``sources``, followed by any others in the
+        order they're linked.  Targets are sorted.
+        """
+        links = [(str(source), str(target), float(weight))
+            for source, target, weight in links]
+        source_list = []
+        source_positions = {}
+        for source in itertools.chain((str(source) for source in sources),
+                (source for source, target, weight in links)):
+            key = source_key(source)
+            if key not in source_positions:
+                source_positions[key] = len(source_list)
+                source_list.append(source)
+
+        targets = sorted(set(target for source, target, weight in links),
+            key=_sort_key)
+        target_positions = dict((target, i) for i, target in enumerate(targets))
+        return cls(source_list, targets, ((target_positions[target],
+                source_positions[source_key(source)], weight)
+            for source, target, weight in links), source_key)
+
+    @classmethod
+    def from_csv(cls, csvfile, sources=(), source_key=str):
+        """
+        Create an apportionment from a CSV with ``precinct_id``,
+        ``tract_geoid`` and ``weight`` columns.
+        """
+        if not hasattr(csvfile, 'read'):
+            with open(csvfile, 'r') as f:
+                return cls.from_csv(f, sources, source_key)
+
+        return cls.from_links(((row['precinct_id'], row['tract_geoid'],
+            row['weight']) for row in DictReader(csvfile)), sources,
+            source_key)
+
+    def __repr__(self):
+        return "Apportionment(sources={}, targets={}, weights={})".format(
+            len(self.sources), len(self.targets), len(self._weights))
+
+    def __iter__(self):
+        """Iterate over ``(source, target, weight)`` links"""
+        for row, column, weight in zip(self._rows, self._columns,
+                self._weights):
+            yield self.sources[column], self.targets[row], weight
+
+    def _get_source_position(self, source):
+        try:
+            return self._source_positions.get(self.source_key(source))
+        except (TypeError, ValueError):
+            return None
+
+    def get_weights(self, source):
+        """Return a dict of the share of ``source`` assigned to each target"""
+        position = self._get_source_position(source)
+        weights = {}
+        if position is None:
+            return weights
+        for row, column, weight in zip(self._rows, self._columns,
+                self._weights):
+            if column == position:
+                target = self.targets[row]
+                weights[target] = weights.get(target, 0.0) + weight
+        return weights
+
+    def rollup(self, get_parent):
+        """
+        Return an apportionment from the sources to the parents of the
+        targets, where ``get_parent(target)`` returns a target's parent or
+        ``None`` to leave it out.
+        """
+        parents = [get_parent(target) for target in self.targets]
+        rolled_up = Apportionment.from_links(((self.sources[column],
+                parents[row], weight)
+            for row, column, weight in zip(self._rows, self._columns,
+                self._weights)
+            if parents[row] is not None), self.sources, self.source_key)
+        rolled_up.weights_filename = self.weights_filename
+        return rolled_up
+
+    def _get_matrix(self):
+        if self._matrix is None:
+            self._matrix = scipy.sparse.csr_matrix(
+                (numpy.frombuffer(self._weights, dtype=numpy.float64),
+                    (numpy.frombuffer(self._rows, dtype=numpy.dtype('l')),
+                        numpy.frombuffer(self._columns,
+                            dtype=numpy.dtype('l')))),
+                shape=(len(self.targets), len(self.sources)))
+        return self._matrix
+
+    def _multiply(self, vector):
+        if scipy is not None:
+            return self._get_matrix().dot(
+                numpy.asarray(vector, dtype=numpy.float64))
+
+        totals = [0.0] * len(self.targets)
+        for row, column, weight in zip(self._rows, self._columns,
+                self._weights):
+            totals[row] += weight * vector[column]
+        return totals
+
+    def aggregate(self, values):
+        """
+        Apportion source values to the targets.
+
+        ``values`` is either a dict mapping source IDs to values, or a
+        sequence or NumPy array of values aligned with ``sources``.  A dict
+        returns a dict mapping each target to its total, an array returns an
+        array aligned with ``targets`` and a sequence returns a list.
+        """
+        if hasattr(values, 'items'):
+            vector = [0.0] * len(self.sources)
+            for source, value in values.items():
+                position = self._get_source_position(source)
+                if position is None:
+                    raise KeyError("Unknown source {!r}".format(source))
+                vector[position] = value
+            totals = self._multiply(vector)
+            return dict(zip(self.targets, (float(total) for total in totals)))
+
+        if len(values) != len(self.sources):
+            raise ValueError("Expected {} values, one for each source, "
+                "got {}".format(len(self.sources), len(values)))
+
+        totals = self._multiply(values)
+        if is_array(values):
+            return numpy.asarray(totals, dtype=numpy.float64)
+        return [float(total) for total in totals]
+
+
+def _chicago_centroid_links():
+    crosswalk = CHICAGO_CROSSWALK.load()
+    tract_geoids_by_precinct = {}
+    for full_name, geoid in crosswalk.links:
+        tract_geoids_by_precinct.setdefault(full_name, []).append(geoid)
+    for full_name, geoids in tract_geoids_by_precinct.items():
+        for geoid in geoids:
+            yield full_name, geoid, 1.0 / len(geoids)
+
+
+def _cook_suburban_centroid_links():
+    seen = set()
+    for row in COOK_SUBURBAN_CROSSWALK:
+        # Keep the first row for a precinct, like the crosswalk's lookups
+        if row['precinct_number'] not in seen:
+            seen.add(row['precinct_number'])
+            yield row['precinct_number'], row['tract_geoid'], 1.0
+
+
+def load_apportionment(geography='chicago'):
+    """
+    Return the precinct to tract ``Apportionment`` for ``'chicago'`` or
+    ``'cook_suburbs'``.
+
+    Chicago precincts are identified by full name, like ``'39012'``, and
+    suburban precincts by precinct number.  IDs are compared like the
+    precinct collection's index compares them, so Chicago precincts can
+    also be given as integers, like ``39012`` or ``1001``.
+    """
+    if geography == 'chicago':
+        filename = CHICAGO_WEIGHTS_CSV_FILENAME
+        precincts = CHICAGO_CROSSWALK.precincts
+        field = 'full_name'
+        centroid_links = _chicago_centroid_links
+    elif geography == 'cook_suburbs':
+        filename = COOK_SUBURBAN_WEIGHTS_CSV_FILENAME
+        precincts = COOK_SUBURBAN_PRECINCTS.load()
+        field = 'precinctid'
+        centroid_links = _cook_suburban_centroid_links
+    else:
+        raise ValueError("Unknown geography '{}', expected one of {}".format(
+            geography, ', '.join(GEOGRAPHIES)))
+
+    sources = [getattr(precinct, field) for precinct in precincts]
+    index, table = precincts._get_index(field)
+    source_key = index.key
+    if not os.path.exists(filename):
+        return Apportionment.from_links(centroid_links(), sources, source_key)
+
+    apportionment = Apportionment.from_csv(filename, sources, source_key)
+    apportionment.weights_filename = filename
+    return apportionment
+
+
+def _get_community_area_number(geoid):
+    tract = TRACTS.get_by('geoid', geoid, None)
+    if tract is None or not tract.commarea_num:
+        return None
+    return tract.commarea_num
+
+
+def _get_county_fips(geoid):
+    # Tract GEOIDs start with the two-digit state and three-digit county FIPS
+    return geoid[2:5]
+
+
+def _load_level(geography, level):
+    if level == 'tracts':
+        return load_apportionment(geography)
+
+    tracts = APPORTIONMENTS[(geography, 'tracts')].load()
+    if level == 'community_areas':
+        return tracts.rollup(_get_community_area_number)
+    return tracts.rollup(_get_county_fips)
+
+
+# Loaded the first time they're used, by get_apportionment()
+APPORTIONMENTS = dict(((geography, level),
+        LazyDataset(functools.partial(_load_level, geography, level)))
+    for geography in GEOGRAPHIES for level in LEVELS)
+
+# Rebuilt when the precincts, crosswalks or weights they're built from are
+# reloaded
+APPORTIONMENTS[('chicago', 'tracts')].sources = [CHICAGO_WEIGHTS_CSV_FILENAME]
+APPORTIONMENTS[('cook_suburbs', 'tracts')].sources = [
+    COOK_SUBURBAN_WEIGHTS_CSV_FILENAME]
+CHICAGO_CROSSWALK.add_dependent(APPORTIONMENTS[('chicago', 'tracts')])
+COOK_SUBURBAN_CROSSWALK.add_dependent(
+    APPORTIONMENTS[('cook_suburbs', 'tracts')])
+COOK_SUBURBAN_PRECINCTS.add_dependent(
+    APPORTIONMENTS[('cook_suburbs', 'tracts')])
+for _geography in GEOGRAPHIES:
+    for _level in LEVELS:
+        if _level != 'tracts':
+            APPORTIONMENTS[(_geography, 'tracts')].add_dependent(
+                APPORTIONMENTS[(_geography, _level)])
+            TRACTS.add_dependent(APPORTIONMENTS[(_geography, _level)])
+
+
+def get_apportionment(to='tracts', geography='chicago'):
+    """
+    Return the ``Apportionment`` from a geography's precincts to tracts,
+    community areas or counties.
+    """
+    if to not in LEVELS:
+        raise ValueError("Unknown level '{}', expected one of {}".format(to,
+            ', '.join(LEVELS)))
+    if geography not in GEOGRAPHIES:
+        raise ValueError("Unknown geography '{}', expected one of {}".format(
+            geography, ', '.join(GEOGRAPHIES)))
+    return APPORTIONMENTS[(geography, to)].load()
+
+
+def aggregate(values, to='tracts', geography='chicago'):
+    """
+    Apportion precinct values to tracts, community areas or counties.
+
+    See ``Apportionment.aggregate()`` for the forms ``values`` can take.
+    """
+    return get_apportionment(to, geography).aggregate(values)
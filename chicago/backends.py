@@ -0,0 +1,417 @@
+"""
+Storage backends that a ``Collection`` can read its rows from instead of
+holding every model in memory.
+
+A backend stores each row as the values of the model's fields, in the
+collection's default sort order.  Lookups on indexed fields are pushed down
+to the storage engine, and the collection only creates models for the rows
+that are returned.
+
+Collections are held in memory by default.  Use ``Collection.to_sqlite()``,
+``Collection.to_parquet()`` or ``Collection.to_table()`` to write a
+collection's rows to a file, and ``Collection.from_sqlite()``,
+``Collection.from_parquet()`` or ``Collection.from_table()`` to read them
+back through a backend.  The Parquet backend requires pyarrow.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+
+from .table import Table, write_table
+
+
+def _require_pyarrow():
+    """
+    Import and return pyarrow.  It's only imported when Parquet storage is
+    first used, since importing it takes longer than importing this package.
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet storage requires the pyarrow package")
+    return pyarrow
+
+
+class Backend(object):
+    """
+    Read-only storage for the rows of a collection.
+
+    Rows are dicts of model field values.  ``key_type`` tells a backend how
+    lookup keys compare to stored values: ``'str'`` for exact string
+    matches, ``'lower'`` for case-insensitive ones and ``'int'`` for
+    integer ones.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def iter_rows(self):
+        """Iterate over all rows in order"""
+        raise NotImplementedError
+
+    def get_row(self, position):
+        """Return the row at ``position``, raising ``IndexError`` if there's none"""
+        raise NotImplementedError
+
+    def get_value(self, position, field):
+        """Return the value of ``field`` in the row at ``position``"""
+        return self.get_row(position)[field]
+
+    def find_rows(self, field, key, key_type='str', limit=None):
+        """Return a list of up to ``limit`` rows whose ``field`` matches ``key``"""
+        raise NotImplementedError
+
+    def to_arrow(self, dictionary_fields=()):
+        """
+        Return the rows as a pyarrow Table if the backend can do so without
+        going through models, otherwise ``None``.  ``dictionary_fields``
+        should be dictionary-encoded.
+        """
+        return None
+
+    def iter_items(self, model):
+        """Iterate over all rows in order as instances of ``model``"""
+        for row in self.iter_rows():
+            yield model(**row)
+
+    def get_item(self, model, position):
+        return model(**self.get_row(position))
+
+    def find_items(self, model, field, key, key_type='str', limit=None):
+        return [model(**row)
+            for row in self.find_rows(field, key, key_type, limit)]
+
+    def _check_field(self, field):
+        if field not in self.fields:
+            raise ValueError("Unknown field '{}'".format(field))
+
+    def _normalize_position(self, position):
+        length = len(self)
+        if position < 0:
+            position += length
+        if not 0 <= position < length:
+            raise IndexError("row index out of range")
+        return position
+
+
+def _quote(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _sql_expression(field, key_type):
+    if key_type == 'lower':
+        return 'lower({})'.format(_quote(field))
+    if key_type == 'int':
+        return 'CAST({} AS INTEGER)'.format(_quote(field))
+    return _quote(field)
+
+
+class SQLiteBackend(Backend):
+    """
+    Rows stored in a table of a SQLite database.
+
+    Lookups become indexed ``SELECT`` queries.  The database is opened read
+    only, and the connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path, table, fields):
+        super(SQLiteBackend, self).__init__(fields)
+        if not os.path.exists(path):
+            raise IOError("No such SQLite database: {}".format(path))
+
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            'file:{}?mode=ro'.format(path), uri=True,
+            check_same_thread=False)
+        self._columns = ', '.join(_quote(field) for field in self.fields)
+        self._length = None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _row(self, values):
+        return dict(zip(self.fields, values))
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self._query('SELECT COUNT(*) FROM {}'.format(
+                _quote(self.table)))[0][0]
+        return self._length
+
+    def iter_rows(self):
+        for values in self._query('SELECT {} FROM {} ORDER BY rowid'.format(
+                self._columns, _quote(self.table))):
+            yield self._row(values)
+
+    def get_row(self, position):
+        position = self._normalize_position(position)
+        values = self._query(
+            'SELECT {} FROM {} ORDER BY rowid LIMIT 1 OFFSET ?'.format(
+                self._columns, _quote(self.table)), (position,))
+        return self._row(values[0])
+
+    def find_rows(self, field, key, key_type='str', limit=None):
+        self._check_field(field)
+        sql = 'SELECT {} FROM {} WHERE {} = ? ORDER BY rowid'.format(
+            self._columns, _quote(self.table), _sql_expression(field, key_type))
+        params = (key,)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params += (limit,)
+        return [self._row(values) for values in self._query(sql, params)]
+
+    @staticmethod
+    def write(collection, path, table):
+        """
+        Write a collection's rows to ``table`` in the SQLite database at
+        ``path``, replacing the table if it exists, and index the fields the
+        collection declares indexes on.
+        """
+        fields = collection.get_model().fields
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                connection.execute('DROP TABLE IF EXISTS {}'.format(
+                    _quote(table)))
+                connection.execute('CREATE TABLE {} ({})'.format(
+                    _quote(table), ', '.join('{} TEXT'.format(_quote(field))
+                        for field in fields)))
+                connection.executemany(
+                    'INSERT INTO {} ({}) VALUES ({})'.format(_quote(table),
+                        ', '.join(_quote(field) for field in fields),
+                        ', '.join('?' for field in fields)),
+                    ([getattr(item, field, None) for field in fields]
+                        for item in collection))
+
+                for index in collection.indexes:
+                    connection.execute('CREATE INDEX {} ON {} ({})'.format(
+                        _quote('{}_{}_{}'.format(table, index.field,
+                            index.key_type)),
+                        _quote(table),
+                        _sql_expression(index.field, index.key_type)))
+        finally:
+            connection.close()
+
+
+class ParquetBackend(Backend):
+    """
+    Rows stored in a Parquet file, read with pyarrow.
+
+    Lookups are evaluated by Arrow as filter expressions over the columns,
+    using the file's row group statistics to skip data where it can.
+    """
+
+    def __init__(self, path, fields):
+        self._pyarrow = _require_pyarrow()
+        super(ParquetBackend, self).__init__(fields)
+        self.path = path
+        self._dataset = self._pyarrow.dataset.dataset(path, format='parquet')
+        self._length = None
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self._dataset.count_rows()
+        return self._length
+
+    def iter_rows(self):
+        for batch in self._dataset.to_batches(columns=self.fields):
+            for row in batch.to_pylist():
+                yield row
+
+    def get_row(self, position):
+        position = self._normalize_position(position)
+        return self._dataset.take([position], columns=self.fields).to_pylist()[0]
+
+    def _filter_expression(self, field, key, key_type):
+        pyarrow = self._pyarrow
+        column = pyarrow.dataset.field(field)
+        if pyarrow.types.is_dictionary(self._dataset.schema.field(field).type):
+            # Dictionary-encoded columns, like the ones written from a
+            # collection's interned fields, are compared as plain strings
+            column = column.cast(pyarrow.string())
+        if key_type == 'lower':
+            column = pyarrow.compute.utf8_lower(column)
+        elif key_type == 'int':
+            column = column.cast(pyarrow.int64())
+        return column == key
+
+    def find_rows(self, field, key, key_type='str', limit=None):
+        self._check_field(field)
+        table = self._dataset.to_table(columns=self.fields,
+            filter=self._filter_expression(field, key, key_type))
+        if limit is not None:
+            table = table.slice(0, limit)
+        return table.to_pylist()
+
+    def to_arrow(self, dictionary_fields=()):
+        # Written from to_arrow(), so the fields are already encoded
+        return self._dataset.to_table(columns=self.fields)
+
+    @staticmethod
+    def write(collection, path):
+        """Write a collection's rows to a Parquet file at ``path``"""
+        pyarrow = _require_pyarrow()
+        pyarrow.parquet.write_table(collection.to_arrow(), path)
+
+
+def _model_from_row(model, row):
+    return model(**row)
+
+
+def _column_property(field):
+    def get(self):
+        return self._table.value(self._position, field)
+    return property(get)
+
+
+# View classes, by model class
+_view_classes = weakref.WeakKeyDictionary()
+
+
+def get_view_class(model):
+    """
+    Return a subclass of ``model`` whose instances read their fields from a
+    row of a ``chicago.table.Table`` when they're accessed.
+
+    A view only holds the table and a row position, so creating one doesn't
+    copy anything out of the table.  Each lookup returns a new view, but
+    views of the same row are equal.  Views are read only, and they're
+    pickled as plain models.
+    """
+    try:
+        return _view_classes[model]
+    except KeyError:
+        pass
+
+    def __init__(self, table, position):
+        self._table = table
+        self._position = position
+
+    def __reduce__(self):
+        return (_model_from_row, (model, self._table.row(self._position)))
+
+    def __eq__(self, other):
+        if not isinstance(other, view_class):
+            return NotImplemented
+        return (self._table is other._table
+            and self._position == other._position)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+        return hash((id(self._table), self._position))
+
+    attrs = {
+        '__module__': model.__module__,
+        '__slots__': ('_table', '_position'),
+        '__init__': __init__,
+        '__reduce__': __reduce__,
+        '__eq__': __eq__,
+        '__ne__': __ne__,
+        '__hash__': __hash__,
+    }
+    for field in model.fields:
+        attrs[field] = _column_property(field)
+    view_class = type(model)('{}View'.format(model.__name__), (model,),
+        attrs)
+    _view_classes[model] = view_class
+    return view_class
+
+
+class TableBackend(Backend):
+    """
+    Rows stored in a memory-mapped binary table, see ``chicago.table``.
+
+    Lookups on indexed fields use the table's hash tables and sorted index
+    arrays.  Only the pages of the file that are read are loaded, and
+    they're shared with every other process that maps the same file, so
+    forked workers don't each get a copy of the data.
+
+    Items are views that read their fields from the table, see
+    ``get_view_class()``.
+    """
+
+    def __init__(self, path, fields):
+        super(TableBackend, self).__init__(fields)
+        self.path = path
+        self.table = Table(path)
+        missing = set(self.fields) - set(self.table.fields)
+        if missing:
+            raise ValueError("{} has no column for {}".format(path,
+                ', '.join(sorted(missing))))
+
+    def __len__(self):
+        return len(self.table)
+
+    def _row(self, position):
+        return dict((field, self.table.value(position, field))
+            for field in self.fields)
+
+    def iter_rows(self):
+        for position in range(len(self.table)):
+            yield self._row(position)
+
+    def get_row(self, position):
+        return self._row(self._normalize_position(position))
+
+    def get_value(self, position, field):
+        self._check_field(field)
+        return self.table.value(self._normalize_position(position), field)
+
+    def _find_positions(self, field, key, key_type, limit):
+        self._check_field(field)
+        positions = self.table.find(field, key, key_type)
+        if limit is not None:
+            positions = positions[:limit]
+        return positions
+
+    def find_rows(self, field, key, key_type='str', limit=None):
+        return [self._row(position) for position in
+            self._find_positions(field, key, key_type, limit)]
+
+    def iter_items(self, model):
+        view_class = get_view_class(model)
+        table = self.table
+        for position in range(len(table)):
+            yield view_class(table, position)
+
+    def get_item(self, model, position):
+        return get_view_class(model)(self.table,
+            self._normalize_position(position))
+
+    def to_arrow(self, dictionary_fields=()):
+        from .columnar import table_to_arrow
+
+        return table_to_arrow(self.table, self.fields, dictionary_fields)
+
+    def find_items(self, model, field, key, key_type='str', limit=None):
+        view_class = get_view_class(model)
+        return [view_class(self.table, position) for position in
+            self._find_positions(field, key, key_type, limit)]
+
+    @staticmethod
+    def write(collection, path, metadata=None):
+        """
+        Write a collection's rows, and its indexes, to a table file at
+        ``path``.
+        """
+        fields = collection.get_model().fields
+        write_table(path, fields,
+            ([getattr(item, field, None) for field in fields]
+                for item in collection),
+            [(index.field, index.key_type) for index in collection.indexes],
+            metadata)
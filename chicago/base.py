@@ -1,12 +1,282 @@
+import bisect
 import csv
+import heapq
 import os.path
+import threading
+from array import array
+
+from .backends import ParquetBackend, SQLiteBackend, TableBackend
+from .batch import lookup_many
+from .search import NameIndex
+from . import columnar
 
 
 DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
     'data')
 
 
-class Model(object):
+# The loaded object of every LazyDataset, by the dataset's id().  Loads and
+# reloads never change this dict, they replace it with an updated copy, so
+# the datasets rebuilt by a reload are all published by one assignment.
+_objects = {}
+_publish_lock = threading.Lock()
+
+# Held while a reload builds new copies of datasets
+_reload_lock = threading.Lock()
+# The number of reloads building right now, so loads only look for the
+# copies a reload is building when there could be some
+_reloading = 0
+# On a thread that's reloading, ``objects`` is ``_objects`` with the new
+# copies built so far, and ``built`` is just the new copies
+_reload_state = threading.local()
+
+
+def _publish(updates, remove=()):
+    global _objects
+    with _publish_lock:
+        objects = dict(_objects)
+        objects.update(updates)
+        for key in remove:
+            objects.pop(key, None)
+        _objects = objects
+
+
+def load_together(*datasets):
+    """
+    Return the loaded objects of several ``LazyDataset`` objects from the
+    same point in time, so none of them is from before a reload and another
+    from after it.
+    """
+    for dataset in datasets:
+        dataset.load()
+    objects = _objects
+    return [objects[id(dataset)] for dataset in datasets]
+
+
+class LazyDataset(object):
+    """
+    Stand-in for a dataset that is only loaded the first time it's used.
+
+    ``loader`` is a callable that takes no arguments and returns the loaded
+    dataset, usually a ``Collection``.  Attribute access, iteration, indexing
+    and ``len()`` are all passed through to the loaded dataset.
+
+    ``reload()`` builds a new copy of the dataset, and of the loaded datasets
+    that depend on it, and then publishes them all at once, so reads never
+    wait on a lock.  Code that needs the same copy of a dataset across
+    several reads should hold on to ``load()``'s return value, which isn't
+    changed by later reloads, or use ``load_together()`` for several
+    datasets.  ``sources`` are the files the dataset is built from, which
+    ``chicago.watch`` watches for changes.  They default to the ``source``
+    of a loader decorated with ``snapshot()``.
+    """
+    _own_attributes = ('_loader', '_name', '_lock', 'sources', '_dependents',
+        '_listeners')
+
+    def __init__(self, loader, name=None, sources=None):
+        self._loader = loader
+        self._name = name
+        self._lock = threading.Lock()
+        if sources is None:
+            source = getattr(loader, 'source', None)
+            sources = [source] if source is not None else []
+        self.sources = list(sources)
+        # Datasets built from this one, which are reloaded with it
+        self._dependents = []
+        self._listeners = []
+
+    def __del__(self):
+        # Another dataset could be given the same id() later
+        try:
+            if id(self) in _objects:
+                _publish({}, remove=[id(self)])
+        except Exception:
+            # Module globals may already be gone at exit
+            pass
+
+    def load(self):
+        """Load the dataset if it hasn't been loaded yet and return it"""
+        objects = _objects
+        if _reloading:
+            objects = getattr(_reload_state, 'objects', objects)
+        obj = objects.get(id(self))
+        if obj is None:
+            obj = self._load()
+        return obj
+
+    def _load(self):
+        building = getattr(_reload_state, 'objects', None)
+        if building is not None:
+            # Loaded while reloading other datasets, so it's built from
+            # their new copies, and published with them
+            obj = building[id(self)] = self._loader()
+            _reload_state.built[id(self)] = obj
+            return obj
+        with self._lock:
+            obj = _objects.get(id(self))
+            if obj is None:
+                obj = self._loader()
+                _publish({id(self): obj})
+        return obj
+
+    @property
+    def loaded(self):
+        return id(self) in _objects
+
+    def add_dependent(self, dataset):
+        """
+        Reload ``dataset``, if it's loaded, whenever this dataset is
+        reloaded, because it's built from this one
+        """
+        if dataset not in self._dependents:
+            self._dependents.append(dataset)
+
+    def on_reload(self, callback):
+        """
+        Call ``callback(dataset, error)`` after each reload, with an
+        ``error`` of ``None`` if it succeeded.  Returns ``callback``, so this
+        can be used as a decorator.
+        """
+        self._listeners.append(callback)
+        return callback
+
+    def _notify(self, error):
+        for callback in list(self._listeners):
+            callback(self, error)
+
+    def _reload_order(self):
+        """
+        Return this dataset and the loaded datasets that depend on it,
+        directly or not, with each one after the datasets it's built from
+        """
+        found = {id(self): self}
+        stack = [self]
+        while stack:
+            for dataset in stack.pop()._dependents:
+                if id(dataset) not in found and dataset.loaded:
+                    found[id(dataset)] = dataset
+                    stack.append(dataset)
+
+        parents = dict((key, 0) for key in found)
+        for dataset in found.values():
+            for dependent in dataset._dependents:
+                if id(dependent) in parents:
+                    parents[id(dependent)] += 1
+        order = []
+        ready = [self]
+        while ready:
+            dataset = ready.pop()
+            order.append(dataset)
+            for dependent in dataset._dependents:
+                if id(dependent) in parents:
+                    parents[id(dependent)] -= 1
+                    if parents[id(dependent)] == 0:
+                        ready.append(dependent)
+        return order
+
+    def reload(self, background=False):
+        """
+        Build a new copy of the dataset, and of each loaded dataset that
+        depends on it, once each, and then publish them all at once.
+        Readers keep using the old copies until then, and if building any of
+        them fails, none of them are replaced.
+
+        Returns the new copy, or if ``background`` is true, returns a
+        started thread that does the reload.  Errors in the background are
+        passed to the ``on_reload()`` callbacks, or if there are none, raised
+        in the thread, which reports them.
+        """
+        global _reloading
+
+        if background:
+            def run():
+                try:
+                    self.reload()
+                except Exception:
+                    if not self._listeners:
+                        raise
+            thread = threading.Thread(target=run,
+                name='reload-{}'.format(self._name))
+            thread.daemon = True
+            thread.start()
+            return thread
+
+        error = None
+        with _reload_lock:
+            datasets = self._reload_order()
+            _reload_state.objects = dict(_objects)
+            _reload_state.built = built = {}
+            _reloading += 1
+            try:
+                for dataset in datasets:
+                    obj = dataset._loader()
+                    _reload_state.objects[id(dataset)] = obj
+                    built[id(dataset)] = obj
+            except Exception as e:
+                error = e
+            finally:
+                _reloading -= 1
+                del _reload_state.objects
+                del _reload_state.built
+            if error is None:
+                _publish(built)
+
+        if error is not None:
+            self._notify(error)
+            raise error
+        for dataset in datasets:
+            dataset._notify(None)
+        return built[id(self)]
+
+    def __getattr__(self, name):
+        if name in self._own_attributes:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __getitem__(self, i):
+        return self.load()[i]
+
+    def __len__(self):
+        return len(self.load())
+
+    def __contains__(self, item):
+        return item in self.load()
+
+    def __bool__(self):
+        return bool(self.load())
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        obj = _objects.get(id(self))
+        if obj is None:
+            return "LazyDataset(name='{}', loaded=False)".format(self._name)
+        return repr(obj)
+
+
+class ModelMeta(type):
+    """
+    Metaclass that gives each model class ``__slots__`` for the names in its
+    ``fields``, so model instances don't need a ``__dict__``.
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        if '__slots__' not in attrs:
+            inherited = set()
+            for base in bases:
+                for cls in base.__mro__:
+                    inherited.update(getattr(cls, '__slots__', ()))
+            attrs['__slots__'] = tuple(field
+                for field in attrs.get('fields', [])
+                if field not in inherited)
+
+        return super(ModelMeta, mcs).__new__(mcs, name, bases, attrs)
+
+
+class Model(ModelMeta('ModelBase', (object,), {'__slots__': ()})):
     fields = []
 
     def __init__(self, **kwargs):
@@ -18,61 +288,671 @@ class Model(object):
                 pass
 
 
+class Index(object):
+    """
+    Declares a lookup index over one field of a collection's models.
+
+    A unique index maps each value to a single item, with later items
+    replacing earlier ones that have the same value.  A non-unique index maps
+    each value to a list of items.  Values are compared as strings, and
+    case-insensitively if ``ignore_case`` is true.
+    """
+
+    def __init__(self, field, unique=True, ignore_case=False):
+        self.field = field
+        self.unique = unique
+        self.ignore_case = ignore_case
+
+    @property
+    def key_type(self):
+        """How storage backends should compare keys to stored values"""
+        if self.ignore_case:
+            return 'lower'
+        return 'str'
+
+    def key(self, value):
+        key = str(value)
+        if self.ignore_case:
+            key = key.lower()
+        return key
+
+    def create_table(self):
+        return {}
+
+    def add(self, table, item):
+        key = self.key(getattr(item, self.field))
+        if self.unique:
+            table[key] = item
+        else:
+            table.setdefault(key, []).append(item)
+
+    def get(self, table, value):
+        """Return the item for ``value``, raising ``KeyError`` if there's none"""
+        match = table[self.key(value)]
+        if self.unique:
+            return match
+        return match[0]
+
+    def find(self, table, value):
+        """Return the item for ``value``, or ``None`` if there's none"""
+        match = table.get(self.key(value))
+        if match is None or self.unique:
+            return match
+        return match[0]
+
+    def filter(self, table, value):
+        """Return a list of the items for ``value``"""
+        try:
+            match = table[self.key(value)]
+        except KeyError:
+            return []
+        if self.unique:
+            return [match]
+        return list(match)
+
+
+class DirectIndex(Index):
+    """
+    Declares a unique index over a field with small, non-negative integer
+    values, like community area numbers.
+
+    Items are stored in a list at the position given by their value, so a
+    lookup is a single list access.  Lookup values can be integers or
+    strings of digits.
+
+    If ``radix`` is given, values are split into ``value // radix`` and
+    ``value % radix`` and stored in a list of lists.  That keeps the table
+    small for packed keys like ``ward * 1000 + precinct``.
+    """
+    # Guard against building huge tables for sparse keys
+    max_size = 1 << 16
+
+    key_type = 'int'
+
+    def __init__(self, field, radix=None):
+        super(DirectIndex, self).__init__(field, unique=True)
+        self.radix = radix
+
+    def key(self, value):
+        return int(value)
+
+    def create_table(self):
+        return []
+
+    @staticmethod
+    def _set(table, position, value):
+        if position >= DirectIndex.max_size:
+            raise ValueError("{} is too large for a direct index".format(
+                position))
+        if position >= len(table):
+            table.extend([None] * (position + 1 - len(table)))
+        table[position] = value
+
+    def add(self, table, item):
+        key = self.key(getattr(item, self.field))
+        if key < 0:
+            raise ValueError("Can't add negative key {} to a direct "
+                "index".format(key))
+
+        if self.radix is None:
+            self._set(table, key, item)
+            return
+
+        high, low = divmod(key, self.radix)
+        if high >= len(table) or table[high] is None:
+            self._set(table, high, [])
+        self._set(table[high], low, item)
+
+    def find(self, table, value):
+        try:
+            key = self.key(value)
+        except (TypeError, ValueError):
+            return None
+        if key < 0:
+            return None
+
+        if self.radix is not None:
+            high, key = divmod(key, self.radix)
+            if high >= len(table) or table[high] is None:
+                return None
+            table = table[high]
+
+        if key >= len(table):
+            return None
+        return table[key]
+
+    def get(self, table, value):
+        match = self.find(table, value)
+        if match is None:
+            raise KeyError(value)
+        return match
+
+    def filter(self, table, value):
+        match = self.find(table, value)
+        if match is None:
+            return []
+        return [match]
+
+
+class Ordering(object):
+    """
+    Declares the field a collection is kept sorted by.
+
+    Values are compared as strings or, if ``key_type`` is ``'int'``, as
+    integers.  The sorted keys are kept alongside the items, so range and
+    prefix queries on the field are binary searches.
+    """
+
+    def __init__(self, field, key_type='str'):
+        if key_type not in ('str', 'int'):
+            raise ValueError("Unknown key type '{}'".format(key_type))
+        self.field = field
+        self.key_type = key_type
+
+    def key(self, value):
+        if self.key_type == 'int':
+            return int(value)
+        return str(value)
+
+    def create_keys(self):
+        if self.key_type == 'int':
+            return array('q')
+        return []
+
+    def item_key(self, item):
+        return self.key(getattr(item, self.field))
+
+    def range_span(self, keys, low=None, high=None):
+        """
+        Return the ``(start, stop)`` positions of the sorted ``keys``
+        between ``low`` and ``high``, inclusive
+        """
+        start = 0 if low is None else bisect.bisect_left(keys, self.key(low))
+        stop = (len(keys) if high is None
+            else bisect.bisect_right(keys, self.key(high), start))
+        return (start, max(start, stop))
+
+    def prefix_spans(self, keys, values, prefix):
+        """
+        Return a list of ``(start, stop)`` positions of the sorted ``keys``
+        whose ``values``, the field's strings, start with ``prefix``
+        """
+        prefix = str(prefix)
+        if not keys:
+            return []
+
+        if self.key_type == 'str':
+            start = bisect.bisect_left(keys, prefix)
+            truncated = _KeySequence(lambda i: keys[i][:len(prefix)],
+                len(keys))
+            return [(start, bisect.bisect_right(truncated, prefix, start))]
+
+        if not prefix.isdigit():
+            return []
+        # A value of ``width`` digits, zero-padded or not, starts with the
+        # prefix if it's between ``prefix`` followed by all zeros and all
+        # nines, so there's a candidate span of keys for each width
+        last = len(keys) - 1
+        max_width = max(len(str(keys[last])), len(str(values[last])))
+        number = int(prefix)
+        candidates = []
+        for width in range(len(prefix), max_width + 1):
+            scale = 10 ** (width - len(prefix))
+            candidates.append((bisect.bisect_left(keys, number * scale),
+                bisect.bisect_left(keys, (number + 1) * scale)))
+
+        # Spans for different widths only overlap when the prefix is all
+        # zeros.  Their values are checked, since a key can be in the span
+        # for a width other than the one its value is written with.
+        spans = []
+        covered = 0
+        for start, stop in sorted(candidates):
+            start = max(start, covered)
+            run = None
+            for i in range(start, stop):
+                if str(values[i]).startswith(prefix):
+                    if run is None:
+                        run = i
+                elif run is not None:
+                    spans.append((run, i))
+                    run = None
+            if run is not None:
+                spans.append((run, stop))
+            covered = max(covered, stop)
+        return spans
+
+
+class _KeySequence(object):
+    """Sequence of keys computed on demand, for ``bisect``"""
+
+    def __init__(self, get, length):
+        self.get = get
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        return self.get(i)
+
+
+class ItemRange(object):
+    """
+    The items at runs of positions in a collection, returned by range and
+    prefix queries.
+
+    Nothing is copied: items are read from the collection as the range is
+    iterated or indexed.
+    """
+
+    def __init__(self, collection, spans):
+        self.collection = collection
+        self.spans = [(start, stop) for start, stop in spans if start < stop]
+
+    def __len__(self):
+        return sum(stop - start for start, stop in self.spans)
+
+    def __bool__(self):
+        return bool(self.spans)
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        collection = self.collection
+        if collection._backend is None:
+            items = collection._items
+            for start, stop in self.spans:
+                for i in range(start, stop):
+                    yield items[i]
+        else:
+            for start, stop in self.spans:
+                for i in range(start, stop):
+                    yield collection[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i >= 0:
+            for start, stop in self.spans:
+                if i < stop - start:
+                    return self.collection[start + i]
+                i -= stop - start
+        raise IndexError("range index out of range")
+
+    def __repr__(self):
+        return "ItemRange({!r}, {})".format(self.collection.__class__.__name__,
+            self.spans)
+
+
+_MISSING = object()
+
+
 class Collection(object):
     model = Model
 
+    # List of ``Index`` declarations for fields that can be looked up with
+    # ``get_by()`` and ``filter_by()``
+    indexes = []
+
+    # Low-cardinality fields whose values are shared between models when
+    # loading, instead of every row keeping its own copy of the same string
+    interned_fields = []
+
+    # Fields with few distinct values, repeated across rows, which are
+    # dictionary-encoded when exporting to Arrow and pandas.  Interned
+    # fields aren't necessarily repeated: they can be unique keys that are
+    # interned to share them with another collection.
+    categorical_fields = []
+
+    # ``Ordering`` of the field items are kept sorted by, which can be
+    # queried with ``filter_by_range()`` and ``filter_by_prefix()``
+    ordering = None
+
+    # Field with the names that ``search()`` matches queries against
+    name_field = None
+
     def __init__(self, items=None):
         self._items = []
-        if items is None:
-            items = []
-        for item in items:
-            self.add_item(item)
+        # Built the first time the collection is searched
+        self._name_index = None
+        # Sorted keys of the items, in the same order, if there's an ordering
+        self._sort_keys = None
+        if self.ordering is not None:
+            self._sort_keys = self.ordering.create_keys()
+        self._indexes = {}
+        # Storage backend for the rows, or None to keep models in memory
+        self._backend = None
+        for index in self.indexes:
+            self._indexes[index.field] = (index, index.create_table())
 
-        self.default_sort()
+        if items is not None:
+            self.add_items(items)
 
     def __iter__(self):
+        if self._backend is not None:
+            return self._backend.iter_items(self.get_model())
         return iter(self._items);
 
     def __getitem__(self, i):
+        if self._backend is not None:
+            if isinstance(i, slice):
+                return [self[j] for j in range(*i.indices(len(self)))]
+            return self._backend.get_item(self.get_model(), i)
         return self._items[i]
 
     def __len__(self):
+        if self._backend is not None:
+            return len(self._backend)
         return len(self._items)
 
     def __repr__(self):
         cls_name = self.__class__.__name__
+        if self._backend is not None:
+            return "{}(backend={}('{}'))".format(cls_name,
+                self._backend.__class__.__name__, self._backend.path)
         return "{}([{}])".format(
             cls_name,
             ','.join([repr(item) for item in self._items])
         )
 
+    def _check_writable(self):
+        if self._backend is not None:
+            raise ValueError("Can't add items to a collection stored in "
+                "{}".format(self._backend.__class__.__name__))
+
     def default_sort(self):
+        """Sort the items by the collection's ordering, if it has one"""
+        if self.ordering is not None:
+            keyed = sorted(zip(map(self.ordering.item_key, self._items),
+                self._items), key=lambda pair: pair[0])
+            self._sort_keys = self.ordering.create_keys()
+            self._sort_keys.extend(key for key, item in keyed)
+            self._items = [item for key, item in keyed]
         return self
 
     def get_model(self):
         return self.model
 
     def add_item(self, item):
-        self._items.append(item)
+        self._check_writable()
+        self._name_index = None
+        if self.ordering is None:
+            self._items.append(item)
+        else:
+            key = self.ordering.item_key(item)
+            position = bisect.bisect_right(self._sort_keys, key)
+            self._sort_keys.insert(position, key)
+            self._items.insert(position, item)
+        for index, table in self._indexes.values():
+            index.add(table, item)
 
-    def _from_csv_file(self, csvfile):
-        reader = csv.DictReader(csvfile)
-        model_cls = self.get_model()
-        for row in reader:
-            model_kwargs = self.transform_row(row)
-            self.add_item(model_cls(**model_kwargs))
+    def add_items(self, items):
+        """
+        Add several items at once, keeping the collection sorted and then
+        updating the indexes in a single pass over the new items.
 
-        self.default_sort()
+        With an ``ordering``, only the new items are sorted, and they're
+        merged into the items that are already sorted.
+        """
+        self._check_writable()
+        self._name_index = None
+        if self.ordering is None:
+            items = list(items)
+            self._items.extend(items)
+            self.default_sort()
+            if self._indexes:
+                new_items = set(id(item) for item in items)
+                items = [item for item in self._items
+                    if id(item) in new_items]
+        else:
+            # A stable sort, so items with the same key stay in the order
+            # they were added
+            keyed = sorted(((self.ordering.item_key(item), item)
+                for item in items), key=lambda pair: pair[0])
+            self._merge_sorted(keyed)
+            items = [item for key, item in keyed]
+
+        for item in items:
+            for index, table in self._indexes.values():
+                index.add(table, item)
 
         return self
 
-    def from_csv(self, csvfile):
+    def _merge_sorted(self, keyed):
+        """Merge a sorted list of ``(key, item)`` into the sorted items"""
+        keys = self._sort_keys
+        if not keyed:
+            return
+        if not keys or keyed[0][0] >= keys[len(keys) - 1]:
+            # The usual case: loading items that are already in order
+            keys.extend(key for key, item in keyed)
+            self._items.extend(item for key, item in keyed)
+        elif len(keyed) < 64:
+            for key, item in keyed:
+                position = bisect.bisect_right(keys, key)
+                keys.insert(position, key)
+                self._items.insert(position, item)
+        else:
+            # Existing items come before new ones with the same key
+            merged = list(heapq.merge(
+                ((key, 0, i) for i, key in enumerate(keys)),
+                ((key, 1, i) for i, (key, item) in enumerate(keyed))))
+            items = self._items
+            self._sort_keys = self.ordering.create_keys()
+            self._sort_keys.extend(key for key, source, i in merged)
+            self._items = [items[i] if source == 0 else keyed[i][1]
+                for key, source, i in merged]
+
+    def _get_index(self, field):
         try:
-            return self._from_csv_file(csvfile)
+            return self._indexes[field]
         except KeyError:
-            # Couldn't parse CSV properly, so csvfile is probably a string
+            raise ValueError("{} has no index on field '{}'".format(
+                self.__class__.__name__, field))
+
+    def _find_in_backend(self, index, value, limit=None):
+        try:
+            key = index.key(value)
+        except (TypeError, ValueError):
+            return []
+        return self._backend.find_items(self.get_model(), index.field, key,
+            index.key_type, limit)
+
+    def get_by(self, field, value, default=_MISSING):
+        """
+        Return the item whose indexed ``field`` matches ``value``.
+
+        Raises ``KeyError`` if there's no match, unless ``default`` is given.
+        """
+        index, table = self._get_index(field)
+        try:
+            if self._backend is not None:
+                matches = self._find_in_backend(index, value, limit=1)
+                if not matches:
+                    raise KeyError(value)
+                return matches[0]
+            return index.get(table, value)
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+
+    def get_many_by(self, field, values, attr=None, missing=None,
+            errors='coerce'):
+        """
+        Return the items whose indexed ``field`` matches each of ``values``.
+
+        See ``chicago.batch.lookup_many()`` for how ``attr``, ``missing`` and
+        ``errors`` are handled.
+        """
+        index, table = self._get_index(field)
+        if self._backend is not None:
+            return lookup_many(lambda value: self.get_by(field, value, None),
+                values, attr, missing, errors)
+        return lookup_many(lambda value: index.find(table, value), values,
+            attr, missing, errors)
+
+    def filter_by(self, field, value):
+        """Return a list of the items whose indexed ``field`` matches ``value``"""
+        index, table = self._get_index(field)
+        if self._backend is not None:
+            return self._find_in_backend(index, value)
+        return index.filter(table, value)
+
+    def _get_sorted_keys(self, field):
+        """
+        Return the sorted keys of ``field``, which must be the ordering, and
+        a sequence of the field's values in the same order
+        """
+        if self.ordering is None or self.ordering.field != field:
+            raise ValueError("{} isn't sorted by field '{}'".format(
+                self.__class__.__name__, field))
+        if self._backend is None:
+            items = self._items
+            values = _KeySequence(lambda i: getattr(items[i], field),
+                len(items))
+            return self._sort_keys, values
+        # Backends store rows in the collection's order, so their values can
+        # be searched in place
+        backend = self._backend
+        key = self.ordering.key
+        values = _KeySequence(lambda i: backend.get_value(i, field),
+            len(backend))
+        return _KeySequence(lambda i: key(values[i]), len(backend)), values
+
+    def filter_by_range(self, field, low=None, high=None):
+        """
+        Return an ``ItemRange`` of the items whose ``field``, the one the
+        collection is sorted by, is between ``low`` and ``high``, inclusive.
+        Either bound can be ``None`` to leave the range open.
+        """
+        keys, values = self._get_sorted_keys(field)
+        return ItemRange(self, [self.ordering.range_span(keys, low, high)])
+
+    def filter_by_prefix(self, field, prefix):
+        """
+        Return an ``ItemRange`` of the items whose ``field``, the one the
+        collection is sorted by, starts with the string ``prefix``
+        """
+        keys, values = self._get_sorted_keys(field)
+        return ItemRange(self, self.ordering.prefix_spans(keys, values,
+            prefix))
+
+    def search(self, query, limit=10, min_score=0.3):
+        """
+        Return a list of ``chicago.search.Match`` tuples for the names that
+        match ``query``, allowing for typos and partial words, best first
+        """
+        if self.name_field is None:
+            raise ValueError("{} has no names to search".format(
+                self.__class__.__name__))
+        name_index = self._name_index
+        if name_index is None:
+            name_index = self._name_index = NameIndex(
+                (getattr(item, self.name_field), item) for item in self)
+        return name_index.search(query, limit, min_score)
+
+    def _from_csv_file(self, csvfile):
+        reader = csv.DictReader(csvfile)
+        model_cls = self.get_model()
+        values = {}
+        return self.add_items(
+            model_cls(**self.intern_values(self.transform_row(row), values))
+            for row in reader)
+
+    def intern_values(self, model_kwargs, values):
+        """
+        Replace the values of ``interned_fields`` in ``model_kwargs`` with
+        equal values already in the ``values`` dict, adding any new ones.
+        """
+        for field in self.interned_fields:
+            try:
+                val = model_kwargs[field]
+            except KeyError:
+                continue
+            model_kwargs[field] = values.setdefault(val, val)
+        return model_kwargs
+
+    def from_csv(self, csvfile):
+        if not hasattr(csvfile, 'read'):
+            # csvfile is a path rather than a file object
             with open(csvfile, 'r') as f:
                 return self._from_csv_file(f)
+        return self._from_csv_file(csvfile)
+
+    def get_table_name(self):
+        """Name of the table that stores this collection in a database"""
+        return self.get_model().__name__.lower()
+
+    def from_sqlite(self, path, table=None):
+        """
+        Read rows from a table in a SQLite database, usually one written by
+        ``to_sqlite()``, instead of holding them in memory.
+        """
+        self._check_writable()
+        if table is None:
+            table = self.get_table_name()
+        self._backend = SQLiteBackend(path, table, self.get_model().fields)
+        return self
+
+    def to_sqlite(self, path, table=None):
+        """Write this collection's rows, and its indexes, to a SQLite database"""
+        if table is None:
+            table = self.get_table_name()
+        SQLiteBackend.write(self, path, table)
+        return self
+
+    def from_parquet(self, path):
+        """
+        Read rows from a Parquet file, usually one written by
+        ``to_parquet()``, instead of holding them in memory.
+        """
+        self._check_writable()
+        self._backend = ParquetBackend(path, self.get_model().fields)
+        return self
+
+    def to_parquet(self, path):
+        """Write this collection's rows to a Parquet file"""
+        ParquetBackend.write(self, path)
+        return self
+
+    def from_table(self, path):
+        """
+        Read rows from a memory-mapped binary table written by
+        ``to_table()``, instead of holding them in memory.
+        """
+        self._check_writable()
+        self._backend = TableBackend(path, self.get_model().fields)
+        return self
+
+    def to_table(self, path, metadata=None):
+        """Write this collection's rows, and its indexes, to a binary table"""
+        TableBackend.write(self, path, metadata)
+        return self
+
+    def to_arrow(self):
+        """
+        Return a pyarrow Table with a column for each model field.
+
+        ``categorical_fields`` are dictionary-encoded.  Collections stored in
+        binary tables or Parquet are converted from their columns without
+        creating models.
+        """
+        if self._backend is not None:
+            table = self._backend.to_arrow(self.categorical_fields)
+            if table is not None:
+                return table
+        return columnar.to_arrow(self)
+
+    def to_dataframe(self):
+        """
+        Return a pandas DataFrame with a column for each model field.
+
+        ``categorical_fields`` become categorical columns.
+        """
+        return columnar.to_dataframe(self)
 
     def transform_row(self, row):
         return row
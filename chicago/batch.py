@@ -0,0 +1,82 @@
+"""
+Helpers for looking up many keys at once.
+
+Batch lookups accept any iterable of keys, including NumPy arrays, and
+return results aligned with the keys.  If the keys are a NumPy array, the
+results are NumPy object arrays, otherwise they're lists.  NumPy is optional,
+and isn't imported until it's needed.
+"""
+import sys
+
+ERRORS = ('coerce', 'raise')
+
+
+def is_array(values):
+    # Anything passing an array has already imported NumPy
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def as_key_list(values):
+    """Return ``values`` as a list of plain Python values"""
+    if is_array(values):
+        # tolist() converts NumPy scalars to the equivalent Python types
+        return values.tolist()
+    return list(values)
+
+
+def as_result(results, like):
+    """Return ``results`` in the same kind of container as the keys ``like``"""
+    if not is_array(like):
+        return results
+
+    import numpy
+    result_array = numpy.empty(len(results), dtype=object)
+    result_array[:] = results
+    return result_array
+
+
+def check_errors(errors):
+    if errors not in ERRORS:
+        raise ValueError("errors must be one of {}, not '{}'".format(
+            ', '.join(ERRORS), errors))
+
+
+def lookup_many(lookup, keys, attr=None, missing=None, errors='coerce',
+        like=None):
+    """
+    Look up each of ``keys`` with ``lookup``, a callable that returns ``None``
+    for keys that don't match.
+
+    If ``attr`` is a field name, return that field of each result instead of
+    the result itself.  If it's a sequence of field names, return a tuple
+    with a result array for each field.
+
+    Keys without a match get ``missing`` in the results if ``errors`` is
+    ``'coerce'``, or raise ``KeyError`` if ``errors`` is ``'raise'``.
+
+    Results are NumPy arrays if ``like``, which defaults to ``keys``, is a
+    NumPy array.
+    """
+    check_errors(errors)
+    if like is None:
+        like = keys
+
+    key_list = as_key_list(keys)
+    matches = []
+    for key in key_list:
+        match = lookup(key)
+        if match is None and errors == 'raise':
+            raise KeyError(key)
+        matches.append(match)
+
+    if attr is None:
+        return as_result([missing if match is None else match
+            for match in matches], like)
+
+    if isinstance(attr, str):
+        return as_result([missing if match is None else getattr(match, attr)
+            for match in matches], like)
+
+    return tuple(as_result([missing if match is None else getattr(match, a)
+        for match in matches], like) for a in attr)
@@ -0,0 +1,132 @@
+"""
+Export collections to Arrow tables and pandas DataFrames.
+
+Collections held in memory are read from their models, one pass per field.
+Collections stored in binary tables are converted from the table's columns
+of string numbers by Arrow, without creating models or decoding rows in
+Python, and Parquet collections return the columns they read.
+
+A collection's ``categorical_fields`` have few distinct values, so they're
+dictionary-encoded in Arrow and become categoricals in pandas.  Both pyarrow
+and pandas are optional, and are only imported when they're used.
+"""
+from .table import NULL
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        raise ImportError("Exporting to Arrow requires the pyarrow package")
+    return pyarrow
+
+
+def _encode(values):
+    """
+    Dictionary-encode ``values``, returning a list of integer codes, with -1
+    for ``None``, and the list of distinct values.
+    """
+    codes = []
+    dictionary = []
+    positions = {}
+    for val in values:
+        if val is None:
+            codes.append(-1)
+            continue
+        try:
+            code = positions[val]
+        except KeyError:
+            code = positions[val] = len(dictionary)
+            dictionary.append(val)
+        codes.append(code)
+    return codes, dictionary
+
+
+def _columns(collection):
+    fields = collection.get_model().fields
+    items = list(collection)
+    for field in fields:
+        yield (field, field in collection.categorical_fields,
+            [getattr(item, field, None) for item in items])
+
+
+def to_arrow(collection):
+    """Return a pyarrow Table with a column for each of a collection's fields"""
+    pyarrow = _require_pyarrow()
+
+    names = []
+    arrays = []
+    for field, categorical, values in _columns(collection):
+        names.append(field)
+        if categorical:
+            codes, dictionary = _encode(values)
+            arrays.append(pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array([None if code < 0 else code for code in codes],
+                    type=pyarrow.int32()),
+                pyarrow.array(dictionary, type=pyarrow.string())))
+        else:
+            arrays.append(pyarrow.array(values, type=pyarrow.string()))
+
+    return pyarrow.table(arrays, names=names)
+
+
+def table_to_arrow(table, fields, dictionary_fields=()):
+    """
+    Return a pyarrow Table of ``fields`` from a ``chicago.table.Table``.
+
+    The table's string heap becomes an Arrow string array without copying,
+    and each column takes its values from it by their numbers.
+    ``dictionary_fields`` are dictionary-encoded.
+    """
+    pyarrow = _require_pyarrow()
+    compute = pyarrow.compute
+
+    offsets, data = table.heap()
+    if len(data) >= 2 ** 31:
+        raise ValueError("{} has too many strings to export".format(table))
+    # The heap's offsets are unsigned 32-bit integers, which Arrow reads as
+    # signed ones, since they're less than 2 ** 31
+    strings = pyarrow.StringArray.from_buffers(len(offsets) - 1,
+        pyarrow.py_buffer(offsets), pyarrow.py_buffer(data))
+
+    names = []
+    arrays = []
+    for field in fields:
+        numbers = pyarrow.Array.from_buffers(pyarrow.uint32(), len(table),
+            [None, pyarrow.py_buffer(table.column(field))])
+        numbers = compute.if_else(compute.equal(numbers, NULL),
+            pyarrow.scalar(None, pyarrow.uint32()), numbers)
+        values = compute.take(strings, numbers)
+        if field in dictionary_fields:
+            values = compute.dictionary_encode(values)
+        names.append(field)
+        arrays.append(values)
+    return pyarrow.table(arrays, names=names)
+
+
+def to_dataframe(collection):
+    """Return a pandas DataFrame with a column for each of a collection's fields"""
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("Exporting to a DataFrame requires the pandas package")
+
+    try:
+        _require_pyarrow()
+    except ImportError:
+        pass
+    else:
+        # Arrow converts dictionary columns to categoricals without
+        # decoding them, and can hand over its buffers without copying
+        return collection.to_arrow().to_pandas(split_blocks=True)
+
+    data = {}
+    for field, categorical, values in _columns(collection):
+        if categorical:
+            codes, dictionary = _encode(values)
+            data[field] = pandas.Categorical.from_codes(codes, dictionary)
+        else:
+            data[field] = values
+
+    return pandas.DataFrame(data, columns=collection.get_model().fields)
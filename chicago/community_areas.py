@@ -1,6 +1,8 @@
 import os.path
 
-from .base import Model, Collection, DATA_DIRECTORY
+from .base import (Model, Collection, DirectIndex, Index, LazyDataset,
+    Ordering, DATA_DIRECTORY)
+from .snapshot import snapshot
 
 COMMUNITY_AREA_CSV_FILENAME = os.path.join(DATA_DIRECTORY, 'CommAreas.csv')
 
@@ -20,14 +22,12 @@ class CommunityArea(Model):
 
 class CommunityAreaCollection(Collection):
     model = CommunityArea
-
-    def __init__(self):
-        self._by_number = {}
-        super(CommunityAreaCollection, self).__init__()
-
-    def add_item(self, item):
-        super(CommunityAreaCollection, self).add_item(item)
-        self._by_number[item.number] = item
+    indexes = [
+        DirectIndex('number'),
+        Index('name', ignore_case=True),
+    ]
+    ordering = Ordering('number', 'int')
+    name_field = 'name'
 
     def transform_row(self, row):
         return {
@@ -36,12 +36,16 @@ class CommunityAreaCollection(Collection):
         }
 
     def get_by_number(self, number):
-        number_s = str(number)
-        return self._by_number[number_s]
+        return self.get_by('number', number)
+
+    def get_by_name(self, name):
+        return self.get_by('name', name, None)
+
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda ca: int(ca.number))
-        return self
+@snapshot('community_areas', COMMUNITY_AREA_CSV_FILENAME,
+    CommunityAreaCollection)
+def load_community_areas():
+    return CommunityAreaCollection().from_csv(COMMUNITY_AREA_CSV_FILENAME)
 
 
-COMMUNITY_AREAS = CommunityAreaCollection().from_csv(COMMUNITY_AREA_CSV_FILENAME)
+COMMUNITY_AREAS = LazyDataset(load_community_areas, 'COMMUNITY_AREAS')
@@ -1,3 +1,4 @@
 from .precincts import (COOK_SUBURBAN_PRECINCTS,
     get_suburban_cook_precincts_from_tract_geoid,
-    get_suburban_cook_tract_from_precinct_number)
+    get_suburban_cook_tract_from_precinct_number,
+    get_suburban_cook_tracts_from_precinct_numbers)
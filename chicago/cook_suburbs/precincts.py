@@ -1,10 +1,12 @@
 import os.path
-import sys
-sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
-
-from base import Model, Collection, DATA_DIRECTORY
+from array import array
 from csv import DictReader
 
+from ..batch import lookup_many
+from ..base import (Model, Collection, Index, LazyDataset, Ordering,
+    DATA_DIRECTORY)
+from ..snapshot import snapshot
+
 COOK_SUBURBAN_PRECINCT_CSV_FILENAME = os.path.join(
     DATA_DIRECTORY, 'cook_suburban_precincts_as_of_2016.csv')
 COOK_SUBURBAN_PRECINCT_TRACT_CROSSWALK_CSV_FILENAME = os.path.join(
@@ -27,20 +29,15 @@ class CookSuburbanPrecinct(Model):
 
 class CookSuburbanPrecinctCollection(Collection):
     model = CookSuburbanPrecinct
-
-    def __init__(self):
-        self._by_precinct_id = {}
-        self._by_town_name = {}
-        self._by_object_id = {}
-        super(CookSuburbanPrecinctCollection, self).__init__()
-
-    def add_item(self, item):
-        super(CookSuburbanPrecinctCollection, self).add_item(item)
-        self._by_precinct_id[item.precinctid] = item
-        self._by_object_id[item.objectid] = item
-        if item.town.lower() not in self._by_town_name:
-            self._by_town_name[item.town.lower()] = []
-        self._by_town_name[item.town.lower()].append(item)
+    indexes = [
+        Index('precinctid'),
+        Index('objectid'),
+        Index('town', unique=False, ignore_case=True),
+    ]
+    ordering = Ordering('precinctid', 'int')
+    name_field = 'town'
+    interned_fields = ['town']
+    categorical_fields = ['town']
 
     def transform_row(self, row):
         return {
@@ -50,38 +47,159 @@ class CookSuburbanPrecinctCollection(Collection):
         }
 
     def get_by_town_name(self, name):
-        return self._by_town_name.get(str(name).lower(), None)
+        return self.filter_by('town', name) or None
 
     def get_by_precinct_id(self, precinctid):
-        return self._by_precinct_id.get(str(precinctid), None)
+        return self.get_by('precinctid', precinctid, None)
 
     def get_by_object_id(self, object_id):
-        return self._by_object_id.get(str(object_id), None)
+        return self.get_by('objectid', object_id, None)
+
+    def filter_by_township(self, code):
+        """
+        Return an ``ItemRange`` of the precincts in a township, by the
+        two-digit township code their precinct IDs start with, like ``70``
+        """
+        return self.filter_by_prefix('precinctid', code)
+
+
+@snapshot('cook_suburban_precincts', COOK_SUBURBAN_PRECINCT_CSV_FILENAME,
+    CookSuburbanPrecinctCollection)
+def load_cook_suburban_precincts():
+    return CookSuburbanPrecinctCollection().from_csv(
+        COOK_SUBURBAN_PRECINCT_CSV_FILENAME)
+
+
+COOK_SUBURBAN_PRECINCTS = LazyDataset(load_cook_suburban_precincts,
+    'COOK_SUBURBAN_PRECINCTS')
+
+
+class CookSuburbanCrosswalk(object):
+    """
+    Crosswalk between suburban Cook County precincts and the census tracts
+    that contain them.
+
+    Each column is stored as an array of integers, with hash indexes from
+    precinct number, precinct object ID and tract GEOID to row positions.
+    It's a read-only sequence of rows: indexing or iterating over it yields
+    a dict of strings for each row, and slicing it returns a list of them.
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda pc: int(pc.precinctid))
+    Lookups match IDs exactly as they're written in the CSV, so ``'123'``
+    and ``123`` match precinct 123, but ``'0123'`` doesn't.
+    """
+    columns = ('precinct_number', 'precinct_objectid', 'tract_geoid')
+    precinct_keys = ('precinct_number', 'precinct_objectid')
+
+    def __init__(self):
+        self._columns = dict((column, array('q')) for column in self.columns)
+        self._by_precinct = dict((key, {}) for key in self.precinct_keys)
+        self._by_tract_geoid = {}
+
+    def __len__(self):
+        return len(self._columns['tract_geoid'])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return dict((column, str(self._columns[column][i]))
+            for column in self.columns)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "CookSuburbanCrosswalk(rows={})".format(len(self))
+
+    @staticmethod
+    def _key(value):
+        """
+        Return the integer an ID is stored as, or ``None`` if its string
+        isn't exactly how the integer is written
+        """
+        text = str(value)
+        try:
+            key = int(text)
+        except ValueError:
+            return None
+        if str(key) != text:
+            return None
+        return key
+
+    def add_row(self, row):
+        i = len(self)
+        for column in self.columns:
+            value = self._key(row[column])
+            if value is None:
+                raise ValueError("Expected an integer {}, got {!r}".format(
+                    column, row[column]))
+            self._columns[column].append(value)
+
+        for key in self.precinct_keys:
+            # Keep the first row for a precinct, like a scan would
+            self._by_precinct[key].setdefault(self._columns[key][i], i)
+        self._by_tract_geoid.setdefault(self._columns['tract_geoid'][i],
+            []).append(i)
+
+    def from_csv(self, csvfile):
+        if not hasattr(csvfile, 'read'):
+            with open(csvfile, 'r') as f:
+                return self.from_csv(f)
+
+        for row in DictReader(csvfile):
+            self.add_row(row)
         return self
 
+    def get_precinct_ids(self, geoid, precinct_key='precinct_objectid'):
+        """
+        Return the IDs of the precincts in the tract ``geoid``, or ``None``
+        for each of them if ``precinct_key`` isn't a column
+        """
+        rows = self._by_tract_geoid.get(self._key(geoid), [])
+        column = self._columns.get(precinct_key)
+        if column is None:
+            return [None] * len(rows)
+        return [str(column[i]) for i in rows]
+
+    def get_tract_geoid(self, precinct_id, precinct_key='precinct_objectid'):
+        """Return the GEOID of the tract containing a precinct"""
+        index = self._by_precinct.get(precinct_key)
+        if index is None:
+            return None
+        i = index.get(self._key(precinct_id))
+        if i is None:
+            return None
+        return str(self._columns['tract_geoid'][i])
+
 
-COOK_SUBURBAN_PRECINCTS = CookSuburbanPrecinctCollection().from_csv(
-    COOK_SUBURBAN_PRECINCT_CSV_FILENAME)
+@snapshot('cook_suburban_crosswalk', COOK_SUBURBAN_PRECINCT_TRACT_CROSSWALK_CSV_FILENAME)
+def load_cook_suburban_crosswalk():
+    return CookSuburbanCrosswalk().from_csv(
+        COOK_SUBURBAN_PRECINCT_TRACT_CROSSWALK_CSV_FILENAME)
+
+
+COOK_SUBURBAN_CROSSWALK = LazyDataset(load_cook_suburban_crosswalk,
+    'COOK_SUBURBAN_CROSSWALK')
 
-# HACK - this seems duplicative with Chicago precinct crosswalk
-COOK_SUBURBAN_CROSSWALK = []
-with open(COOK_SUBURBAN_PRECINCT_TRACT_CROSSWALK_CSV_FILENAME) as fh:
-    reader = DictReader(fh)
-    for row in reader:
-        COOK_SUBURBAN_CROSSWALK.append(row)
 
 def get_suburban_cook_precincts_from_tract_geoid(geoid, precinct_key='precinct_objectid'):
-    precinct_ids = []
-    for row in COOK_SUBURBAN_CROSSWALK:
-        if row['tract_geoid'] == str(geoid):
-            precinct_ids.append(row.get(precinct_key, None))
-    return precinct_ids
+    return COOK_SUBURBAN_CROSSWALK.get_precinct_ids(geoid, precinct_key)
+
 
 def get_suburban_cook_tract_from_precinct_number(precinct_id, precinct_key='precinct_objectid'):
-    for row in COOK_SUBURBAN_CROSSWALK:
-        if row.get(precinct_key, None) == str(precinct_id):
-            return row['tract_geoid']
-    return None
\ No newline at end of file
+    return COOK_SUBURBAN_CROSSWALK.get_tract_geoid(precinct_id, precinct_key)
+
+
+def get_suburban_cook_tracts_from_precinct_numbers(precinct_ids,
+        precinct_key='precinct_objectid', missing=None, errors='coerce'):
+    """
+    Return the GEOIDs of the tracts containing each of ``precinct_ids``.
+
+    See ``chicago.batch.lookup_many()`` for how ``missing`` and ``errors``
+    are handled.
+    """
+    crosswalk = COOK_SUBURBAN_CROSSWALK.load()
+    return lookup_many(
+        lambda precinct_id: crosswalk.get_tract_geoid(precinct_id,
+            precinct_key),
+        precinct_ids, missing=missing, errors=errors)
@@ -0,0 +1,126 @@
+import os.path
+from csv import DictReader
+
+from .base import LazyDataset, DATA_DIRECTORY
+from .precincts import PRECINCTS, PrecinctCollection
+from .snapshot import load_table, shared_tables_enabled, snapshot
+from .tracts import TRACTS, TractCollection
+
+CHICAGO_CROSSWALK_CSV_FILENAME = os.path.join(DATA_DIRECTORY,
+    'chicago_precinct_census_tract_crosswalk.csv')
+
+
+class ChicagoCrosswalk(object):
+    """
+    Chicago precincts, the census tracts that contain them, and the links
+    between the two, read in a single pass over the crosswalk CSV.
+
+    Each precinct and tract is only stored once, no matter how many rows
+    it appears in.
+    """
+
+    def __init__(self):
+        self.precincts = PrecinctCollection()
+        self.tracts = TractCollection()
+        self._tract_geoids_by_precinct = {}
+        self._precinct_names_by_tract = {}
+
+    def __repr__(self):
+        return "ChicagoCrosswalk(precincts={}, tracts={}, links={})".format(
+            len(self.precincts), len(self.tracts), len(self.links))
+
+    @property
+    def links(self):
+        """List of (precinct full name, tract GEOID) pairs"""
+        return [(full_name, geoid)
+            for full_name, geoids in self._tract_geoids_by_precinct.items()
+            for geoid in geoids]
+
+    def from_csv(self, csvfile):
+        if not hasattr(csvfile, 'read'):
+            with open(csvfile, 'r') as f:
+                return self.from_csv(f)
+
+        precinct_model = self.precincts.get_model()
+        tract_model = self.tracts.get_model()
+        # Shared between precincts and tracts, so a precinct's tract GEOID
+        # is the same string object as the tract's GEOID
+        values = {}
+        precincts = {}
+        tracts = {}
+        links = set()
+        for row in DictReader(csvfile):
+            precinct_kwargs = self.precincts.intern_values(
+                self.precincts.transform_row(row), values)
+            tract_kwargs = self.tracts.intern_values(
+                self.tracts.transform_row(row), values)
+
+            full_name = precinct_kwargs['full_name']
+            geoid = tract_kwargs['geoid']
+            if full_name not in precincts:
+                precincts[full_name] = precinct_model(**precinct_kwargs)
+            if geoid not in tracts:
+                tracts[geoid] = tract_model(**tract_kwargs)
+            links.add((full_name, geoid))
+
+        self.precincts.add_items(precincts.values())
+        self.tracts.add_items(tracts.values())
+
+        tract_geoids_by_precinct = {}
+        precinct_names_by_tract = {}
+        for full_name, geoid in sorted(links,
+                key=lambda link: (int(link[0]), int(link[1]))):
+            tract_geoids_by_precinct.setdefault(full_name, []).append(geoid)
+            precinct_names_by_tract.setdefault(geoid, []).append(full_name)
+
+        # Most precincts link to a single tract, and tuples are smaller
+        # than lists
+        for full_name, geoids in tract_geoids_by_precinct.items():
+            self._tract_geoids_by_precinct[full_name] = tuple(geoids)
+        for geoid, full_names in precinct_names_by_tract.items():
+            self._precinct_names_by_tract[geoid] = tuple(full_names)
+
+        return self
+
+    def get_tracts_for_precinct(self, full_name):
+        """
+        Return a list of the tracts linked to a precinct.
+
+        ``full_name`` can also be the precinct's integer key,
+        ``ward * 1000 + precinct``.
+        """
+        precinct = self.precincts.get_by('full_name', full_name, None)
+        if precinct is None:
+            return []
+        return [self.tracts.get_by('geoid', geoid) for geoid in
+            self._tract_geoids_by_precinct[precinct.full_name]]
+
+    def get_precincts_for_tract(self, geoid):
+        """Return a list of the precincts linked to a tract"""
+        return [self.precincts.get_by('full_name', full_name) for full_name in
+            self._precinct_names_by_tract.get(str(geoid), ())]
+
+
+@snapshot('chicago_crosswalk', CHICAGO_CROSSWALK_CSV_FILENAME)
+def load_chicago_crosswalk():
+    return ChicagoCrosswalk().from_csv(CHICAGO_CROSSWALK_CSV_FILENAME)
+
+
+def _load_chicago_crosswalk():
+    crosswalk = load_chicago_crosswalk()
+    if shared_tables_enabled():
+        # Only the links between precincts and tracts stay in memory
+        crosswalk.precincts = load_table('chicago_precincts',
+            CHICAGO_CROSSWALK_CSV_FILENAME, PrecinctCollection,
+            lambda: crosswalk.precincts)
+        crosswalk.tracts = load_table('chicago_tracts',
+            CHICAGO_CROSSWALK_CSV_FILENAME, TractCollection,
+            lambda: crosswalk.tracts)
+    return crosswalk
+
+
+CHICAGO_CROSSWALK = LazyDataset(_load_chicago_crosswalk, 'CHICAGO_CROSSWALK',
+    [CHICAGO_CROSSWALK_CSV_FILENAME])
+# Precincts and tracts are read from the crosswalk
+CHICAGO_CROSSWALK.add_dependent(PRECINCTS)
+CHICAGO_CROSSWALK.add_dependent(TRACTS)
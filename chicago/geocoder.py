@@ -0,0 +1,135 @@
+"""
+Find the community area, neighborhood, census tract, precinct or county that
+contains a point.
+
+Boundaries for each layer are read from compact geometry files in the
+package's ``data/geometry`` directory.  They aren't shipped with the
+package, so build them from the source GeoJSON with ``fab build_geometries``
+before using the geocoder.  ``available_layers()`` lists the layers that
+have been built, and locating points in other layers raises ``IOError``.
+A layer's geometry is loaded the first time it's used.
+
+    >>> from chicago.geocoder import available_layers, locate
+    >>> available_layers()
+    ['community_areas', 'cook_suburban_precincts', 'counties', ...]
+    >>> locate(41.8789, -87.6359, 'community_areas')
+    {'community_areas': CommunityArea(name='Loop', number='32')}
+"""
+import os.path
+
+from .base import LazyDataset, DATA_DIRECTORY
+from .batch import check_errors, lookup_many
+from .community_areas import COMMUNITY_AREAS
+from .cook_suburbs.precincts import COOK_SUBURBAN_PRECINCTS
+from .geometry import read_geometry
+from .illinois.counties import COUNTIES
+from .neighborhoods import NEIGHBORHOODS
+from .precincts import PRECINCTS
+from .tracts import TRACTS
+
+GEOMETRY_DIRECTORY = os.path.join(DATA_DIRECTORY, 'geometry')
+
+# Layer name: (collection, field that matches the geometry's feature IDs)
+LAYERS = {
+    'community_areas': (COMMUNITY_AREAS, 'number'),
+    'neighborhoods': (NEIGHBORHOODS, 'name'),
+    'tracts': (TRACTS, 'geoid'),
+    'precincts': (PRECINCTS, 'full_name'),
+    'cook_suburban_precincts': (COOK_SUBURBAN_PRECINCTS, 'precinctid'),
+    'counties': (COUNTIES, 'countyfp'),
+}
+
+
+def get_geometry_filename(layer):
+    return os.path.join(GEOMETRY_DIRECTORY, '{}.geom'.format(layer))
+
+
+def available_layers():
+    """Return the names of the layers whose geometry files have been built"""
+    return [layer for layer in sorted(LAYERS)
+        if os.path.exists(get_geometry_filename(layer))]
+
+
+def _check_layer(layer):
+    if layer not in LAYERS:
+        raise ValueError("Unknown layer '{}', expected one of {}".format(layer,
+            ', '.join(sorted(LAYERS))))
+
+
+def _check_built(layer):
+    path = get_geometry_filename(layer)
+    if not os.path.exists(path):
+        raise IOError("The geometry for the {} layer hasn't been built.  "
+            "Boundary files aren't included in the package, so build them "
+            "from a checkout of the repository with `fab build_geometries`, "
+            "which writes them to {}.".format(layer, GEOMETRY_DIRECTORY))
+
+
+def load_geometry(layer):
+    """Read the ``GeometryLayer`` for one of ``LAYERS``"""
+    _check_layer(layer)
+    _check_built(layer)
+    return read_geometry(get_geometry_filename(layer), layer)
+
+
+GEOMETRIES = dict((layer, LazyDataset(
+        lambda layer=layer: load_geometry(layer), layer.upper(),
+        [get_geometry_filename(layer)]))
+    for layer in LAYERS)
+
+
+def _get_feature(layer, feature_id):
+    if feature_id is None:
+        return None
+    collection, field = LAYERS[layer]
+    return collection.get_by(field, feature_id, None)
+
+
+def locate(lat, lon, layers=None):
+    """
+    Return a dict mapping each of ``layers``, which defaults to all of
+    ``LAYERS``, to the item of that layer's collection that contains a
+    point, or ``None``.
+    """
+    if layers is None:
+        layers = sorted(LAYERS)
+    elif isinstance(layers, str):
+        layers = [layers]
+
+    for layer in layers:
+        _check_layer(layer)
+        _check_built(layer)
+
+    located = {}
+    for layer in layers:
+        located[layer] = _get_feature(layer,
+            GEOMETRIES[layer].locate(lat, lon))
+    return located
+
+
+def locate_many(lats, lons, layer, attr=None, missing=None, errors='coerce'):
+    """
+    Return the items of a layer's collection that contain each of the points
+    with latitudes ``lats`` and longitudes ``lons``.
+
+    ``attr``, ``missing`` and ``errors`` work like they do for
+    ``Collection.get_many_by()``.  Results are NumPy arrays if ``lats`` is a
+    NumPy array.
+    """
+    _check_layer(layer)
+    _check_built(layer)
+    check_errors(errors)
+    feature_ids = GEOMETRIES[layer].locate_many(lats, lons)
+
+    # Points far outnumber features, so only look each feature up once
+    features = {}
+
+    def lookup(feature_id):
+        try:
+            return features[feature_id]
+        except KeyError:
+            feature = features[feature_id] = _get_feature(layer, feature_id)
+            return feature
+
+    return lookup_many(lookup, feature_ids, attr=attr, missing=missing,
+        errors=errors)
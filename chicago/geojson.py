@@ -0,0 +1,139 @@
+"""
+Read and write GeoJSON FeatureCollections one feature at a time.
+
+``iter_features()`` parses a FeatureCollection incrementally, so only the
+feature being read, plus a chunk of the file, is held in memory at once.
+``FeatureWriter`` writes features as they're produced, with the same
+output as ``json.dumps()`` of the whole collection.
+"""
+import json
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader(object):
+    """Decodes consecutive JSON values and punctuation from a text file"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """
+        Drop the text that's been read and append a chunk of the file to the
+        buffer, returning ``False`` at the end of the file
+        """
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+            return False
+        return True
+
+    def peek(self):
+        """Return the next character that isn't whitespace, or '' at the end"""
+        while True:
+            while (self.pos < len(self.buffer)
+                    and self.buffer[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def next_char(self, expected):
+        char = self.peek()
+        if char not in expected:
+            raise ValueError("Expected one of {!r} in GeoJSON, got {!r}".format(
+                expected, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # Probably cut off at the end of the buffer
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof:
+                # A number could continue in the next chunk
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_features(geojson, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over the features of a GeoJSON FeatureCollection, read from a
+    path or a text file object.
+    """
+    if not hasattr(geojson, 'read'):
+        with open(geojson, 'r') as f:
+            for feature in iter_features(f, chunk_size):
+                yield feature
+        return
+
+    reader = _Reader(geojson, chunk_size)
+    reader.next_char('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.next_char(':')
+        if key == 'features':
+            reader.next_char('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.next_char(',]') == ']':
+                        break
+        else:
+            # Other members, like "type" and "crs", are small
+            reader.value()
+
+        if reader.next_char(',}') == '}':
+            return
+
+
+class FeatureWriter(object):
+    """
+    Write a GeoJSON FeatureCollection to a text file one feature at a time.
+
+    Use it as a context manager, or call ``close()`` to finish the
+    collection.  Doesn't close the file.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        self.f.write('{"type": "FeatureCollection", "features": [')
+
+    def write(self, feature):
+        if self.count:
+            self.f.write(', ')
+        self.f.write(json.dumps(feature))
+        self.count += 1
+
+    def close(self):
+        self.f.write(']}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
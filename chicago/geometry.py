@@ -0,0 +1,325 @@
+"""
+Compact boundary geometries and point-in-polygon tests.
+
+Geometries are stored in a small binary format.  Longitudes and latitudes
+are quantized to integer millionths of a degree, about 10cm, and each
+coordinate is stored as its difference from the one before.  Differences
+between neighboring vertices are small, so the zlib-compressed result is
+a fraction of the size of the source GeoJSON.
+
+A file holds one layer of features, like all of the community areas.  Each
+feature is an ID and a list of rings.  The rings of all of a feature's
+polygons, including holes, are kept together, and a point is inside a
+feature if a ray from it crosses the feature's edges an odd number of
+times.
+
+Features are indexed by their bounding boxes in an STR-tree.  With NumPy
+installed, arrays of points are matched against the tree and tested against
+polygon edges in bulk.
+"""
+import itertools
+import json
+import struct
+import zlib
+from array import array
+
+from .batch import is_array
+from .spatial import STRtree
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b'CHIGEOM1'
+
+# Coordinates are stored as integer multiples of 1 / SCALE degrees
+SCALE = 1000000
+
+# Upper bound on the number of point/edge pairs tested at once when
+# testing arrays of points, to bound memory use
+MAX_BATCH_CELLS = 1 << 20
+
+_HEADER = struct.Struct('<I')
+
+
+def _int_array(values=()):
+    a = array('i', values)
+    if a.itemsize != 4:
+        a = array('l', values)
+    return a
+
+
+def _to_little_endian(a):
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _from_little_endian(data):
+    a = _int_array()
+    a.frombytes(data)
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        a.byteswap()
+    return a
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError("Unsupported geometry type '{}'".format(geometry['type']))
+
+
+def _quantize_ring(ring, scale):
+    """
+    Return a ring's quantized ``(x, y)`` vertices, without repeats, ending
+    with its first vertex.
+    """
+    vertices = []
+    for coordinate in ring:
+        vertex = (int(round(coordinate[0] * scale)),
+            int(round(coordinate[1] * scale)))
+        if not vertices or vertex != vertices[-1]:
+            vertices.append(vertex)
+    if vertices and vertices[0] != vertices[-1]:
+        vertices.append(vertices[0])
+    return vertices
+
+
+def encode_features(features, id_property, scale=SCALE):
+    """
+    Encode GeoJSON features, dicts with ``geometry`` and ``properties``, as
+    a layer, identifying each feature by its ``id_property`` property.
+    """
+    ids = []
+    ring_starts = [0]
+    coord_starts = [0]
+    xs = []
+    ys = []
+    for feature in features:
+        ids.append(str(feature['properties'][id_property]))
+        for polygon in _polygons(feature['geometry']):
+            for ring in polygon:
+                vertices = _quantize_ring(ring, scale)
+                if len(vertices) < 4:
+                    continue
+                xs.extend(x for x, y in vertices)
+                ys.extend(y for x, y in vertices)
+                coord_starts.append(len(xs))
+        ring_starts.append(len(coord_starts) - 1)
+
+    def deltas(values):
+        return [b - a for a, b in zip([0] + values, values)]
+
+    header = json.dumps({'ids': ids, 'scale': scale,
+        'counts': [len(ring_starts), len(coord_starts), len(xs)]}).encode('utf-8')
+    payload = b''.join(_to_little_endian(_int_array(values)) for values in
+        (ring_starts, coord_starts, deltas(xs), deltas(ys)))
+    return b''.join([MAGIC, _HEADER.pack(len(header)), header,
+        zlib.compress(payload, 9)])
+
+
+def write_geometry(path, features, id_property, scale=SCALE):
+    """Encode GeoJSON features and write them to a layer file at ``path``"""
+    with open(path, 'wb') as f:
+        f.write(encode_features(features, id_property, scale))
+
+
+def decode_layer(data, name=None):
+    """Return a ``GeometryLayer`` from encoded bytes"""
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a geometry file")
+
+    offset = len(MAGIC)
+    header_length, = _HEADER.unpack_from(data, offset)
+    offset += _HEADER.size
+    header = json.loads(data[offset:offset + header_length].decode('utf-8'))
+    payload = zlib.decompress(data[offset + header_length:])
+
+    arrays = []
+    start = 0
+    for count in header['counts'] + [header['counts'][-1]]:
+        arrays.append(_from_little_endian(payload[start:start + count * 4]))
+        start += count * 4
+    ring_starts, coord_starts, dxs, dys = arrays
+
+    return GeometryLayer(header['ids'], ring_starts, coord_starts,
+        _int_array(itertools.accumulate(dxs)),
+        _int_array(itertools.accumulate(dys)),
+        scale=header['scale'], name=name)
+
+
+def read_geometry(path, name=None):
+    """Return a ``GeometryLayer`` read from the file at ``path``"""
+    with open(path, 'rb') as f:
+        return decode_layer(f.read(), name)
+
+
+class GeometryLayer(object):
+    """
+    A set of features with polygon boundaries that points can be located in.
+
+    ``ring_starts`` holds the position of each feature's first ring in
+    ``coord_starts``, which holds the position of each ring's first vertex
+    in ``xs`` and ``ys``.  Both have an extra item at the end.
+    """
+
+    def __init__(self, ids, ring_starts, coord_starts, xs, ys, scale=SCALE,
+            name=None):
+        self.name = name
+        self.ids = list(ids)
+        self.scale = scale
+        self._rings = []
+        boxes = []
+        for i in range(len(self.ids)):
+            rings = []
+            for r in range(ring_starts[i], ring_starts[i + 1]):
+                start, end = coord_starts[r], coord_starts[r + 1]
+                rings.append((xs[start:end], ys[start:end]))
+            self._rings.append(rings)
+            if rings:
+                boxes.append((
+                    min(min(rxs) for rxs, rys in rings),
+                    min(min(rys) for rxs, rys in rings),
+                    max(max(rxs) for rxs, rys in rings),
+                    max(max(rys) for rxs, rys in rings)))
+            else:
+                # Never matches
+                boxes.append((1, 1, 0, 0))
+
+        self._tree = STRtree(boxes)
+        self._edges = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return "GeometryLayer(name={!r}, features={})".format(self.name,
+            len(self))
+
+    def bounds(self, position):
+        """Return the ``(min lon, min lat, max lon, max lat)`` of a feature"""
+        return tuple(value / float(self.scale)
+            for value in self._tree.boxes[position])
+
+    def _contains(self, position, x, y):
+        inside = False
+        for rxs, rys in self._rings[position]:
+            x1 = rxs[0]
+            y1 = rys[0]
+            for x2, y2 in zip(rxs, rys):
+                if ((y1 > y) != (y2 > y)
+                        and x < (x2 - x1) * (y - y1) / float(y2 - y1) + x1):
+                    inside = not inside
+                x1 = x2
+                y1 = y2
+        return inside
+
+    def _position(self, lat, lon):
+        x = int(round(lon * self.scale))
+        y = int(round(lat * self.scale))
+        for position in self._tree.query_point(x, y):
+            if self._contains(position, x, y):
+                return position
+        return -1
+
+    def locate(self, lat, lon):
+        """Return the ID of the feature that contains a point, or ``None``"""
+        position = self._position(lat, lon)
+        if position < 0:
+            return None
+        return self.ids[position]
+
+    def _feature_edges(self, position):
+        """
+        Return NumPy arrays of the start x, start y, end y and inverse slope
+        of each of a feature's edges, skipping horizontal ones, which a
+        horizontal ray never crosses.
+        """
+        try:
+            return self._edges[position]
+        except KeyError:
+            pass
+
+        x1 = []
+        y1 = []
+        x2 = []
+        y2 = []
+        for rxs, rys in self._rings[position]:
+            x1.extend(rxs[:-1])
+            y1.extend(rys[:-1])
+            x2.extend(rxs[1:])
+            y2.extend(rys[1:])
+        x1, y1, x2, y2 = (numpy.array(values, dtype=numpy.float64)
+            for values in (x1, y1, x2, y2))
+        sloped = y1 != y2
+        x1, y1, x2, y2 = x1[sloped], y1[sloped], x2[sloped], y2[sloped]
+        edges = self._edges[position] = (x1, y1, y2, (x2 - x1) / (y2 - y1))
+        return edges
+
+    def _contains_many(self, position, xs, ys):
+        x1, y1, y2, slope = self._feature_edges(position)
+        # Only edges that span the points' latitudes can be crossed
+        spans = ((numpy.maximum(y1, y2) > ys.min())
+            & (numpy.minimum(y1, y2) <= ys.max()))
+        x1, y1, y2, slope = x1[spans], y1[spans], y2[spans], slope[spans]
+
+        inside = numpy.zeros(len(xs), dtype=bool)
+        if len(x1) == 0:
+            return inside
+
+        step = max(1, MAX_BATCH_CELLS // len(x1))
+        for start in range(0, len(xs), step):
+            px = xs[start:start + step, None]
+            py = ys[start:start + step, None]
+            crossings = (((y1 > py) != (y2 > py))
+                & (px < (py - y1) * slope + x1))
+            inside[start:start + step] = crossings.sum(axis=1) % 2 == 1
+        return inside
+
+    def _positions_many(self, lats, lons):
+        xs = numpy.rint(numpy.asarray(lons, dtype=numpy.float64) * self.scale)
+        ys = numpy.rint(numpy.asarray(lats, dtype=numpy.float64) * self.scale)
+        positions = numpy.full(len(xs), -1, dtype=numpy.int64)
+
+        # Test features in order, so a point in overlapping features gets
+        # the first, like it does in locate()
+        candidates = sorted(self._tree.query_points(xs, ys),
+            key=lambda candidate: candidate[0])
+        for position, indices in candidates:
+            indices = indices[positions[indices] < 0]
+            if len(indices) == 0:
+                continue
+            inside = self._contains_many(position, xs[indices], ys[indices])
+            positions[indices[inside]] = position
+        return positions
+
+    def locate_many(self, lats, lons):
+        """
+        Return the IDs of the features that contain each of the points with
+        latitudes ``lats`` and longitudes ``lons``, with ``None`` for points
+        outside every feature.
+
+        Results are a NumPy object array if ``lats`` is a NumPy array,
+        otherwise a list.
+        """
+        if not is_array(lats):
+            lats = list(lats)
+        if not is_array(lons):
+            lons = list(lons)
+        if len(lats) != len(lons):
+            raise ValueError("lats and lons must be the same length")
+
+        if numpy is None:
+            return [self.locate(lat, lon) for lat, lon in zip(lats, lons)]
+
+        ids = numpy.empty(len(self.ids) + 1, dtype=object)
+        ids[:-1] = self.ids
+        # Position -1 picks the trailing None
+        results = ids[self._positions_many(lats, lons)]
+        if is_array(lats):
+            return results
+        return results.tolist()
@@ -0,0 +1,295 @@
+"""
+The hierarchy of Chicago and suburban Cook County geographies: precincts
+are in census tracts, tracts are in community areas and counties, and
+community areas are in counties.
+
+The whole hierarchy, with every ancestor and descendant of every area, is
+built once, the first time it's used.  After that, going up or down any
+number of levels is a single lookup::
+
+    >>> from chicago import ancestors, descendants, PRECINCTS
+    >>> ancestors(PRECINCTS.get_by_full_name('39012'), 'community_area')
+    [CommunityArea(name='Albany Park', number='14')]
+    >>> len(descendants(('community_area', 14), 'precinct'))
+    23
+
+Areas are given as models, or as ``(level, id)`` pairs.  The levels are:
+
+``precinct``
+    Chicago precincts, by full name, like ``'39012'``
+``suburban_precinct``
+    Suburban Cook County precincts, by precinct ID, like ``'7000003'``
+``tract``
+    Census tracts, by GEOID.  Suburban tracts aren't in ``TRACTS``, so
+    they're ``Tract`` models with only their GEOID and state and county
+    FIPS codes set.
+``community_area``
+    Chicago community areas, by number
+``county``
+    Illinois counties, by county FIPS code
+"""
+from .base import LazyDataset
+from .community_areas import COMMUNITY_AREAS, CommunityArea
+from .cook_suburbs.precincts import (COOK_SUBURBAN_CROSSWALK,
+    COOK_SUBURBAN_PRECINCTS, CookSuburbanPrecinct)
+from .crosswalk import CHICAGO_CROSSWALK
+from .illinois.counties import COUNTIES, County
+from .precincts import Precinct
+from .tracts import Tract
+
+LEVELS = ('precinct', 'suburban_precinct', 'tract', 'community_area',
+    'county')
+
+# The level of each model class, and the field that identifies it
+MODEL_LEVELS = [
+    (Precinct, 'precinct', 'full_name'),
+    (CookSuburbanPrecinct, 'suburban_precinct', 'precinctid'),
+    (Tract, 'tract', 'geoid'),
+    (CommunityArea, 'community_area', 'number'),
+    (County, 'county', 'countyfp'),
+]
+
+
+def _node(level, id):
+    """
+    Return the key of an area in the hierarchy.  IDs are compared as
+    integers, so ``'031'`` and ``31`` are the same county.
+    """
+    return (level, int(id))
+
+
+class GeographyHierarchy(object):
+    """
+    Closure table of the areas above and below each area.
+
+    Each area's ancestors, at every level, are stored in a tuple, and its
+    descendants in a tuple for each level, so lookups don't walk the
+    hierarchy.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._parents = {}
+        self._ancestors = {}
+        self._descendants = {}
+        self._rollups = {}
+
+    def __repr__(self):
+        return "GeographyHierarchy(areas={})".format(len(self._models))
+
+    def add(self, level, model, parents=()):
+        """
+        Add an area, with the ``(level, id)`` keys of the areas directly
+        above it.  Returns the area's key.
+        """
+        for cls, model_level, field in MODEL_LEVELS:
+            if model_level == level:
+                break
+        else:
+            raise ValueError("Unknown level '{}'".format(level))
+        node = _node(level, getattr(model, field))
+        self._models.setdefault(node, model)
+        self._parents.setdefault(node, set()).update(parents)
+        return node
+
+    def build(self):
+        """Compute the closure of the areas that have been added"""
+        ancestors = {}
+
+        def get_ancestors(node, path=()):
+            if node in ancestors:
+                return ancestors[node]
+            if node in path:
+                raise ValueError("Cycle in the hierarchy at {}".format(node))
+            found = set()
+            for parent in self._parents.get(node, ()):
+                if parent not in self._models:
+                    raise ValueError("{} has unknown parent {}".format(node,
+                        parent))
+                found.add(parent)
+                found.update(get_ancestors(parent, path + (node,)))
+            ancestors[node] = found
+            return found
+
+        descendants = {}
+        for node in sorted(self._models):
+            node_ancestors = get_ancestors(node)
+            self._ancestors[node] = tuple(sorted(node_ancestors,
+                key=_level_order))
+            for ancestor in node_ancestors:
+                descendants.setdefault(ancestor, {}).setdefault(node[0],
+                    []).append(node)
+
+        for node, by_level in descendants.items():
+            self._descendants[node] = dict((level, tuple(nodes))
+                for level, nodes in by_level.items())
+        self._rollups = {}
+        return self
+
+    def _get_node(self, area):
+        """Return the key of a model or ``(level, id)`` pair"""
+        if isinstance(area, tuple):
+            level, id = area
+            if level not in LEVELS:
+                raise ValueError("Unknown level '{}', expected one of "
+                    "{}".format(level, ', '.join(LEVELS)))
+            try:
+                node = _node(level, id)
+            except (TypeError, ValueError):
+                raise KeyError(area)
+        else:
+            for cls, level, field in MODEL_LEVELS:
+                if isinstance(area, cls):
+                    node = _node(level, getattr(area, field))
+                    break
+            else:
+                raise TypeError("Expected a geography model or (level, id) "
+                    "pair, got {!r}".format(area))
+
+        if node not in self._models:
+            raise KeyError(area)
+        return node
+
+    @staticmethod
+    def _check_level(level):
+        if level is not None and level not in LEVELS:
+            raise ValueError("Unknown level '{}', expected one of {}".format(
+                level, ', '.join(LEVELS)))
+
+    def get(self, level, id):
+        """Return the model for an area, raising ``KeyError`` if there's none"""
+        return self._models[self._get_node((level, id))]
+
+    def ancestors(self, area, level=None):
+        """
+        Return a list of the areas that contain ``area``, from the smallest
+        level up, or only the ones at ``level``.
+        """
+        self._check_level(level)
+        return [self._models[node]
+            for node in self._ancestors[self._get_node(area)]
+            if level is None or node[0] == level]
+
+    def descendants(self, area, level=None):
+        """
+        Return a list of the areas in ``area``, in order of their IDs, or only
+        the ones at ``level``.
+        """
+        self._check_level(level)
+        by_level = self._descendants.get(self._get_node(area), {})
+        if level is not None:
+            return [self._models[node] for node in by_level.get(level, ())]
+        return [self._models[node]
+            for node in sorted((node for nodes in by_level.values()
+                for node in nodes), key=_level_order)]
+
+    def rollup(self, from_level, to_level):
+        """
+        Return a dict of the ID of each area at ``from_level`` to a tuple of
+        the IDs of the areas at ``to_level`` that contain it, like
+        ``{'39012': ('14',)}`` from precincts to community areas.  The dict
+        is built once for each pair of levels and shared.
+        """
+        self._check_level(from_level)
+        self._check_level(to_level)
+        key = (from_level, to_level)
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = {}
+            for node, node_ancestors in self._ancestors.items():
+                if node[0] == from_level:
+                    rollup[self._get_id(node)] = tuple(
+                        self._get_id(ancestor) for ancestor in node_ancestors
+                        if ancestor[0] == to_level)
+            self._rollups[key] = rollup
+        return rollup
+
+    def _get_id(self, node):
+        for cls, level, field in MODEL_LEVELS:
+            if level == node[0]:
+                return getattr(self._models[node], field)
+
+
+def _level_order(node):
+    return (LEVELS.index(node[0]), node[1])
+
+
+def _suburban_tract(geoid):
+    # Tract GEOIDs start with the two-digit state and three-digit county FIPS
+    return Tract(geoid=geoid, statefp=geoid[:2], countyfp=geoid[2:5],
+        name=None, commarea_num=None)
+
+
+def load_hierarchy():
+    hierarchy = GeographyHierarchy()
+
+    for county in COUNTIES:
+        hierarchy.add('county', county)
+
+    for community_area in COMMUNITY_AREAS:
+        hierarchy.add('community_area', community_area)
+
+    crosswalk = CHICAGO_CROSSWALK.load()
+    community_area_counties = {}
+    for tract in crosswalk.tracts:
+        county = _node('county', tract.countyfp)
+        parents = [county]
+        if tract.commarea_num:
+            community_area = _node('community_area', tract.commarea_num)
+            parents.append(community_area)
+            community_area_counties.setdefault(community_area, set()).add(
+                county)
+        hierarchy.add('tract', tract, parents)
+
+    # Community areas are in the counties their tracts are in
+    for community_area, counties in community_area_counties.items():
+        hierarchy._parents[community_area].update(counties)
+
+    for precinct in crosswalk.precincts:
+        hierarchy.add('precinct', precinct, [_node('tract', tract.geoid)
+            for tract in crosswalk.get_tracts_for_precinct(
+                precinct.full_name)])
+
+    for precinct in COOK_SUBURBAN_PRECINCTS:
+        geoid = COOK_SUBURBAN_CROSSWALK.get_tract_geoid(precinct.precinctid,
+            'precinct_number')
+        parents = []
+        if geoid is not None:
+            tract = _node('tract', geoid)
+            if tract not in hierarchy._models:
+                hierarchy.add('tract', _suburban_tract(geoid),
+                    [_node('county', geoid[2:5])])
+            parents.append(tract)
+        hierarchy.add('suburban_precinct', precinct, parents)
+
+    return hierarchy.build()
+
+
+HIERARCHY = LazyDataset(load_hierarchy, 'HIERARCHY')
+for _dataset in (COUNTIES, COMMUNITY_AREAS, CHICAGO_CROSSWALK,
+        COOK_SUBURBAN_PRECINCTS, COOK_SUBURBAN_CROSSWALK):
+    _dataset.add_dependent(HIERARCHY)
+
+
+def ancestors(area, level=None):
+    """
+    Return the areas that contain ``area``, a model or ``(level, id)`` pair,
+    optionally only the ones at ``level``.
+    """
+    return HIERARCHY.ancestors(area, level)
+
+
+def descendants(area, level=None):
+    """
+    Return the areas in ``area``, a model or ``(level, id)`` pair, optionally
+    only the ones at ``level``.
+    """
+    return HIERARCHY.descendants(area, level)
+
+
+def get_rollup(from_level, to_level):
+    """
+    Return a dict of area IDs at ``from_level`` to the IDs of the areas
+    at ``to_level`` that contain them.
+    """
+    return HIERARCHY.rollup(from_level, to_level)
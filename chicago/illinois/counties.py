@@ -1,8 +1,8 @@
 import os.path
-import sys
-sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
 
-from base import Model, Collection, DATA_DIRECTORY
+from ..base import (Model, Collection, DirectIndex, Index, LazyDataset,
+    Ordering, DATA_DIRECTORY)
+from ..snapshot import snapshot
 
 COUNTY_CSV_FILENAME = os.path.join(DATA_DIRECTORY, 'county_fips.csv')
 
@@ -24,16 +24,14 @@ class County(Model):
 
 class CountyCollection(Collection):
     model = County
-
-    def __init__(self):
-        self._by_fips = {}
-        self._by_name = {}
-        super(CountyCollection, self).__init__()
-
-    def add_item(self, item):
-        super(CountyCollection, self).add_item(item)
-        self._by_fips[item.countyfp] = item
-        self._by_name[item.countyname.lower()] = item
+    indexes = [
+        DirectIndex('countyfp'),
+        Index('countyname', ignore_case=True),
+    ]
+    ordering = Ordering('countyname')
+    name_field = 'countyname'
+    interned_fields = ['state', 'statefp']
+    categorical_fields = ['state', 'statefp']
 
     def transform_row(self, row):
         return {
@@ -44,14 +42,16 @@ class CountyCollection(Collection):
         }
 
     def get_by_name(self, name):
-        return self._by_name.get(str(name).lower(), None)
+        return self.get_by('countyname', name, None)
 
     def get_by_fips(self, fips):
-        return self._by_fips.get(str(fips), None)
+        return self.get_by('countyfp', fips, None)
+
+
+@snapshot('counties', COUNTY_CSV_FILENAME, CountyCollection)
+def load_counties():
+    return CountyCollection().from_csv(COUNTY_CSV_FILENAME)
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda c: c.countyname)
-        return self
 
+COUNTIES = LazyDataset(load_counties, 'COUNTIES')
 
-COUNTIES = CountyCollection().from_csv(COUNTY_CSV_FILENAME)
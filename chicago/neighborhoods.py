@@ -1,6 +1,8 @@
 import os.path
 
-from .base import Model, Collection, DATA_DIRECTORY
+from .base import (Model, Collection, Index, LazyDataset, Ordering,
+    DATA_DIRECTORY)
+from .snapshot import snapshot
 
 NEIGHBORHOOD_CSV_FILENAME = os.path.join(DATA_DIRECTORY,
     'Neighborhoods_2012b.csv')
@@ -20,16 +22,25 @@ class Neighborhood(Model):
 
 class NeighborhoodCollection(Collection):
     model = Neighborhood
+    indexes = [
+        Index('name', ignore_case=True),
+    ]
+    ordering = Ordering('name')
+    name_field = 'name'
 
     def transform_row(self, row):
         return {
             'name': row['PRI_NEIGH'],
         }
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda n: n.name)
-        return self
+    def get_by_name(self, name):
+        return self.get_by('name', name, None)
+
 
+@snapshot('neighborhoods', NEIGHBORHOOD_CSV_FILENAME,
+    NeighborhoodCollection)
+def load_neighborhoods():
+    return NeighborhoodCollection().from_csv(NEIGHBORHOOD_CSV_FILENAME)
 
 
-NEIGHBORHOODS = NeighborhoodCollection().from_csv(NEIGHBORHOOD_CSV_FILENAME)
+NEIGHBORHOODS = LazyDataset(load_neighborhoods, 'NEIGHBORHOODS')
@@ -1,6 +1,7 @@
 import os.path
 
-from .base import Model, Collection, DATA_DIRECTORY
+from .base import (Model, Collection, DirectIndex, LazyDataset, Ordering,
+    DATA_DIRECTORY)
 
 PRECINCT_CSV_FILENAME = os.path.join(DATA_DIRECTORY, 'chicago_precinct_census_tract_crosswalk.csv')
 
@@ -22,14 +23,14 @@ class Precinct(Model):
 
 class PrecinctCollection(Collection):
     model = Precinct
-
-    def __init__(self):
-        self._by_full_name = {}
-        super(PrecinctCollection, self).__init__()
-
-    def add_item(self, item):
-        super(PrecinctCollection, self).add_item(item)
-        self._by_full_name[item.full_name] = item
+    indexes = [
+        # A full name is the ward number followed by the zero-padded
+        # precinct number, so it's also ward * 1000 + precinct
+        DirectIndex('full_name', radix=1000),
+    ]
+    ordering = Ordering('full_name', 'int')
+    interned_fields = ['number', 'ward', 'census_tract_geoid']
+    categorical_fields = ['number', 'ward']
 
     def transform_row(self, row):
         return {
@@ -40,19 +41,40 @@ class PrecinctCollection(Collection):
         }
 
     def get_by_full_name(self, full_name):
-        return self._by_full_name[str(full_name)]
+        return self.get_by('full_name', full_name)
+
+    def filter_by_wards(self, first, last=None):
+        """
+        Return an ``ItemRange`` of the precincts in wards ``first`` through
+        ``last``, or only in ward ``first``
+        """
+        if last is None:
+            last = first
+        return self.filter_by_range('full_name',
+            pack_ward_precinct(first, 0), pack_ward_precinct(last, 999))
+
+
+def pack_ward_precinct(ward, precinct):
+    """
+    Return the integer key for a ward and precinct, ``ward * 1000 + precinct``.
+    """
+    ward = int(ward)
+    precinct = int(precinct)
+    if ward < 0 or not 0 <= precinct < 1000:
+        raise ValueError("Invalid ward {} and precinct {}".format(ward,
+            precinct))
+    return ward * 1000 + precinct
+
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda p: int(p.full_name))
-        return self
+def load_precincts():
+    # Precincts and tracts are both read from the same crosswalk file
+    from .crosswalk import CHICAGO_CROSSWALK
+    return CHICAGO_CROSSWALK.load().precincts
 
 
-PRECINCTS = PrecinctCollection().from_csv(PRECINCT_CSV_FILENAME)
+PRECINCTS = LazyDataset(load_precincts, 'PRECINCTS')
 
 
 def get_precincts_from_tract_geoid(geoid):
-    matching_precincts = []
-    for precinct in PRECINCTS:
-        if precinct.census_tract_geoid == str(geoid):
-            matching_precincts.append(precinct)
-    return matching_precincts
+    from .crosswalk import CHICAGO_CROSSWALK
+    return CHICAGO_CROSSWALK.get_precincts_for_tract(geoid)
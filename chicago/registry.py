@@ -0,0 +1,163 @@
+"""
+Datasets that come in several vintages, like precinct maps, which are
+redrawn every few years.
+
+``dataset(name, vintage)`` returns a lazily loaded collection for one
+vintage of a dataset.  The first time a vintage is used, its CSV file is
+compiled to a memory-mapped binary table in the snapshot directory, see
+``chicago.snapshot.load_table()``.  Later loads map the table instead of
+reading the CSV, so keeping many vintages available costs almost nothing
+until one is queried.
+
+Vintages are found by matching a dataset's filename pattern against the
+package's data directory, so a vintage built with, for example,
+``fab build_suburban_cook_precincts_csv:vintage=2020`` is picked up
+automatically.  ``register_vintage()`` adds a vintage stored somewhere else.
+"""
+import functools
+import os
+import re
+import threading
+
+from .base import DATA_DIRECTORY, LazyDataset
+from .cook_suburbs.precincts import CookSuburbanPrecinctCollection
+from .crosswalk import CHICAGO_CROSSWALK_CSV_FILENAME, ChicagoCrosswalk
+from .precincts import PrecinctCollection
+from .snapshot import load_table
+from .tracts import TractCollection
+
+
+class DatasetVintages(object):
+    """
+    The vintages of a dataset.
+
+    ``build`` takes the path of a vintage's CSV file and returns an instance
+    of ``collection_class``.  It defaults to reading the file with
+    ``collection_class().from_csv()``.
+
+    ``pattern`` is a filename with a ``{vintage}`` placeholder, matched
+    against the files in ``directory``.  ``files`` is a dict of vintages to
+    the paths of files that don't match the pattern.  If ``default_vintage``
+    isn't given, the latest vintage is the default.
+    """
+
+    def __init__(self, name, collection_class, build=None, pattern=None,
+            files=None, default_vintage=None, directory=DATA_DIRECTORY):
+        self.name = name
+        self.collection_class = collection_class
+        self.build = build or (lambda path: collection_class().from_csv(path))
+        self.pattern = pattern
+        self.files = dict((int(vintage), path)
+            for vintage, path in (files or {}).items())
+        self.default_vintage = default_vintage
+        self.directory = directory
+
+    def get_files(self):
+        """Return a dict of vintages to the paths of their files"""
+        files = {}
+        if self.pattern is not None:
+            prefix, suffix = self.pattern.split('{vintage}')
+            regex = re.compile('^{}(\\d+){}$'.format(re.escape(prefix),
+                re.escape(suffix)))
+            try:
+                filenames = os.listdir(self.directory)
+            except OSError:
+                filenames = []
+            for filename in filenames:
+                match = regex.match(filename)
+                if match:
+                    files[int(match.group(1))] = os.path.join(
+                        self.directory, filename)
+        files.update(self.files)
+        return files
+
+    def get_file(self, vintage=None):
+        """
+        Return a ``(vintage, path)`` pair for ``vintage``, or for the default
+        vintage if it's ``None``
+        """
+        files = self.get_files()
+        if vintage is None:
+            vintage = self.default_vintage
+            if vintage is None and files:
+                vintage = max(files)
+        try:
+            vintage = int(vintage)
+            return vintage, files[vintage]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("No vintage {} of {}. Available vintages: "
+                "{}".format(vintage, self.name,
+                    ', '.join(str(v) for v in sorted(files)) or 'none'))
+
+
+REGISTRY = {
+    'cook_suburban_precincts': DatasetVintages('cook_suburban_precincts',
+        CookSuburbanPrecinctCollection,
+        pattern='cook_suburban_precincts_as_of_{vintage}.csv',
+        default_vintage=2016),
+    'precincts': DatasetVintages('precincts', PrecinctCollection,
+        build=lambda path: ChicagoCrosswalk().from_csv(path).precincts,
+        pattern='chicago_precinct_census_tract_crosswalk_as_of_{vintage}.csv',
+        files={2016: CHICAGO_CROSSWALK_CSV_FILENAME},
+        default_vintage=2016),
+    # The crosswalk's tract GEOIDs are from the 2010 census
+    'tracts': DatasetVintages('tracts', TractCollection,
+        build=lambda path: ChicagoCrosswalk().from_csv(path).tracts,
+        files={2010: CHICAGO_CROSSWALK_CSV_FILENAME},
+        default_vintage=2010),
+}
+
+# LazyDatasets for the vintages that have been asked for, keyed by dataset
+# name, vintage and path
+_datasets = {}
+_lock = threading.Lock()
+
+
+def _get_registered(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError("Unknown dataset {}".format(name))
+
+
+def register(name, collection_class, build=None, pattern=None, files=None,
+        default_vintage=None, directory=DATA_DIRECTORY):
+    """Add a dataset to the registry.  See ``DatasetVintages``."""
+    REGISTRY[name] = DatasetVintages(name, collection_class, build, pattern,
+        files, default_vintage, directory)
+
+
+def register_vintage(name, vintage, path):
+    """Add a vintage of a registered dataset, read from the CSV file ``path``"""
+    _get_registered(name).files[int(vintage)] = path
+
+
+def vintages(name):
+    """Return a sorted list of the vintages of a dataset"""
+    return sorted(_get_registered(name).get_files())
+
+
+def _load(registered, vintage, path):
+    return load_table('{}_{}'.format(registered.name, vintage), path,
+        registered.collection_class,
+        functools.partial(registered.build, path))
+
+
+def dataset(name, vintage=None):
+    """
+    Return one vintage of a dataset, like
+    ``dataset('cook_suburban_precincts', vintage=2016)``, as a collection
+    that's loaded the first time it's used.
+
+    Raises ``ValueError`` for unknown datasets and vintages.
+    """
+    registered = _get_registered(name)
+    vintage, path = registered.get_file(vintage)
+    key = (name, vintage, path)
+    with _lock:
+        lazy = _datasets.get(key)
+        if lazy is None:
+            lazy = _datasets[key] = LazyDataset(
+                functools.partial(_load, registered, vintage, path),
+                '{}:{}'.format(name, vintage), [path])
+    return lazy
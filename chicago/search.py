@@ -0,0 +1,188 @@
+"""
+Typo-tolerant and prefix search over the names of places.
+
+Each named collection builds a ``NameIndex`` over its names the first time
+it's searched.  Names are normalized to lowercase words, and indexed two
+ways:
+
+* the words of every name, sorted, so the names with a word starting with
+  each word of the query are found by binary search.  ``'logan sq'``
+  matches ``'Logan Square'``.
+* the trigrams, the runs of three characters, of every name, so names that
+  share most of their trigrams with the query are found even if it's
+  misspelled.  ``'Humbolt Park'`` matches ``'Humboldt Park'``.
+
+Matches are ranked by a score from 0 to 1::
+
+    >>> from chicago import NEIGHBORHOODS, search
+    >>> NEIGHBORHOODS.search('humbolt park')[0]
+    Match(name='Humboldt Park', score=0.8, items=[...], dataset=None)
+    >>> search('logan sq', limit=1)
+    [Match(name='Logan Square', score=0.848, items=[...], dataset='COMMUNITY_AREAS')]
+"""
+import bisect
+import re
+from collections import namedtuple
+
+# The collections searched by ``search()``
+SEARCHABLE_DATASETS = ['COMMUNITY_AREAS', 'NEIGHBORHOODS', 'COUNTIES',
+    'COOK_SUBURBAN_PRECINCTS']
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+class Match(namedtuple('Match', ['name', 'score', 'items', 'dataset'])):
+    """
+    A name that matches a query, its score, and the items with that name.
+    ``dataset`` is the name of the collection searched by ``search()``.
+    """
+    __slots__ = ()
+
+    @property
+    def item(self):
+        """The first item with the name"""
+        return self.items[0]
+
+
+def normalize(name):
+    """Return ``name`` in lowercase, with words separated by single spaces"""
+    return _NON_WORD.sub(' ', str(name).lower()).strip()
+
+
+def trigrams(normalized):
+    """Return the set of trigrams of a normalized name"""
+    padded = ' {} '.format(normalized)
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class NameIndex(object):
+    """
+    Word prefix and trigram indexes over names.
+
+    ``names`` is an iterable of ``(name, item)`` pairs.  Items with the same
+    name, once it's normalized, are grouped into a single match.
+    """
+
+    def __init__(self, names):
+        self._names = []
+        self._items = []
+        self._lengths = []
+        self._trigram_counts = []
+        numbers = {}
+        words = []
+        postings = {}
+        for name, item in names:
+            if name is None:
+                continue
+            normalized = normalize(name)
+            try:
+                self._items[numbers[normalized]].append(item)
+                continue
+            except KeyError:
+                pass
+            number = numbers[normalized] = len(self._names)
+            self._names.append(name)
+            self._items.append([item])
+            self._lengths.append(len(normalized.replace(' ', '')))
+            grams = trigrams(normalized)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(number)
+            for word in set(normalized.split()):
+                words.append((word, number))
+
+        self._numbers = numbers
+        words.sort()
+        self._words = [word for word, number in words]
+        self._word_numbers = [number for word, number in words]
+        self._postings = dict((gram, tuple(numbers))
+            for gram, numbers in postings.items())
+
+    def __len__(self):
+        return len(self._names)
+
+    def _prefix_matches(self, query_words):
+        """
+        Return the numbers of the names with a word starting with each of
+        ``query_words``
+        """
+        matches = None
+        for word in query_words:
+            start = bisect.bisect_left(self._words, word)
+            # Every word starting with ``word`` sorts before ``word + '{'``,
+            # since '{' follows the letters and digits
+            stop = bisect.bisect_left(self._words, word + '{', start)
+            numbers = set(self._word_numbers[start:stop])
+            matches = numbers if matches is None else matches & numbers
+            if not matches:
+                break
+        return matches or set()
+
+    def search(self, query, limit=10, min_score=0.3):
+        """
+        Return a list of up to ``limit`` ``Match`` tuples for the names that
+        match ``query`` with at least ``min_score``, best first.
+
+        An exact match scores 1.  A name whose words start with each of the
+        query's words scores from 0.6 to 0.99, by how much of the name the
+        query covers.  Other names score the Dice coefficient of their
+        trigrams and the query's.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+
+        scores = {}
+        exact = self._numbers.get(normalized)
+        if exact is not None:
+            scores[exact] = 1.0
+
+        query_length = len(normalized.replace(' ', ''))
+        for number in self._prefix_matches(normalized.split()):
+            if number != exact:
+                scores[number] = 0.6 + 0.39 * min(1.0,
+                    float(query_length) / self._lengths[number])
+
+        query_grams = trigrams(normalized)
+        shared = {}
+        postings = self._postings
+        for gram in query_grams:
+            for number in postings.get(gram, ()):
+                shared[number] = shared.get(number, 0) + 1
+        total = len(query_grams)
+        for number, count in shared.items():
+            score = 2.0 * count / (total + self._trigram_counts[number])
+            if score > scores.get(number, 0):
+                scores[number] = score
+
+        ranked = sorted((number for number, score in scores.items()
+                if score >= min_score),
+            key=lambda number: (-scores[number], self._names[number]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [Match(self._names[number], round(scores[number], 3),
+            self._items[number], None) for number in ranked]
+
+
+def search(query, datasets=None, limit=10, min_score=0.3):
+    """
+    Search the names in several collections at once, by default the ones in
+    ``SEARCHABLE_DATASETS``, and return the best ``limit`` matches across
+    all of them.  Each match's ``dataset`` is the name of its collection.
+    """
+    import chicago
+
+    if datasets is None:
+        datasets = SEARCHABLE_DATASETS
+    matches = []
+    for name in datasets:
+        try:
+            collection = chicago.DATASETS[name.upper()]
+        except KeyError:
+            raise ValueError("Unknown dataset {}".format(name))
+        matches.extend(match._replace(dataset=name.upper())
+            for match in collection.search(query, limit, min_score))
+    matches.sort(key=lambda match: (-match.score, match.name))
+    if limit is not None:
+        matches = matches[:limit]
+    return matches
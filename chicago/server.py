@@ -0,0 +1,422 @@
+"""
+An HTTP service for geography lookups, for applications that would rather
+ask one shared process than each load the datasets themselves.
+
+The datasets are loaded once, and the responses for every item and
+relation are serialized to JSON ahead of time.  Requests are served by
+worker processes forked after loading, each running an asyncio event loop
+on the same listening socket.  Only the standard library is needed, and it
+requires Python 3.5 or later::
+
+    python -m chicago serve --port 8000 --workers 4
+
+Items are looked up by the field their collection is indexed on::
+
+    GET /community_areas/22
+    GET /neighborhoods/Humboldt%20Park
+    GET /counties/031
+    GET /tracts/17031842400
+    GET /precincts/39012
+    GET /cook_suburban_precincts/7000003
+
+and crosswalks follow a relation from an item::
+
+    GET /precincts/39012/tract
+    GET /tracts/17031842400/precincts
+    GET /cook_suburban_precincts/7000003/tract
+    GET /tracts/17031804202/cook_suburban_precincts
+
+``GET /search?q=logan+sq`` searches names, see ``chicago.search``.
+
+With ``--watch``, each worker watches the data files and, when one changes,
+reloads its datasets and serializes the responses again, see
+``chicago.watch``.  Until the new responses are ready, requests are answered
+from the old ones.
+``POST /batch`` with a JSON list of paths returns a JSON list of their
+responses, in the same order.  Errors are JSON objects with ``error`` and
+``status`` keys, and in a batch they take the place of the missing result.
+"""
+import asyncio
+import collections
+import json
+import os
+import signal
+import socket
+import sys
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from . import DATASETS, preload
+from .cook_suburbs.precincts import (
+    get_suburban_cook_precincts_from_tract_geoid,
+    get_suburban_cook_tract_from_precinct_number)
+from .precincts import get_precincts_from_tract_geoid
+from .search import search
+from .tracts import get_tract_from_precinct_id
+from .watch import watch
+
+# Path name of each collection, with the dataset and indexed field its
+# items are looked up by
+COLLECTIONS = collections.OrderedDict([
+    ('community_areas', ('COMMUNITY_AREAS', 'number')),
+    ('neighborhoods', ('NEIGHBORHOODS', 'name')),
+    ('counties', ('COUNTIES', 'countyfp')),
+    ('tracts', ('TRACTS', 'geoid')),
+    ('precincts', ('PRECINCTS', 'full_name')),
+    ('cook_suburban_precincts', ('COOK_SUBURBAN_PRECINCTS', 'precinctid')),
+])
+
+
+def _get_suburban_tract(precinct_id):
+    geoid = get_suburban_cook_tract_from_precinct_number(precinct_id,
+        'precinct_number')
+    if geoid is None:
+        return None
+    return {'tract_geoid': geoid}
+
+
+def _get_suburban_precincts(geoid):
+    precincts = DATASETS['COOK_SUBURBAN_PRECINCTS']
+    return [precincts.get_by_precinct_id(precinct_id) for precinct_id in
+        get_suburban_cook_precincts_from_tract_geoid(geoid, 'precinct_number')]
+
+
+# Lookups for ``/<collection>/<key>/<relation>``
+RELATIONS = {
+    ('precincts', 'tract'): get_tract_from_precinct_id,
+    ('tracts', 'precincts'): get_precincts_from_tract_geoid,
+    ('cook_suburban_precincts', 'tract'): _get_suburban_tract,
+    ('tracts', 'cook_suburban_precincts'): _get_suburban_precincts,
+}
+
+# Largest number of paths in a batch request
+MAX_BATCH = 1000
+
+# Largest request body
+MAX_BODY = 1 << 20
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+}
+
+
+def to_json(value):
+    """
+    Return a model, a list of models or plain data as compact JSON bytes.
+    Models are objects of their fields.
+    """
+    def default(obj):
+        fields = getattr(obj, 'fields', None)
+        if fields is None:
+            raise TypeError("Can't serialize {!r}".format(obj))
+        return dict((field, getattr(obj, field, None)) for field in fields)
+
+    return json.dumps(value, default=default, sort_keys=True,
+        separators=(',', ':')).encode('utf-8')
+
+
+def _error(status, message):
+    return status, to_json({'error': message, 'status': status})
+
+
+class NotFound(Exception):
+    pass
+
+
+class LookupService(object):
+    """
+    Answers lookup requests with serialized JSON responses.
+
+    Every item and relation is serialized by ``preserialize()``.  Other
+    responses are cached as they're made, keeping the ``cache_size`` most
+    recently used ones.
+    """
+
+    def __init__(self, cache_size=10000):
+        self.cache_size = cache_size
+        self._preserialized = {}
+        self._cache = collections.OrderedDict()
+
+    def preserialize(self):
+        """
+        Load the datasets and serialize every item and relation.  The new
+        responses replace the old ones, and the cache, all at once.
+        """
+        preload()
+        responses = {}
+        for name, (dataset, field) in COLLECTIONS.items():
+            for item in DATASETS[dataset]:
+                path = '/{}/{}'.format(name, quote(str(getattr(item, field)),
+                    safe=''))
+                responses[path] = self._make_response(path)
+                for (source, relation) in RELATIONS:
+                    if source == name:
+                        relation_path = '{}/{}'.format(path, relation)
+                        responses[relation_path] = self._make_response(
+                            relation_path)
+        self._preserialized = responses
+        self._cache = collections.OrderedDict()
+        return len(responses)
+
+    def lookup(self, path):
+        """
+        Return the value for a path, raising ``NotFound`` if there's none
+        and ``ValueError`` if the path is invalid
+        """
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if parts == ['health'] or parts == ['']:
+            return {'status': 'ok'}
+
+        if parts == ['search']:
+            params = parse_qs(url.query)
+            try:
+                query = params['q'][0]
+                limit = int(params.get('limit', ['10'])[0])
+            except (KeyError, ValueError):
+                raise ValueError("Search needs a q and an integer limit")
+            return [dict(match._asdict(), items=list(match.items))
+                for match in search(query, limit=limit)]
+
+        try:
+            dataset, field = COLLECTIONS[parts[0]]
+        except KeyError:
+            raise NotFound(path)
+
+        if len(parts) == 2:
+            value = DATASETS[dataset].get_by(field, parts[1], None)
+        elif len(parts) == 3 and (parts[0], parts[2]) in RELATIONS:
+            try:
+                value = RELATIONS[parts[0], parts[2]](parts[1])
+            except (TypeError, ValueError):
+                value = None
+        else:
+            raise NotFound(path)
+
+        if value is None:
+            raise NotFound(path)
+        return value
+
+    def _make_response(self, path):
+        """Return the ``(status, body)`` for a ``GET`` of ``path``"""
+        try:
+            return 200, to_json(self.lookup(path))
+        except NotFound:
+            return _error(404, "Not found")
+        except ValueError as e:
+            return _error(400, str(e))
+
+    def get(self, path):
+        """Return the ``(status, body)`` for a ``GET`` of ``path``"""
+        try:
+            return self._preserialized[path]
+        except KeyError:
+            pass
+
+        cache = self._cache
+        try:
+            response = cache[path]
+            cache.move_to_end(path)
+            return response
+        except KeyError:
+            pass
+
+        response = cache[path] = self._make_response(path)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return response
+
+    def batch(self, body):
+        """Return the ``(status, body)`` for a batch of paths in JSON"""
+        try:
+            paths = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return _error(400, "Expected a JSON list of paths")
+        if isinstance(paths, dict):
+            paths = paths.get('paths')
+        if (not isinstance(paths, list)
+                or not all(isinstance(path, str) for path in paths)):
+            return _error(400, "Expected a JSON list of paths")
+        if len(paths) > MAX_BATCH:
+            return _error(413, "Batches are limited to {} paths".format(
+                MAX_BATCH))
+
+        # Responses are already JSON, so they're joined without parsing
+        return 200, b'[' + b','.join(self.get(path)[1] for path in paths) + b']'
+
+    def respond(self, method, target, body=b''):
+        """Return the ``(status, body)`` for a request"""
+        if method == 'GET':
+            return self.get(target)
+        if method == 'POST' and urlsplit(target).path.rstrip('/') == '/batch':
+            return self.batch(body)
+        return _error(405, "Method not allowed")
+
+
+def http_response(status, body, close=False):
+    """Return the bytes of an HTTP response with a JSON ``body``"""
+    head = ('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n'
+        'Content-Length: {}\r\n').format(status, REASONS[status], len(body))
+    if close:
+        head += 'Connection: close\r\n'
+    return head.encode('latin-1') + b'\r\n' + body
+
+
+async def handle_connection(service, reader, writer):
+    """Serve HTTP/1.1 requests, with keep-alive, on a connection"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    ConnectionError):
+                break
+
+            lines = head.decode('latin-1').split('\r\n')
+            request = lines[0].split()
+            if len(request) != 3:
+                writer.write(http_response(*_error(400, "Bad request"),
+                    close=True))
+                break
+            method, target, version = request
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get('content-length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                writer.write(http_response(*_error(400, "Bad request"),
+                    close=True))
+                break
+            if length > MAX_BODY:
+                writer.write(http_response(*_error(413, "Body too large"),
+                    close=True))
+                break
+            try:
+                body = await reader.readexactly(length) if length else b''
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+
+            connection = headers.get('connection', '').lower()
+            if version == 'HTTP/1.0':
+                close = connection != 'keep-alive'
+            else:
+                close = connection == 'close'
+
+            status, response_body = service.respond(method, target, body)
+            writer.write(http_response(status, response_body, close))
+            await writer.drain()
+            if close:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def start_server(service, sock):
+    """Return a coroutine that starts serving ``service`` on ``sock``"""
+    return asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer),
+        sock=sock)
+
+
+def _refresh(service):
+    def callback(dataset, error):
+        if error is None:
+            service.preserialize()
+    return callback
+
+
+def run_worker(service, sock, watch_interval=None):
+    """
+    Serve requests on ``sock`` until the process is told to stop.  If
+    ``watch_interval`` is given, the data files are checked for changes that
+    often, in seconds.
+    """
+    watcher = None
+    if watch_interval:
+        watcher = watch(interval=watch_interval, callback=_refresh(service))
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(start_server(service, sock))
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, loop.stop)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Not supported on this platform or outside the main thread
+            pass
+    try:
+        loop.run_forever()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+
+def bind(host='127.0.0.1', port=8000, backlog=1024):
+    """Return a listening socket, shared by the workers"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def serve(host='127.0.0.1', port=8000, workers=1, cache_size=10000,
+        watch_interval=None, log=sys.stderr):
+    """
+    Load the datasets, then serve lookups on ``host`` and ``port`` from
+    ``workers`` forked processes until interrupted.  A port of 0 picks a
+    free port, which is logged.  If ``watch_interval`` is given, datasets
+    are reloaded when their files change.
+    """
+    service = LookupService(cache_size)
+    count = service.preserialize()
+    sock = bind(host, port)
+    host, port = sock.getsockname()[:2]
+    if not hasattr(os, 'fork'):
+        workers = 1
+    if log is not None:
+        log.write("Serving {} preserialized responses on http://{}:{}/ "
+            "with {} worker(s)\n".format(count, host, port, workers))
+        log.flush()
+
+    if workers <= 1:
+        run_worker(service, sock, watch_interval)
+        return
+
+    # Stop the workers when the parent is stopped
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    children = []
+    try:
+        for i in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    run_worker(service, sock, watch_interval)
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        sock.close()
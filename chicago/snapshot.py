@@ -0,0 +1,209 @@
+"""
+Binary snapshots of loaded datasets.
+
+Building a collection means parsing its CSV file and creating a model for
+every row.  The first time a dataset is loaded, the fully built object,
+including its sort order and lookup indexes, is pickled to a snapshot file.
+Later loads read the snapshot instead, as long as the source CSV's content
+hash and the package version still match.
+
+``load_table()`` caches a collection as a memory-mapped binary table, see
+``chicago.table``, instead of a pickle, so it's read on demand rather than
+all at once.  Set ``CHICAGO_SHARED_TABLES=1`` to load the package's
+collections that way.  Processes forked after loading them share a single
+copy of the data, where collections of models would be copied into each
+process as reference counts are updated.
+
+Snapshots are stored in ``$CHICAGO_SNAPSHOT_DIR`` or, if that isn't set,
+in ``python-chicago`` under the user's cache directory.  Set
+``CHICAGO_SNAPSHOTS=0`` to always load from CSV.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+
+from .version import __version__
+
+# Bump this when the in-memory layout of models or collections changes, so
+# snapshots written by older code are rebuilt.
+SNAPSHOT_FORMAT = 10
+
+
+def snapshots_enabled():
+    return os.environ.get('CHICAGO_SNAPSHOTS', '1') not in ('0', 'false', 'no')
+
+
+def shared_tables_enabled():
+    """
+    Whether datasets should be read from memory-mapped tables that forked
+    processes share, set with ``CHICAGO_SHARED_TABLES=1``
+    """
+    return os.environ.get('CHICAGO_SHARED_TABLES', '0') not in ('0', 'false',
+        'no')
+
+
+def get_snapshot_directory():
+    directory = os.environ.get('CHICAGO_SNAPSHOT_DIR')
+    if directory:
+        return directory
+
+    cache_home = os.environ.get('XDG_CACHE_HOME',
+        os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'python-chicago')
+
+
+def get_snapshot_path(name):
+    return os.path.join(get_snapshot_directory(), name + '.snapshot')
+
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(functools.partial(f.read, 1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _snapshot_header(source):
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'version': __version__,
+        'digest': file_digest(source),
+    }
+
+
+def read_snapshot(name, source):
+    """
+    Return the snapshotted dataset called ``name``, or ``None`` if there's
+    no snapshot or it was built from a different version of ``source``.
+    """
+    try:
+        with open(get_snapshot_path(name), 'rb') as f:
+            header = pickle.load(f)
+            if header != _snapshot_header(source):
+                return None
+            return pickle.load(f)
+    except Exception:
+        # Missing, truncated or otherwise unreadable snapshots are just
+        # rebuilt from the source file
+        return None
+
+
+def write_snapshot(name, source, data):
+    """
+    Snapshot ``data``, built from the file ``source``.
+
+    The snapshot is written to a temporary file and then renamed, so readers
+    never see a partially written snapshot.  Returns ``False`` if the
+    snapshot couldn't be written.
+    """
+    path = get_snapshot_path(name)
+    directory = os.path.dirname(path)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=name,
+            suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(_snapshot_header(source), f,
+                    pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except (IOError, OSError):
+        return False
+
+    return True
+
+
+def load_snapshot(name, source, build):
+    """
+    Return the dataset called ``name`` from its snapshot, or by calling
+    ``build`` and snapshotting the result if there's no up to date snapshot.
+    """
+    if not snapshots_enabled():
+        return build()
+
+    data = read_snapshot(name, source)
+    if data is None:
+        data = build()
+        write_snapshot(name, source, data)
+
+    return data
+
+
+def snapshot(name, source, collection_class=None):
+    """
+    Decorator for loader functions that builds a dataset from the file
+    ``source``, loading it from a snapshot when possible.
+
+    If the loader returns a ``collection_class`` and shared tables are
+    enabled, the collection is read from a table with ``load_table()``
+    instead.
+
+    The undecorated loader is available as the ``__wrapped__`` attribute of
+    the decorated function, and ``source`` as its ``source`` attribute.
+    """
+    def decorator(build):
+        @functools.wraps(build)
+        def load():
+            if collection_class is not None and shared_tables_enabled():
+                return load_table(name, source, collection_class, build)
+            return load_snapshot(name, source, build)
+
+        load.__wrapped__ = build
+        load.source = source
+        return load
+
+    return decorator
+
+
+def get_table_path(name):
+    return os.path.join(get_snapshot_directory(), name + '.table')
+
+
+def _read_table_metadata(path):
+    from .table import Table
+
+    try:
+        table = Table(path)
+    except (IOError, OSError, ValueError):
+        return None
+    try:
+        return table.metadata
+    finally:
+        table.close()
+
+
+def load_table(name, source, collection_class, build):
+    """
+    Return the collection called ``name`` read from a memory-mapped binary
+    table, compiling the table from the collection returned by ``build``
+    if there's no table built from the current ``source``.
+
+    If snapshots are disabled, or the table can't be written, the collection
+    that ``build`` returns is used instead.
+    """
+    if not snapshots_enabled():
+        return build()
+
+    path = get_table_path(name)
+    metadata = _snapshot_header(source)
+    if _read_table_metadata(path) != metadata:
+        collection = build()
+        try:
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            collection.to_table(path, metadata)
+        except (IOError, OSError):
+            return collection
+
+    return collection_class().from_table(path)
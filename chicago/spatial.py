@@ -0,0 +1,152 @@
+"""
+Sort-Tile-Recursive (STR) packed R-tree over bounding boxes.
+
+The tree is bulk loaded once and never modified.  Boxes are
+``(minx, miny, maxx, maxy)`` tuples, and queries return the positions of
+the boxes in the list the tree was built from.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _union(boxes):
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+class STRtree(object):
+    """
+    Packed R-tree of bounding boxes, bulk loaded with Sort-Tile-Recursive.
+
+    Each node is a ``(box, children, is_leaf)`` tuple.  Leaf children are
+    positions in ``boxes``, other children are nodes.
+    """
+
+    def __init__(self, boxes, node_capacity=10):
+        self.boxes = list(boxes)
+        self.node_capacity = node_capacity
+        self.root = self._build()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _pack(self, entries):
+        """
+        Group ``(box, child)`` entries into nodes of up to ``node_capacity``
+        entries each, tiling them by the x and then the y of their centers.
+        """
+        capacity = self.node_capacity
+        node_count = int(math.ceil(len(entries) / float(capacity)))
+        slice_count = int(math.ceil(math.sqrt(node_count)))
+        slice_size = slice_count * capacity
+
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        groups = []
+        for i in range(0, len(entries), slice_size):
+            vertical_slice = sorted(entries[i:i + slice_size],
+                key=lambda e: e[0][1] + e[0][3])
+            for j in range(0, len(vertical_slice), capacity):
+                groups.append(vertical_slice[j:j + capacity])
+        return groups
+
+    def _build(self):
+        if not self.boxes:
+            return None
+
+        entries = [(box, i) for i, box in enumerate(self.boxes)]
+        is_leaf = True
+        while True:
+            nodes = []
+            for group in self._pack(entries):
+                nodes.append((_union([box for box, child in group]),
+                    [child for box, child in group], is_leaf))
+            if len(nodes) == 1:
+                return nodes[0]
+            entries = [(node[0], node) for node in nodes]
+            is_leaf = False
+
+    def query_point(self, x, y):
+        """Return a list of the positions of boxes that contain a point"""
+        if self.root is None:
+            return []
+
+        matches = []
+        boxes = self.boxes
+        stack = [self.root]
+        while stack:
+            box, children, is_leaf = stack.pop()
+            if not (box[0] <= x <= box[2] and box[1] <= y <= box[3]):
+                continue
+            if is_leaf:
+                for i in children:
+                    child_box = boxes[i]
+                    if (child_box[0] <= x <= child_box[2]
+                            and child_box[1] <= y <= child_box[3]):
+                        matches.append(i)
+            else:
+                stack.extend(children)
+        return sorted(matches)
+
+    def query_box(self, query):
+        """Return a list of the positions of boxes that intersect ``query``"""
+        if self.root is None:
+            return []
+
+        def intersects(box):
+            return not (box[2] < query[0] or box[0] > query[2]
+                or box[3] < query[1] or box[1] > query[3])
+
+        matches = []
+        stack = [self.root]
+        while stack:
+            box, children, is_leaf = stack.pop()
+            if not intersects(box):
+                continue
+            if is_leaf:
+                matches.extend(i for i in children
+                    if intersects(self.boxes[i]))
+            else:
+                stack.extend(children)
+        return sorted(matches)
+
+    def query_points(self, xs, ys):
+        """
+        Match NumPy arrays of point coordinates against the tree.
+
+        Iterates over ``(position, point_indices)`` pairs, where
+        ``point_indices`` is an array of the indices of the points inside the
+        box at ``position``.  The whole batch of points descends the tree
+        together, so there's no per-point Python work.
+        """
+        if self.root is None or len(xs) == 0:
+            return
+
+        stack = [(self.root, numpy.arange(len(xs)))]
+        while stack:
+            (box, children, is_leaf), indices = stack.pop()
+            px = xs[indices]
+            py = ys[indices]
+            inside = ((px >= box[0]) & (px <= box[2])
+                & (py >= box[1]) & (py <= box[3]))
+            indices = indices[inside]
+            if len(indices) == 0:
+                continue
+            if is_leaf:
+                px = xs[indices]
+                py = ys[indices]
+                for i in children:
+                    child_box = self.boxes[i]
+                    inside = ((px >= child_box[0]) & (px <= child_box[2])
+                        & (py >= child_box[1]) & (py <= child_box[3]))
+                    if inside.any():
+                        yield i, indices[inside]
+            else:
+                stack.extend((child, indices) for child in children)
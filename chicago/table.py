@@ -0,0 +1,363 @@
+"""
+Read-only binary tables of strings that are memory-mapped instead of read.
+
+A table file holds:
+
+* a string heap: every distinct value, UTF-8 encoded back to back, with an
+  array of the offsets where each one starts
+* a fixed-width column for each field: an array with the heap number of
+  each row's value, or ``NULL`` for ``None``
+* index arrays for looking rows up by a field: the row positions sorted by
+  their keys, alongside the sorted keys, and for string keys, an open
+  addressing hash table of where each key starts in the sorted arrays
+
+All arrays are stored in native byte order and aligned, so they're used
+straight from the mapped file with ``memoryview.cast()``.  Opening a table
+only reads its header, and the operating system pages the rest in as it's
+used and shares the pages between processes that map the same file.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b'CHITAB01'
+
+# Bump this when the layout of table files changes
+TABLE_FORMAT = 2
+
+# Heap number of a missing value
+NULL = 0xFFFFFFFF
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+_ALIGNMENT = 8
+
+# How each key type sorts and compares keys, the same way as ``Index.key()``
+_KEY_FUNCTIONS = {
+    'str': lambda value: value,
+    'lower': lambda value: value.lower(),
+    'int': int,
+}
+
+
+def _uint32_array(values=()):
+    a = array('I', values)
+    if a.itemsize != 4:
+        a = array('L', values)
+    return a
+
+
+def _index_keys(column, strings, key_type):
+    """Return a list of ``(key, position)`` for the rows with a valid key"""
+    key_function = _KEY_FUNCTIONS[key_type]
+    keys = []
+    for position, number in enumerate(column):
+        if number == NULL:
+            continue
+        try:
+            keys.append((key_function(strings[number]), position))
+        except ValueError:
+            # Like a failed lookup, values that aren't integers can't be
+            # found by an integer key
+            continue
+    # A stable sort keeps rows with the same key in table order
+    keys.sort(key=lambda key: key[0])
+    return keys
+
+
+def _hash(key):
+    """Hash UTF-8 bytes the same way in every process"""
+    return zlib.crc32(key) & 0xFFFFFFFF
+
+
+def _hash_table(encoded_keys):
+    """
+    Return an open addressing hash table, at most half full, of the position
+    of the first of each run of equal keys in the sorted ``encoded_keys``
+    """
+    size = 8
+    while size < len(encoded_keys) * 2:
+        size *= 2
+    mask = size - 1
+    slots = _uint32_array([NULL]) * size
+    previous = None
+    for i, key in enumerate(encoded_keys):
+        if key == previous:
+            continue
+        previous = key
+        slot = _hash(key) & mask
+        while slots[slot] != NULL:
+            slot = (slot + 1) & mask
+        slots[slot] = i
+    return slots
+
+
+def write_table(path, fields, rows, indexes=(), metadata=None):
+    """
+    Write a table of ``rows``, lists of string or ``None`` values for each
+    of ``fields``, to ``path``.
+
+    ``indexes`` is a list of ``(field, key_type)`` pairs, where
+    ``key_type`` is one of the types in ``Index.key_type``.  ``metadata``
+    is a dict saved in the header.  The table is written to a temporary file
+    and renamed, so readers never see a partial table.
+    """
+    fields = list(fields)
+    heap_numbers = {}
+    strings = []
+
+    def heap_number(value):
+        if value is None:
+            return NULL
+        try:
+            return heap_numbers[value]
+        except KeyError:
+            number = heap_numbers[value] = len(strings)
+            strings.append(value)
+            return number
+
+    columns = [_uint32_array() for field in fields]
+    length = 0
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(heap_number(None if value is None else str(value)))
+        length += 1
+
+    sections = []
+    for field, column in zip(fields, columns):
+        sections.append(('column:' + field, column))
+
+    for field, key_type in indexes:
+        keys = _index_keys(columns[fields.index(field)], strings, key_type)
+        if key_type == 'int':
+            sorted_keys = array('q', [key for key, position in keys])
+        else:
+            sorted_keys = _uint32_array(heap_number(key)
+                for key, position in keys)
+            sections.append(('hash:{}:{}'.format(field, key_type),
+                _hash_table([key.encode('utf-8') for key, position in keys])))
+        sections.append(('keys:{}:{}'.format(field, key_type), sorted_keys))
+        sections.append(('positions:{}:{}'.format(field, key_type),
+            _uint32_array(position for key, position in keys)))
+
+    # Added last, since indexes can add lowercased keys to the heap
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = _uint32_array([0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections.append(('offsets', offsets))
+    sections.append(('heap', array('B', b''.join(encoded))))
+
+    layout = {}
+    position = 0
+    for name, values in sections:
+        layout[name] = [position, values.typecode, len(values)]
+        position += len(values) * values.itemsize
+        position += -position % _ALIGNMENT
+
+    header = json.dumps({
+        'format': TABLE_FORMAT,
+        'byteorder': sys.byteorder,
+        'fields': fields,
+        'length': length,
+        'indexes': [list(index) for index in indexes],
+        'sections': layout,
+        'metadata': metadata or {},
+    }).encode('utf-8')
+    # Pad the header so the arrays after it start aligned
+    start = len(MAGIC) + _HEADER_LENGTH.size + len(header)
+    header += b' ' * (-start % _ALIGNMENT)
+
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for name, values in sections:
+                data = values.tobytes()
+                f.write(data)
+                f.write(b'\0' * (-len(data) % _ALIGNMENT))
+        os.rename(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class _SortedKeys(object):
+    """
+    Sequence of an index's string keys, as UTF-8 bytes, for ``bisect``.
+
+    UTF-8 sorts in the same order as the strings it encodes, so keys can be
+    compared without decoding them.
+    """
+
+    def __init__(self, table, keys):
+        self.table = table
+        self.keys = keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        return self.table.encoded_string(self.keys[i])
+
+
+class Table(object):
+    """
+    A memory-mapped table written by ``write_table()``.
+
+    Raises ``ValueError`` if the file isn't a table that this version of the
+    package can read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self):
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError("{} isn't a table file".format(self.path))
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        header_length, = _HEADER_LENGTH.unpack(self._mmap[len(MAGIC):start])
+        header = json.loads(self._mmap[start:start + header_length].decode(
+            'utf-8'))
+        if header['format'] != TABLE_FORMAT:
+            raise ValueError("{} has table format {}, not {}".format(
+                self.path, header['format'], TABLE_FORMAT))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError("{} was written on a {}-endian machine".format(
+                self.path, header['byteorder']))
+
+        self.fields = header['fields']
+        self.length = header['length']
+        self.metadata = header['metadata']
+        self.indexes = set(tuple(index) for index in header['indexes'])
+
+        data = memoryview(self._mmap)[start + header_length:]
+        self._sections = {}
+        for name, (offset, typecode, count) in header['sections'].items():
+            size = array(typecode).itemsize
+            self._sections[name] = data[offset:offset + count * size].cast(
+                typecode)
+
+        self._columns = dict((field, self._sections['column:' + field])
+            for field in self.fields)
+        # (hash table, sorted keys, positions) for each index
+        self._indexes = {}
+        for field, key_type in self.indexes:
+            suffix = '{}:{}'.format(field, key_type)
+            keys = self._sections['keys:' + suffix]
+            if key_type != 'int':
+                keys = _SortedKeys(self, keys)
+            self._indexes[field, key_type] = (
+                self._sections.get('hash:' + suffix), keys,
+                self._sections['positions:' + suffix])
+        self._offsets = self._sections['offsets']
+        # Strings are sliced from the mmap itself, which is a little faster
+        # than going through a memoryview
+        self._heap_start = (start + header_length
+            + header['sections']['heap'][0])
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return "Table('{}')".format(self.path)
+
+    def encoded_string(self, number):
+        """Return the UTF-8 bytes of the string with heap number ``number``"""
+        heap_start = self._heap_start
+        return self._mmap[heap_start + self._offsets[number]:
+            heap_start + self._offsets[number + 1]]
+
+    def string(self, number):
+        """Return the string with heap number ``number``"""
+        if number == NULL:
+            return None
+        return self.encoded_string(number).decode('utf-8')
+
+    def value(self, position, field):
+        return self.string(self._columns[field][position])
+
+    def column(self, field):
+        """Return the heap numbers of a field's values, in row order"""
+        return self._columns[field]
+
+    def heap(self):
+        """
+        Return the string heap's offsets, where string ``n`` starts at
+        ``offsets[n]`` and ends at ``offsets[n + 1]``, and its UTF-8 data
+        """
+        return self._offsets, self._sections['heap']
+
+    def row(self, position):
+        """Return the row at ``position`` as a dict of field values"""
+        return dict((field, self.string(self._columns[field][position]))
+            for field in self.fields)
+
+    def find(self, field, key, key_type='str'):
+        """
+        Return the positions, in table order, of the rows whose ``field``
+        matches ``key``.  Fields without an index of ``key_type`` are scanned.
+        """
+        try:
+            slots, keys, positions = self._indexes[field, key_type]
+        except KeyError:
+            key_function = _KEY_FUNCTIONS[key_type]
+            matches = []
+            for position in range(self.length):
+                value = self.value(position, field)
+                try:
+                    if value is not None and key_function(value) == key:
+                        matches.append(position)
+                except ValueError:
+                    continue
+            return matches
+
+        if slots is None:
+            start = bisect.bisect_left(keys, key)
+        else:
+            key = key.encode('utf-8')
+            start = self._hash_lookup(slots, keys, key)
+            if start is None:
+                return []
+        # Most keys match a single row, so scanning for the end of the
+        # matches is quicker than a second binary search
+        end = start
+        while end < len(keys) and keys[end] == key:
+            end += 1
+        return list(positions[start:end])
+
+    def _hash_lookup(self, slots, keys, key):
+        """
+        Return where ``key`` starts in an index's sorted ``keys``, using its
+        hash table ``slots``, or ``None`` if it isn't there
+        """
+        mask = len(slots) - 1
+        slot = _hash(key) & mask
+        while True:
+            i = slots[slot]
+            if i == NULL:
+                return None
+            if keys[i] == key:
+                return i
+            slot = (slot + 1) & mask
+
+    def close(self):
+        for section in self._sections.values():
+            section.release()
+        self._mmap.close()
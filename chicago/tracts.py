@@ -1,6 +1,9 @@
 import os.path
 
-from .base import Model, Collection, DATA_DIRECTORY
+from .batch import as_key_list, lookup_many
+from .base import (Model, Collection, Index, LazyDataset, Ordering,
+    DATA_DIRECTORY)
+from .precincts import pack_ward_precinct
 
 TRACT_CSV_FILENAME = os.path.join(DATA_DIRECTORY, 'chicago_precinct_census_tract_crosswalk.csv')
 
@@ -11,27 +14,24 @@ class Tract(Model):
         'geoid',
         'name',
         'statefp',
-        'precinct_full_name'
     ]
 
     def __str__(self):
         return self.geoid
 
     def __repr__(self):
-        return "Tract(commarea_num='{t.commarea_num}',countyfp='{t.countyfp}',geoid='{t.geoid}',name='{t.name}',statefp='{t.statefp}',precinct_full_name='{t.precinct_full_name}')".format(
+        return "Tract(commarea_num='{t.commarea_num}',countyfp='{t.countyfp}',geoid='{t.geoid}',name='{t.name}',statefp='{t.statefp}')".format(
             t=self)
 
 
 class TractCollection(Collection):
     model = Tract
-
-    def __init__(self):
-        self._by_geoid = {}
-        super(TractCollection, self).__init__()
-
-    def add_item(self, item):
-        super(TractCollection, self).add_item(item)
-        self._by_geoid[item.geoid] = item
+    indexes = [
+        Index('geoid'),
+    ]
+    ordering = Ordering('geoid', 'int')
+    interned_fields = ['commarea_num', 'countyfp', 'geoid', 'name', 'statefp']
+    categorical_fields = ['commarea_num', 'countyfp', 'statefp']
 
     def transform_row(self, row):
         return {
@@ -40,27 +40,69 @@ class TractCollection(Collection):
             'geoid': row['tract_geoid'],
             'name': row['tract_name'],
             'statefp': row['tract_statefp'],
-            'precinct_full_name': row['precinct_full_name']
         }
 
     def get_by_geoid(self, geoid):
-        return self._by_geoid[str(geoid)]
+        return self.get_by('geoid', geoid)
+
 
-    def default_sort(self):
-        self._items = sorted(self._items, key=lambda p: int(p.geoid))
-        return self
+def load_tracts():
+    # Precincts and tracts are both read from the same crosswalk file
+    from .crosswalk import CHICAGO_CROSSWALK
+    return CHICAGO_CROSSWALK.load().tracts
 
 
-TRACTS = TractCollection().from_csv(TRACT_CSV_FILENAME)
+TRACTS = LazyDataset(load_tracts, 'TRACTS')
 
 
 def get_tract_from_ward_and_precinct(ward, precinct):
-    precinct_id = '%s%s' % (str(ward).zfill(2), str(precinct).zfill(3))
+    try:
+        precinct_id = pack_ward_precinct(ward, precinct)
+    except (TypeError, ValueError):
+        return None
     return get_tract_from_precinct_id(precinct_id)
 
 
 def get_tract_from_precinct_id(precinct_id):
-    for tract in TRACTS:
-        if tract.precinct_full_name == str(precinct_id):
-            return tract
-    return None
+    from .crosswalk import CHICAGO_CROSSWALK
+    tracts = CHICAGO_CROSSWALK.get_tracts_for_precinct(precinct_id)
+    if not tracts:
+        return None
+    return tracts[0]
+
+
+def get_tracts_from_precinct_ids(precinct_ids, attr=None, missing=None,
+        errors='coerce'):
+    """
+    Return the tracts containing each of ``precinct_ids``.
+
+    See ``chicago.batch.lookup_many()`` for how ``attr``, ``missing`` and
+    ``errors`` are handled.
+    """
+    return lookup_many(get_tract_from_precinct_id, precinct_ids, attr,
+        missing, errors)
+
+
+def get_tracts_from_wards_and_precincts(wards, precincts, attr=None,
+        missing=None, errors='coerce'):
+    """
+    Return the tracts containing each ward and precinct pair.
+
+    For example, to get aligned arrays of tract GEOIDs and community area
+    numbers::
+
+        geoids, commarea_nums = get_tracts_from_wards_and_precincts(wards,
+            precincts, attr=('geoid', 'commarea_num'))
+
+    See ``chicago.batch.lookup_many()`` for how ``attr``, ``missing`` and
+    ``errors`` are handled.
+    """
+    ward_list = as_key_list(wards)
+    precinct_list = as_key_list(precincts)
+    if len(ward_list) != len(precinct_list):
+        raise ValueError("Got {} wards but {} precincts".format(
+            len(ward_list), len(precinct_list)))
+
+    return lookup_many(
+        lambda pair: get_tract_from_ward_and_precinct(*pair),
+        zip(ward_list, precinct_list), attr, missing, errors, like=wards)
@@ -0,0 +1,132 @@
+"""
+Reload datasets when the files they're built from change, without
+restarting the process.
+
+    >>> from chicago import watch
+    >>> watcher = watch(callback=lambda dataset, error: print(dataset, error))
+    >>> # ... replace chicago_precinct_census_tract_crosswalk.csv ...
+    >>> watcher.stop()
+
+The watcher polls the modification time, size and inode of each dataset's
+``sources`` from a background thread.  A file has to stay unchanged for
+one poll before the dataset is reloaded, so a file that's still being
+written isn't read halfway.  Replacing files by renaming a finished copy
+over them is still the safest way to update them.
+
+Reloads use ``LazyDataset.reload()``.  The new copy of the dataset, and of
+the loaded datasets built from it, like ``PRECINCTS`` and ``TRACTS`` from
+``CHICAGO_CROSSWALK``, are built in the watcher's thread while readers keep
+using the old ones, and then swapped in together.
+"""
+import os
+import threading
+
+
+def _signature(paths):
+    """Return what's changed when a file is changed, for each of ``paths``"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(signature)
+
+
+class DatasetWatcher(object):
+    """
+    Polls the source files of ``datasets`` every ``interval`` seconds and
+    reloads the ones that changed.
+
+    ``callback(dataset, error)`` is called after each reload, with an
+    ``error`` of ``None`` if it succeeded.  If a reload fails, the old copy
+    of the dataset is kept and the watcher carries on.
+    """
+
+    def __init__(self, datasets, interval=1.0, callback=None):
+        self.datasets = [dataset for dataset in datasets if dataset.sources]
+        self.interval = interval
+        self.callback = callback
+        self._seen = dict((id(dataset), _signature(dataset.sources))
+            for dataset in self.datasets)
+        self._pending = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __repr__(self):
+        return "DatasetWatcher(datasets={}, interval={})".format(
+            len(self.datasets), self.interval)
+
+    def check(self):
+        """Poll the files once, and return a list of the reloaded datasets"""
+        reloaded = []
+        for dataset in self.datasets:
+            key = id(dataset)
+            signature = _signature(dataset.sources)
+            if signature == self._seen[key]:
+                self._pending.pop(key, None)
+                continue
+            if self._pending.get(key) != signature:
+                # Changed since the last poll, so it may still be changing
+                self._pending[key] = signature
+                continue
+
+            del self._pending[key]
+            self._seen[key] = signature
+            if None in signature or not dataset.loaded:
+                # Missing while it's being replaced, or not loaded yet, so
+                # it'll be read from the new file when it's first used
+                continue
+            error = None
+            try:
+                dataset.reload()
+            except Exception as e:
+                error = e
+            reloaded.append(dataset)
+            if self.callback is not None:
+                self.callback(dataset, error)
+        return reloaded
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start polling in a background thread"""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run,
+                name='chicago-watcher')
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling and wait for the thread to finish"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def watch(datasets=None, interval=1.0, callback=None):
+    """
+    Start watching the source files of ``datasets``, a list of names or
+    ``LazyDataset`` objects, by default all of ``chicago.DATASETS``.
+    Returns the started ``DatasetWatcher``.
+    """
+    import chicago
+
+    if datasets is None:
+        datasets = [chicago.DATASETS[name]
+            for name in sorted(chicago.DATASETS)]
+    else:
+        try:
+            datasets = [chicago.DATASETS[dataset.upper()]
+                if isinstance(dataset, str) else dataset
+                for dataset in datasets]
+        except KeyError as e:
+            raise ValueError("Unknown dataset {}".format(e.args[0]))
+    return DatasetWatcher(datasets, interval, callback).start()
@@ -1,15 +1,27 @@
 """Tasks for generating data files that underly this package"""
+from __future__ import print_function
+
+import collections
 import csv
 import errno
+import hashlib
+import inspect
+import itertools
 import json
+import marshal
+import multiprocessing
 import os
 import shutil
+import threading
+from multiprocessing.pool import ThreadPool
 
+from six.moves import queue
 from six.moves.urllib.parse import urlparse
 
-import fiona
 import requests
-from shapely.geometry import shape
+
+# fiona and shapely are imported by the tasks that need them, so downloads
+# work without the geospatial libraries installed
 
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -40,22 +52,121 @@ def _url_filename(url):
     return url_parsed.path.split('/')[-1]
 
 
-def _download_file(url, dest=None):
-    """Download a file from a URL"""
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def _validators(url, response):
+    return {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+
+def _download_file(url, dest=None, session=None):
+    """
+    Download a file from a URL, streaming it to disk in chunks.
+
+    The response's ``ETag`` and ``Last-Modified`` headers are saved next to
+    the file, in ``dest + '.meta'``, and the next download of the same URL
+    asks the server for the file only if it has changed.  Data is written
+    to ``dest + '.part'`` and moved into place when it's complete.  If a
+    download is interrupted, the next one resumes where it left off, as long
+    as the server supports range requests and the file hasn't changed.
+
+    Returns ``True`` if the file was downloaded and ``False`` if the copy on
+    disk was already current.
+    """
     if dest is None:
         dest = os.path.join(TEMP_DATA_DIR, _url_filename(url))
 
     dest_dir = os.path.dirname(dest)
     _mkdir_p(dest_dir)
 
-    response = requests.get(url)
+    if session is None:
+        session = requests
+
+    meta_path = dest + '.meta'
+    part_path = dest + '.part'
+    part_meta_path = part_path + '.meta'
+
+    # Byte ranges have to be ranges of the file itself, not a compressed
+    # encoding of it
+    headers = {'Accept-Encoding': 'identity'}
+    offset = 0
+    meta = _read_json(meta_path)
+    part_meta = _read_json(part_meta_path)
+    if (part_meta and part_meta.get('url') == url
+            and os.path.exists(part_path)
+            and (part_meta.get('etag') or part_meta.get('last_modified'))):
+        offset = os.path.getsize(part_path)
+        headers['Range'] = 'bytes={}-'.format(offset)
+        headers['If-Range'] = part_meta.get('etag') or part_meta['last_modified']
+    elif meta and meta.get('url') == url and os.path.exists(dest):
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = session.get(url, headers=headers, stream=True)
+    try:
+        if response.status_code == 304:
+            return False
+
+        if response.status_code == 416:
+            # Nothing left to fetch past the end of the partial file, or
+            # the server has lost track of it.  Start over.
+            response.close()
+            _remove(part_path)
+            _remove(part_meta_path)
+            return _download_file(url, dest, session)
+
+        response.raise_for_status()
+
+        validators = _validators(url, response)
+        if response.status_code == 206:
+            mode = 'ab'
+        else:
+            # The server sent the whole file
+            mode = 'wb'
+            _write_json(part_meta_path, validators)
+
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    finally:
+        response.close()
 
-    with open(dest, 'w') as f:
-        f.write(response.content)
+    os.rename(part_path, dest)
+    _write_json(meta_path, _read_json(part_meta_path) or validators)
+    _remove(part_meta_path)
+    return True
 
 
 ILLINOIS_TRACTS_SHAPEFILE_URL = 'http://www2.census.gov/geo/tiger/TIGER2015/TRACT/tl_2015_17_tract.zip'
 ILLINOIS_COUNTY_FIPS_URL = 'http://www2.census.gov/geo/docs/reference/codes/files/st17_il_cou.txt'
+US_COUNTIES_SHAPEFILE_URL = 'http://www2.census.gov/geo/tiger/TIGER2015/COUNTY/tl_2015_us_county.zip'
 
 
 def download_chicago_tracts(
@@ -86,6 +197,14 @@ def download_illinois_county_fips_codes(
     _download_file(url, dest=dest)
 
 
+def download_us_counties(
+        url=US_COUNTIES_SHAPEFILE_URL,
+        dest=None):
+    """Download zip containing all counties in the United States"""
+
+    _download_file(url, dest=dest)
+
+
 def download_chicago_precincts(
         url='https://data.cityofchicago.org/api/geospatial/uvpq-qeeq?method=export&format=GeoJSON',
         dest=None):
@@ -108,6 +227,26 @@ def download_suburban_cook_precincts(
     _download_file(url, dest=dest)
 
 
+def download_community_areas(
+        url='https://data.cityofchicago.org/api/geospatial/cauq-8yn6?method=export&format=GeoJSON',
+        dest=None):
+    """Download community area boundary GeoJSON from url."""
+    if dest is None:
+        dest = os.path.join(TEMP_DATA_DIR, 'community_areas.geojson')
+
+    _download_file(url, dest=dest)
+
+
+def download_neighborhoods(
+        url='https://data.cityofchicago.org/api/geospatial/bbvz-uum9?method=export&format=GeoJSON',
+        dest=None):
+    """Download neighborhood boundary GeoJSON from url."""
+    if dest is None:
+        dest = os.path.join(TEMP_DATA_DIR, 'neighborhoods.geojson')
+
+    _download_file(url, dest=dest)
+
+
 def build_county_fips_crosswalk(src=None, dest=None):
     """
     Generate a CSV of Illinois county FIPS codes, to allow us to convert back
@@ -134,6 +273,37 @@ def build_county_fips_crosswalk(src=None, dest=None):
                 writer.writerow(row)
 
 
+def _filter_features(collection, prop, value):
+    """
+    Iterate over the features of a fiona collection whose property ``prop``
+    equals ``value``.
+
+    The filter is passed to fiona as an OGR SQL ``where`` clause, so
+    features that don't match are skipped without being read into Python.
+    Versions of fiona without ``where`` ignore it, so features are checked
+    again here.
+    """
+    try:
+        features = collection.filter(where="{} = '{}'".format(prop,
+            value.replace("'", "''")))
+    except (TypeError, ValueError):
+        features = iter(collection)
+
+    for feature in features:
+        if feature['properties'][prop] == value:
+            yield feature
+
+
+def _feature_to_dict(feature):
+    """Convert a fiona feature to a JSON-serializable dict"""
+    if isinstance(feature, dict):
+        return feature
+
+    # Features are objects, not dicts, as of fiona 1.9
+    from fiona.model import to_dict
+    return to_dict(feature)
+
+
 def generate_county_tracts_geojson(src=None, dest=None, county='Cook'):
     """
     Open a zipped shapefile of all census Tracts in Illinois and save GeoJSON of
@@ -146,21 +316,42 @@ def generate_county_tracts_geojson(src=None, dest=None, county='Cook'):
         root, ext = os.path.splitext(src)
         dest = root + '__' + county.lower() + '.geojson'
 
+    from chicago.geojson import FeatureWriter
     from chicago.illinois.counties import COUNTIES
     county_info = COUNTIES.get_by_name(county)
 
-    with fiona.open('/tl_2015_17_tract.shp', vfs='zip://' + src) as shp:
-        tract_geojson = {
-            'type': 'FeatureCollection',
-            'features': []
-        }
+    import fiona
+
+    shapefile = os.path.splitext(os.path.basename(src))[0] + '.shp'
+    with fiona.open('zip://{}!{}'.format(src, shapefile)) as shp:
+        with open(dest, 'w') as f:
+            with FeatureWriter(f) as writer:
+                for row in _filter_features(shp, 'COUNTYFP',
+                        county_info.countyfp):
+                    writer.write(_feature_to_dict(row))
+
 
-        for row in shp:
-            if row['properties']['COUNTYFP'] == county_info.countyfp:
-                tract_geojson['features'].append(row)
+def generate_illinois_counties_geojson(src=None, dest=None):
+    """
+    Open a zipped shapefile of all counties in the United States and save
+    GeoJSON of Illinois' counties.
+    """
+    if src is None:
+        src = os.path.join(TEMP_DATA_DIR, _url_filename(US_COUNTIES_SHAPEFILE_URL))
+
+    if dest is None:
+        dest = os.path.join(TEMP_DATA_DIR, 'illinois_counties.geojson')
 
+    from chicago.geojson import FeatureWriter
+
+    import fiona
+
+    shapefile = os.path.splitext(os.path.basename(src))[0] + '.shp'
+    with fiona.open('zip://{}!{}'.format(src, shapefile)) as shp:
         with open(dest, 'w') as f:
-            f.write(json.dumps(tract_geojson))
+            with FeatureWriter(f) as writer:
+                for row in _filter_features(shp, 'STATEFP', '17'):
+                    writer.write(_feature_to_dict(row))
 
 
 def build_suburban_cook_precincts_csv(src=None, dest=None, vintage=2016):
@@ -174,29 +365,26 @@ def build_suburban_cook_precincts_csv(src=None, dest=None, vintage=2016):
         dest_filename = 'cook_suburban_precincts_as_of_{}.csv'.format(vintage)
         dest = os.path.join(OUTPUT_DATA_DIR, dest_filename)
 
-    with open(src) as f:
-        with open(dest, 'w') as f_out:
-            geojson = json.load(f)
+    from chicago.geojson import iter_features
 
-            fieldnames = sorted(geojson['features'][0]['properties'].keys())
-            writer = csv.DictWriter(f_out, fieldnames=fieldnames)
-            writer.writeheader()
+    with open(dest, 'w') as f_out:
+        writer = None
+        for feature in iter_features(src):
+            if writer is None:
+                fieldnames = sorted(feature['properties'].keys())
+                writer = csv.DictWriter(f_out, fieldnames=fieldnames)
+                writer.writeheader()
 
-            for feature in geojson['features']:
-                writer.writerow(feature['properties'])
+            writer.writerow(feature['properties'])
 
 
-def _generate_precinct_tract_crosswalk(tracts_path, precincts_path, dest,
-        tract_properties, precinct_properties, crosswalk_tract_properties):
-    with open(precincts_path) as fh:
-        precincts = json.loads(fh.read())
+def _load_tract_geos(tracts_path, tract_properties):
+    from shapely.geometry import shape
 
-    with open(tracts_path) as fh:
-        tracts = json.loads(fh.read())
+    from chicago.geojson import iter_features
 
-    # Create iterable of shapely geometries of tracts, since there are fewer & they're bigger
     tract_geos = []
-    for tract in tracts['features']:
+    for tract in iter_features(tracts_path):
         tract_geo = {}
         for src_prop, dst_prop in tract_properties:
             tract_geo[dst_prop] = tract['properties'].get(src_prop, '')
@@ -204,38 +392,380 @@ def _generate_precinct_tract_crosswalk(tracts_path, precincts_path, dest,
         tract_geo['shape'] = shape(tract['geometry'])
         tract_geos.append(tract_geo)
 
-    # Now, loop over precincts, take the centroid of each and find the tract that centroid is in
-    with open(dest, 'w') as fh:
-        fieldnames = [dst_prop for src_prop, dst_prop in precinct_properties]
-        fieldnames += [dst_prop for src_prop, dst_prop in crosswalk_tract_properties]
-        writer = csv.DictWriter(fh, sorted(fieldnames))
-        writer.writeheader()
+    return tract_geos
+
+
+class _TractFinder(object):
+    """
+    Find the first tract, in file order, that contains a point.
+
+    Only tracts whose bounding boxes contain the point, found with an
+    STR-tree, are tested, and they're tested with prepared geometries.
+    """
+
+    def __init__(self, tract_geos):
+        from shapely.prepared import prep
+
+        from chicago.spatial import STRtree
+
+        self.tract_geos = tract_geos
+        self._prepared = [prep(tract['shape']) for tract in tract_geos]
+        self._tree = STRtree([tract['shape'].bounds for tract in tract_geos])
+
+    def find(self, point):
+        for i in self._tree.query_point(point.x, point.y):
+            if self._prepared[i].contains(point):
+                return self.tract_geos[i]
+        return None
 
-        for precinct in precincts['features']:
+
+class _CrosswalkMatcher(object):
+    """
+    Makes crosswalk rows for precinct features, by finding the tract that
+    contains each precinct's centroid and copying properties from both.
+    Each crosswalk run makes its own, so runs don't share any state.
+    """
+
+    def __init__(self, finder, precinct_properties,
+            crosswalk_tract_properties):
+        self.finder = finder
+        self.precinct_properties = precinct_properties
+        self.crosswalk_tract_properties = crosswalk_tract_properties
+
+    @classmethod
+    def load(cls, tracts_path, tract_properties, precinct_properties,
+            crosswalk_tract_properties):
+        return cls(_TractFinder(_load_tract_geos(tracts_path,
+            tract_properties)), precinct_properties,
+            crosswalk_tract_properties)
+
+    def rows(self, precincts):
+        """Return crosswalk rows for a list of precinct features"""
+        from shapely.geometry import shape
+
+        rows = []
+        for precinct in precincts:
             centroid = shape(precinct['geometry']).centroid
 
             cw = {}
 
-            for src_prop, dst_prop in precinct_properties:
+            for src_prop, dst_prop in self.precinct_properties:
                 cw[dst_prop] = precinct['properties'].get(src_prop, None)
 
-            for tract in tract_geos:
-                if tract['shape'].contains(centroid):
-                    for src_prop, dst_prop in crosswalk_tract_properties:
-                        cw[dst_prop] = tract[src_prop]
-
-                    break
+            tract = self.finder.find(centroid)
+            if tract is not None:
+                for src_prop, dst_prop in self.crosswalk_tract_properties:
+                    cw[dst_prop] = tract[src_prop]
 
             # Every precinct should map to some tract
             assert cw['tract_geoid']
 
-            writer.writerow(cw)
+            rows.append(cw)
+
+        return rows
+
+
+# The matcher of a crosswalk pool worker process, set by its initializer.
+# It's never set in the process that starts the pool.
+_worker_matcher = None
+
+
+def _init_crosswalk_worker(matcher):
+    """
+    Set up a crosswalk pool worker with ``matcher``, or with the arguments
+    to ``_CrosswalkMatcher.load()`` if the worker wasn't forked
+    """
+    global _worker_matcher
+    if not isinstance(matcher, _CrosswalkMatcher):
+        matcher = _CrosswalkMatcher.load(*matcher)
+    _worker_matcher = matcher
+
+
+def _crosswalk_worker_rows(precincts):
+    return _worker_matcher.rows(precincts)
+
+
+def _chunked(iterable, size):
+    """Iterate over lists of up to ``size`` items from ``iterable``"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_in_order(func, chunks, processes, initializer=None, initargs=()):
+    """
+    Iterate over ``func(chunk)`` for each of ``chunks``, in order, on a pool
+    of ``processes`` processes.
+
+    At most two chunks per process are in flight at once, so chunks are
+    read from ``chunks`` only as fast as they're processed.
+    """
+    if processes <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    pool = multiprocessing.Pool(processes, initializer=initializer,
+        initargs=initargs)
+    try:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, (chunk,)))
+            if len(pending) >= processes * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+# Precincts sent to a crosswalk worker at once
+CROSSWALK_CHUNK_SIZE = 100
+
+
+# Bump when a change to the crosswalk code changes the rows it writes, so
+# that rows from earlier builds aren't reused
+CROSSWALK_FINGERPRINT_VERSION = 1
+
+
+def _precinct_fingerprint(precinct, precinct_properties):
+    """
+    Hash the parts of a precinct feature that its crosswalk row is made from:
+    its geometry and the properties copied to the row.
+    """
+    data = [
+        precinct['geometry'],
+        [precinct['properties'].get(src_prop)
+            for src_prop, dst_prop in precinct_properties],
+    ]
+    # marshal's version 2 format writes floats in binary and never depends
+    # on object identity, and it's much faster than JSON for coordinates
+    return hashlib.sha1(marshal.dumps(data, 2)).hexdigest()
+
+
+def _read_csv_rows(path):
+    """Return the rows of a CSV file as dicts, or None if it doesn't exist"""
+    try:
+        with open(path) as fh:
+            return list(csv.DictReader(fh))
+    except (IOError, OSError):
+        return None
+
+
+def _csv_text(value):
+    return '' if value is None else str(value)
+
+
+def _crosswalk_diff(old_rows, new_rows, id_field):
+    """
+    Return ``(precinct, old_tract, new_tract)`` for each precinct that was
+    added, removed or matched to a different tract, sorted by precinct.
+    The tract is None on the side a precinct is missing from.
+    """
+    old = dict((_csv_text(row[id_field]), _csv_text(row['tract_geoid']))
+        for row in old_rows)
+    new = dict((_csv_text(row[id_field]), _csv_text(row['tract_geoid']))
+        for row in new_rows)
+    return sorted((precinct, old.get(precinct), new.get(precinct))
+        for precinct in set(old) | set(new)
+        if old.get(precinct) != new.get(precinct))
+
+
+def _print_crosswalk_diff(dest, diff):
+    print("{}: {} precinct(s) changed tracts".format(os.path.basename(dest),
+        len(diff)))
+    for precinct, old_tract, new_tract in diff:
+        if old_tract is None:
+            print("  added    {} in {}".format(precinct, new_tract))
+        elif new_tract is None:
+            print("  removed  {} from {}".format(precinct, old_tract))
+        else:
+            print("  moved    {} from {} to {}".format(precinct, old_tract,
+                new_tract))
+
+
+def _generate_precinct_tract_crosswalk(tracts_path, precincts_path, dest,
+        tract_properties, precinct_properties, crosswalk_tract_properties,
+        processes=None, id_field=None, fingerprints_path=None):
+    """
+    Write a crosswalk of each precinct to the tract that contains its
+    centroid.
+
+    Precincts are streamed from their GeoJSON in chunks, which are matched
+    to tracts by a pool of ``processes`` worker processes, defaulting to one
+    per CPU.  Rows are written in the order of the precincts file.
+
+    If ``fingerprints_path`` is given, a hash of each precinct is saved
+    there, and the next run reuses the rows of precincts whose hashes
+    haven't changed, only matching new or redrawn precincts to tracts.  Rows
+    are only reused if the tracts, the properties and ``dest`` itself are
+    the same as last time.  If ``id_field`` is given, the precincts that
+    were added, removed or moved to a different tract since the last
+    crosswalk are printed.
+
+    Returns the number of precincts that were matched to tracts.
+    """
+    from chicago.geojson import iter_features
+    from chicago.snapshot import file_digest
+
+    context = json.loads(json.dumps({
+        'version': CROSSWALK_FINGERPRINT_VERSION,
+        'tracts': file_digest(tracts_path),
+        'properties': [tract_properties, precinct_properties,
+            crosswalk_tract_properties],
+    }))
+    old_rows = _read_csv_rows(dest)
+    reusable = {}
+    if fingerprints_path is not None and old_rows is not None:
+        previous = _read_json(fingerprints_path) or {}
+        if (previous.get('context') == context
+                and previous.get('crosswalk') == file_digest(dest)
+                and len(previous['fingerprints']) == len(old_rows)):
+            reusable = dict(zip(previous['fingerprints'], old_rows))
+
+    # Rows reused from the last crosswalk, with None for the precincts that
+    # are sent to the workers, whose positions are queued in ``positions``
+    rows = []
+    fingerprints = []
+    positions = collections.deque()
+
+    def changed_precincts():
+        for precinct in iter_features(precincts_path):
+            row = None
+            if fingerprints_path is not None:
+                fingerprint = _precinct_fingerprint(precinct,
+                    precinct_properties)
+                row = reusable.get(fingerprint)
+                fingerprints.append(fingerprint)
+            if row is None:
+                positions.append(len(rows))
+            rows.append(row)
+            if row is None:
+                yield precinct
+
+    chunks = _chunked(changed_precincts(), CROSSWALK_CHUNK_SIZE)
+    first_chunk = next(chunks, None)
+    joined = 0
+    if first_chunk is not None:
+        # Tracts are only loaded if some precincts need matching
+        processes = int(processes or multiprocessing.cpu_count())
+        load_args = (tracts_path, tract_properties, precinct_properties,
+            crosswalk_tract_properties)
+        if processes <= 1:
+            func = _CrosswalkMatcher.load(*load_args).rows
+            initargs = ()
+        elif multiprocessing.get_start_method() == 'fork':
+            # Forked workers are handed the loaded tracts without pickling
+            func = _crosswalk_worker_rows
+            initargs = (_CrosswalkMatcher.load(*load_args),)
+        else:
+            func = _crosswalk_worker_rows
+            initargs = (load_args,)
+
+        for results in _map_in_order(func,
+                itertools.chain([first_chunk], chunks), processes,
+                _init_crosswalk_worker, initargs):
+            for row in results:
+                rows[positions.popleft()] = row
+            joined += len(results)
+
+    # The old crosswalk is read before it's replaced, so write the new one
+    # to a temporary file and move it into place
+    fieldnames = [dst_prop for src_prop, dst_prop in precinct_properties]
+    fieldnames += [dst_prop for src_prop, dst_prop in crosswalk_tract_properties]
+    temp_path = dest + '.tmp'
+    with open(temp_path, 'w') as fh:
+        writer = csv.DictWriter(fh, sorted(fieldnames))
+        writer.writeheader()
+        writer.writerows(rows)
+    os.rename(temp_path, dest)
+
+    if fingerprints_path is not None:
+        _mkdir_p(os.path.dirname(fingerprints_path))
+        _write_json(fingerprints_path, {
+            'context': context,
+            'crosswalk': file_digest(dest),
+            'fingerprints': fingerprints,
+        })
+
+    print("{}: {} precinct(s), {} reused and {} matched to tracts".format(
+        os.path.basename(dest), len(rows), len(rows) - joined, joined))
+    if id_field is not None and old_rows is not None:
+        _print_crosswalk_diff(dest, _crosswalk_diff(old_rows, rows, id_field))
+
+    return joined
+
+
+def _generate_precinct_tract_weights(tracts_path, precincts_path, dest,
+        tract_id_property, precinct_id_property, min_weight=0.001):
+    """
+    Write the share of each precinct's area in each tract it overlaps, for
+    apportioning precinct values to tracts with chicago.apportion.
+
+    Overlaps of less than ``min_weight`` of a precinct, usually slivers
+    where boundaries were drawn slightly differently, are dropped and the
+    remaining weights are scaled to add up to 1.  Areas are measured in
+    square degrees, which is fine for comparing parts of the same precinct.
+    """
+    from shapely.geometry import shape
+    from shapely.prepared import prep
+
+    from chicago.geojson import iter_features
+    from chicago.spatial import STRtree
+
+    tract_geos = _load_tract_geos(tracts_path, ((tract_id_property, 'geoid'),))
+    prepared = [prep(tract['shape']) for tract in tract_geos]
+    tree = STRtree([tract['shape'].bounds for tract in tract_geos])
+
+    with open(dest, 'w') as fh:
+        writer = csv.DictWriter(fh, ['precinct_id', 'tract_geoid', 'weight'])
+        writer.writeheader()
+
+        for precinct in iter_features(precincts_path):
+            precinct_shape = shape(precinct['geometry'])
+            areas = []
+            for i in tree.query_box(precinct_shape.bounds):
+                if prepared[i].intersects(precinct_shape):
+                    area = tract_geos[i]['shape'].intersection(
+                        precinct_shape).area
+                    if area > 0:
+                        areas.append((tract_geos[i]['geoid'], area))
+
+            total = sum(area for geoid, area in areas)
+            areas = [(geoid, area) for geoid, area in areas
+                if area >= total * min_weight]
+            total = sum(area for geoid, area in areas)
+
+            # Every precinct should overlap some tract
+            assert areas
+
+            # Round weights to millionths, letting the last one take up the
+            # rounding so that they still add up to exactly 1
+            weights = [int(round(area / total * 1000000))
+                for geoid, area in areas]
+            weights[-1] = 1000000 - sum(weights[:-1])
+            for (geoid, area), weight in zip(areas, weights):
+                writer.writerow({
+                    'precinct_id': precinct['properties'][precinct_id_property],
+                    'tract_geoid': geoid,
+                    'weight': '{}.{:06d}'.format(*divmod(weight, 1000000)),
+                })
 
 
 def generate_chicago_precinct_tract_crosswalk(precincts_path=None,
-        tracts_path=None, dest=None):
+        tracts_path=None, dest=None, processes=None, incremental=True):
     """
     Generate crosswalk of precincts<->census tracts for Chicago.
+
+    Only precincts that are new or were redrawn since the last run are
+    matched to tracts, unless ``incremental=False``.
     """
 
     if precincts_path is None:
@@ -269,14 +799,24 @@ def generate_chicago_precinct_tract_crosswalk(precincts_path=None,
         ('statefp10', 'tract_statefp'),
     )
 
+    fingerprints_path = _temp_path(
+        os.path.basename(dest) + '.fingerprints.json')
+    if not _boolean(incremental):
+        _remove(fingerprints_path)
+
     _generate_precinct_tract_crosswalk(tracts_path, precincts_path, dest,
-        tract_properties, precinct_properties, crosswalk_tract_properties)
+        tract_properties, precinct_properties, crosswalk_tract_properties,
+        processes=processes, id_field='precinct_full_name',
+        fingerprints_path=fingerprints_path)
 
 
 def generate_suburban_cook_precinct_tract_crosswalk(precincts_path=None,
-        tracts_path=None, dest=None):
+        tracts_path=None, dest=None, processes=None, incremental=True):
     """
     Generate crosswalk of precincts<->census tracts for suburban Cook County.
+
+    Only precincts that are new or were redrawn since the last run are
+    matched to tracts, unless ``incremental=False``.
     """
     if precincts_path is None:
         precincts_path = os.path.join(TEMP_DATA_DIR, 'suburban_cook_precincts.geojson')
@@ -300,22 +840,486 @@ def generate_suburban_cook_precinct_tract_crosswalk(precincts_path=None,
        ('geoid', 'tract_geoid'),
     )
 
+    fingerprints_path = _temp_path(
+        os.path.basename(dest) + '.fingerprints.json')
+    if not _boolean(incremental):
+        _remove(fingerprints_path)
+
     _generate_precinct_tract_crosswalk(tracts_path, precincts_path, dest,
-        tract_properties, precinct_properties, crosswalk_tract_properties)
+        tract_properties, precinct_properties, crosswalk_tract_properties,
+        processes=processes, id_field='precinct_number',
+        fingerprints_path=fingerprints_path)
+
+
+def generate_chicago_precinct_tract_weights(precincts_path=None,
+        tracts_path=None, dest=None):
+    """
+    Generate area weights for apportioning Chicago precincts to census
+    tracts.
+    """
+    if precincts_path is None:
+        precincts_path = os.path.join(TEMP_DATA_DIR, 'chicago_precincts.geojson')
+
+    if tracts_path is None:
+        tracts_path = os.path.join(TEMP_DATA_DIR, 'chicago_tracts.geojson')
 
+    if dest is None:
+        dest = os.path.join(OUTPUT_DATA_DIR, 'chicago_precinct_census_tract_weights.csv')
+
+    _generate_precinct_tract_weights(tracts_path, precincts_path, dest,
+        'geoid10', 'full_text')
+
+
+def generate_suburban_cook_precinct_tract_weights(precincts_path=None,
+        tracts_path=None, dest=None):
+    """
+    Generate area weights for apportioning suburban Cook County precincts to
+    census tracts.
+    """
+    if precincts_path is None:
+        precincts_path = os.path.join(TEMP_DATA_DIR, 'suburban_cook_precincts.geojson')
+
+    if tracts_path is None:
+        tracts_path = os.path.join(TEMP_DATA_DIR, 'tl_2015_17_tract__cook.geojson')
+
+    if dest is None:
+        dest = os.path.join(OUTPUT_DATA_DIR, 'suburban_cook_precinct_census_tract_weights.csv')
+
+    _generate_precinct_tract_weights(tracts_path, precincts_path, dest,
+        'GEOID', 'idpct')
+
+
+# Source GeoJSON and the property that identifies each feature, by geocoder
+# layer.  IDs must match the layer's collection field in chicago.geocoder.
+GEOMETRY_SOURCES = {
+    'community_areas': ('community_areas.geojson', 'area_numbe'),
+    'neighborhoods': ('neighborhoods.geojson', 'pri_neigh'),
+    'tracts': ('chicago_tracts.geojson', 'geoid10'),
+    'precincts': ('chicago_precincts.geojson', 'full_text'),
+    'cook_suburban_precincts': ('suburban_cook_precincts.geojson', 'idpct'),
+    'counties': ('illinois_counties.geojson', 'COUNTYFP'),
+}
+
+
+def build_geometry(layer, src=None, dest=None):
+    """
+    Encode a layer's boundaries from GeoJSON into the compact geometry
+    format read by chicago.geocoder.
+    """
+    from chicago.geocoder import get_geometry_filename
+    from chicago.geojson import iter_features
+    from chicago.geometry import write_geometry
+
+    filename, id_property = GEOMETRY_SOURCES[layer]
+    if src is None:
+        src = os.path.join(TEMP_DATA_DIR, filename)
+
+    if dest is None:
+        dest = get_geometry_filename(layer)
+
+    _mkdir_p(os.path.dirname(dest))
+
+    write_geometry(dest, iter_features(src), id_property)
+
+
+# The data build, as a graph of steps
+#
+# Each step declares the files it reads and writes.  A step runs after the
+# steps that write its inputs, and independent steps run concurrently.  The
+# content hashes of a step's inputs and outputs, and a hash of its
+# parameters and code, are recorded in BUILD_STATE_PATH after it runs, and
+# the step is skipped next time if none of them have changed.  Downloads
+# always run, since only the server knows if a source has changed, but
+# they're cheap when it hasn't, and they leave their files untouched.
+
+BUILD_STATE_PATH = os.path.join(TEMP_DATA_DIR, 'build_state.json')
+
+
+def _temp_path(filename):
+    return os.path.join(TEMP_DATA_DIR, filename)
+
+
+def _output_path(filename):
+    return os.path.join(OUTPUT_DATA_DIR, filename)
+
+
+def _boolean(value):
+    """Convert a task argument, which Fabric passes as a string, to a bool"""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'y', 'on')
+    return bool(value)
+
+
+class _Step(object):
+    """
+    A build step that calls ``func(**params)`` to write ``outputs`` from
+    ``inputs``.  Steps with ``always`` set run on every build.  Steps with
+    ``exclusive`` set, like the ones that fork worker processes, run on
+    their own in the main thread, never alongside other steps.
+    """
+
+    def __init__(self, func, inputs=(), outputs=(), always=False, name=None,
+            exclusive=False, **params):
+        self.func = func
+        self.name = name or func.__name__
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.always = always
+        self.exclusive = exclusive
+        self.params = params
+
+    def __repr__(self):
+        return "_Step(name={!r})".format(self.name)
+
+    def recipe_digest(self):
+        """Hash the step's parameters and the source code of its function"""
+        digest = hashlib.sha1()
+        digest.update(json.dumps([self.name, self.params],
+            sort_keys=True).encode('utf-8'))
+        try:
+            digest.update(inspect.getsource(self.func).encode('utf-8'))
+        except (IOError, OSError, TypeError):
+            pass
+        return digest.hexdigest()
+
+    def run(self):
+        return self.func(**self.params)
+
+
+def _crosswalk_steps():
+    cook_tracts = _temp_path('tl_2015_17_tract__cook.geojson')
+    illinois_tracts = _temp_path(_url_filename(ILLINOIS_TRACTS_SHAPEFILE_URL))
+    illinois_county_fips = _temp_path(_url_filename(ILLINOIS_COUNTY_FIPS_URL))
+    chicago_tracts = _temp_path('chicago_tracts.geojson')
+    chicago_precincts = _temp_path('chicago_precincts.geojson')
+    suburban_precincts = _temp_path('suburban_cook_precincts.geojson')
+    county_fips = _output_path('county_fips.csv')
+
+    return [
+        _Step(download_chicago_tracts, outputs=[chicago_tracts],
+            always=True, dest=chicago_tracts),
+        _Step(download_illinois_tracts, outputs=[illinois_tracts],
+            always=True, dest=illinois_tracts),
+        _Step(download_illinois_county_fips_codes,
+            outputs=[illinois_county_fips], always=True,
+            dest=illinois_county_fips),
+        _Step(download_chicago_precincts, outputs=[chicago_precincts],
+            always=True, dest=chicago_precincts),
+        _Step(download_suburban_cook_precincts, outputs=[suburban_precincts],
+            always=True, dest=suburban_precincts),
+
+        _Step(build_county_fips_crosswalk, inputs=[illinois_county_fips],
+            outputs=[county_fips], src=illinois_county_fips,
+            dest=county_fips),
+        # The county's FIPS code is looked up in county_fips.csv
+        _Step(generate_county_tracts_geojson,
+            inputs=[illinois_tracts, county_fips], outputs=[cook_tracts],
+            src=illinois_tracts, dest=cook_tracts, county='Cook'),
+        _Step(build_suburban_cook_precincts_csv, inputs=[suburban_precincts],
+            outputs=[_output_path('cook_suburban_precincts_as_of_2016.csv')],
+            src=suburban_precincts,
+            dest=_output_path('cook_suburban_precincts_as_of_2016.csv')),
+        _Step(generate_chicago_precinct_tract_crosswalk,
+            inputs=[chicago_precincts, chicago_tracts],
+            outputs=[_output_path('chicago_precinct_census_tract_crosswalk.csv')],
+            exclusive=True, precincts_path=chicago_precincts,
+            tracts_path=chicago_tracts,
+            dest=_output_path('chicago_precinct_census_tract_crosswalk.csv')),
+        _Step(generate_suburban_cook_precinct_tract_crosswalk,
+            inputs=[suburban_precincts, cook_tracts],
+            outputs=[_output_path('suburban_cook_precinct_census_tract_crosswalk.csv')],
+            exclusive=True, precincts_path=suburban_precincts,
+            tracts_path=cook_tracts,
+            dest=_output_path('suburban_cook_precinct_census_tract_crosswalk.csv')),
+        _Step(generate_chicago_precinct_tract_weights,
+            inputs=[chicago_precincts, chicago_tracts],
+            outputs=[_output_path('chicago_precinct_census_tract_weights.csv')],
+            precincts_path=chicago_precincts, tracts_path=chicago_tracts,
+            dest=_output_path('chicago_precinct_census_tract_weights.csv')),
+        _Step(generate_suburban_cook_precinct_tract_weights,
+            inputs=[suburban_precincts, cook_tracts],
+            outputs=[_output_path('suburban_cook_precinct_census_tract_weights.csv')],
+            precincts_path=suburban_precincts, tracts_path=cook_tracts,
+            dest=_output_path('suburban_cook_precinct_census_tract_weights.csv')),
+    ]
+
+
+def _geometry_steps():
+    from chicago.geocoder import get_geometry_filename
+
+    us_counties = _temp_path(_url_filename(US_COUNTIES_SHAPEFILE_URL))
+    steps = [
+        _Step(download_community_areas,
+            outputs=[_temp_path('community_areas.geojson')], always=True,
+            dest=_temp_path('community_areas.geojson')),
+        _Step(download_neighborhoods,
+            outputs=[_temp_path('neighborhoods.geojson')], always=True,
+            dest=_temp_path('neighborhoods.geojson')),
+        _Step(download_us_counties, outputs=[us_counties], always=True,
+            dest=us_counties),
+        _Step(generate_illinois_counties_geojson, inputs=[us_counties],
+            outputs=[_temp_path('illinois_counties.geojson')],
+            src=us_counties, dest=_temp_path('illinois_counties.geojson')),
+    ]
+    for layer in sorted(GEOMETRY_SOURCES):
+        src = _temp_path(GEOMETRY_SOURCES[layer][0])
+        dest = get_geometry_filename(layer)
+        steps.append(_Step(build_geometry, inputs=[src], outputs=[dest],
+            name='build_geometry:{}'.format(layer), layer=layer, src=src,
+            dest=dest))
+    return steps
+
+
+def _merge_steps(*step_lists):
+    """Combine lists of steps, keeping one of each step that's repeated"""
+    steps = []
+    names = set()
+    for step_list in step_lists:
+        for step in step_list:
+            if step.name not in names:
+                names.add(step.name)
+                steps.append(step)
+    return steps
+
+
+class _Build(object):
+    """Runs a graph of steps, skipping the ones that are up to date"""
+
+    def __init__(self, steps, state_path=BUILD_STATE_PATH, threads=4,
+            log=None):
+        self.steps = dict((step.name, step) for step in steps)
+        self.order = [step.name for step in steps]
+        self.state_path = state_path
+        self.threads = max(1, int(threads))
+        self.log = log or print
+        self.state = _read_json(state_path) or {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+        producers = {}
+        for step in steps:
+            for path in step.outputs:
+                if path in producers:
+                    raise ValueError("{} is written by both {} and {}".format(
+                        path, producers[path], step.name))
+                producers[path] = step.name
+        self.dependencies = dict((step.name, set(producers[path]
+                for path in step.inputs if path in producers))
+            for step in steps)
+
+    def _key(self, path):
+        return os.path.relpath(path, BASE_DIR)
+
+    def _digest(self, path):
+        """Return the SHA-1 of a file, or None if it doesn't exist"""
+        from chicago.snapshot import file_digest
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cache_key = (path, stat.st_size, stat.st_mtime)
+        with self._lock:
+            digest = self._digests.get(cache_key)
+        if digest is None:
+            digest = file_digest(path)
+            with self._lock:
+                self._digests[cache_key] = digest
+        return digest
+
+    def _digests_of(self, paths):
+        return dict((self._key(path), self._digest(path)) for path in paths)
+
+    def check(self, name):
+        """
+        Return a ``(current, reason)`` pair telling whether a step can be
+        skipped, given the files on disk now.
+        """
+        step = self.steps[name]
+        if step.always:
+            return False, 'always runs'
+
+        record = self.state.get(name)
+        if record is None:
+            return False, 'never run'
+        if record.get('recipe') != step.recipe_digest():
+            return False, 'parameters or code changed'
+        for path in step.inputs:
+            if record['inputs'].get(self._key(path)) != self._digest(path):
+                return False, 'input changed: {}'.format(self._key(path))
+        for path in step.outputs:
+            if record['outputs'].get(self._key(path)) != self._digest(path):
+                return False, 'output missing or changed: {}'.format(
+                    self._key(path))
+        return True, 'up to date'
+
+    def topological_order(self):
+        order = []
+        done = set()
+        pending = list(self.order)
+        while pending:
+            ready = [name for name in pending
+                if self.dependencies[name] <= done]
+            if not ready:
+                raise ValueError("Build steps have a cycle: {}".format(
+                    ', '.join(pending)))
+            for name in ready:
+                order.append(name)
+                done.add(name)
+                pending.remove(name)
+        return order
+
+    def plan(self):
+        """
+        Return a list of ``(name, action, reason)`` for each step, in an
+        order they could run in.
+
+        ``action`` is ``'run'``, ``'skip'`` or ``'maybe'``, for steps that
+        are up to date now but depend on steps that will run.
+        """
+        plan = []
+        actions = {}
+        for name in self.topological_order():
+            current, reason = self.check(name)
+            upstream = [dependency for dependency in
+                sorted(self.dependencies[name])
+                if actions[dependency] != 'skip']
+            if not current:
+                action = 'run'
+            elif upstream:
+                action = 'maybe'
+                reason = 'runs if {} changes its output'.format(
+                    ' or '.join(upstream))
+            else:
+                action = 'skip'
+            actions[name] = action
+            plan.append((name, action, reason))
+        return plan
+
+    def _save_state(self):
+        _mkdir_p(os.path.dirname(self.state_path))
+        temp_path = self.state_path + '.tmp'
+        _write_json(temp_path, self.state)
+        os.rename(temp_path, self.state_path)
+
+    def _run_step(self, name):
+        step = self.steps[name]
+        current, reason = self.check(name)
+        if current:
+            self.log("[skip] {}".format(name))
+            return False
+
+        self.log("[run]  {} ({})".format(name, reason))
+        input_digests = self._digests_of(step.inputs)
+        step.run()
+        record = {
+            'recipe': step.recipe_digest(),
+            'inputs': input_digests,
+            'outputs': self._digests_of(step.outputs),
+        }
+        with self._lock:
+            self.state[name] = record
+            self._save_state()
+        return True
+
+    def run(self):
+        """
+        Run the steps that aren't up to date, each as soon as the steps it
+        depends on have finished.  Exclusive steps wait for the running
+        steps to finish, then run in this thread while no others start, so
+        worker processes are never forked while other steps are running.
+        Returns the names of the steps that ran.
+        """
+        self.topological_order()
+
+        finished = queue.Queue()
+        pending = list(self.order)
+        done = set()
+        running = set()
+        ran = []
+        error = None
+        pool = ThreadPool(self.threads)
+        try:
+            while pending or running:
+                if error is None:
+                    ready = [name for name in pending
+                        if self.dependencies[name] <= done]
+                    exclusive = [name for name in ready
+                        if self.steps[name].exclusive]
+                    if exclusive and not running:
+                        name = exclusive[0]
+                        pending.remove(name)
+                        try:
+                            result = self._run_step(name)
+                        except Exception as e:
+                            error = e
+                            continue
+                        done.add(name)
+                        if result:
+                            ran.append(name)
+                        continue
+                    if exclusive:
+                        # Wait for the running steps before the exclusive one
+                        ready = []
+                    for name in ready:
+                        pending.remove(name)
+                        running.add(name)
+                        pool.apply_async(self._run_step, (name,),
+                            callback=lambda result, name=name: finished.put(
+                                (name, result, None)),
+                            error_callback=lambda e, name=name: finished.put(
+                                (name, None, e)))
+                if not running:
+                    break
+
+                name, result, step_error = finished.get()
+                running.remove(name)
+                if step_error is not None:
+                    # Let running steps finish, but don't start any more
+                    if error is None:
+                        error = step_error
+                    continue
+                done.add(name)
+                if result:
+                    ran.append(name)
+        finally:
+            pool.close()
+            pool.join()
+
+        if error is not None:
+            raise error
+        return ran
+
+
+def _build(steps, dry_run=False, threads=4):
+    build = _Build(steps, threads=threads)
+    if _boolean(dry_run):
+        for name, action, reason in build.plan():
+            print("[{}] {} ({})".format(action, name, reason))
+        return
+    build.run()
+
+
+def build_precinct_to_tract_crosswalks(dry_run=False, threads=4):
+    """
+    Build the precinct to tract crosswalks and weights, skipping steps whose
+    inputs haven't changed.  Use ``dry_run=True`` to print the plan.
+    """
+    _build(_crosswalk_steps(), dry_run, threads)
+
+
+def build_geometries(dry_run=False, threads=4):
+    """
+    Build the geocoder's boundary files, skipping layers whose GeoJSON
+    hasn't changed.  Use ``dry_run=True`` to print the plan.
+    """
+    _build(_geometry_steps(), dry_run, threads)
 
-def build_precinct_to_tract_crosswalks():
-    download_chicago_tracts()
-    download_illinois_tracts()
-    download_illinois_county_fips_codes()
-    download_chicago_precincts()
-    download_suburban_cook_precincts()
 
-    build_county_fips_crosswalk()
-    generate_county_tracts_geojson()
-    build_suburban_cook_precincts_csv()
-    generate_chicago_precinct_tract_crosswalk()
-    generate_suburban_cook_precinct_tract_crosswalk()
+def build(dry_run=False, threads=4):
+    """Build all of the package's data files"""
+    _build(_merge_steps(_crosswalk_steps(), _geometry_steps()), dry_run,
+        threads)
 
 
 def clean():
@@ -25,6 +25,12 @@ setup(
     include_package_data=True,
     install_requires=[
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'pandas': ['pandas'],
+        'scipy': ['numpy', 'scipy'],
+    },
     tests_require=[
         'nose',
     ],
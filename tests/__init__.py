@@ -0,0 +1,14 @@
+"""
+Snapshots and tables built while testing are written to a temporary
+directory, instead of the user's cache, which is removed when the tests
+finish.  Tests that depend on ``CHICAGO_SNAPSHOTS`` or
+``CHICAGO_SHARED_TABLES`` set them themselves.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+SNAPSHOT_DIRECTORY = tempfile.mkdtemp(prefix='chicago-tests-')
+os.environ['CHICAGO_SNAPSHOT_DIR'] = SNAPSHOT_DIRECTORY
+atexit.register(shutil.rmtree, SNAPSHOT_DIRECTORY, True)
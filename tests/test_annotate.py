@@ -0,0 +1,77 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from chicago.__main__ import main
+from chicago.annotate import annotate
+
+CSV_INPUT = (
+    'ward,precinct,note\n'
+    '39,12,"two\nlines"\n'
+    '1,1,\n'
+    '99,1,missing\n'
+)
+
+
+class AnnotateTestCase(TestCase):
+    def annotate_csv(self, **kwargs):
+        outfile = io.StringIO()
+        stats = annotate(io.StringIO(CSV_INPUT), outfile, **kwargs)
+        return stats, outfile.getvalue()
+
+    def test_annotate_csv(self):
+        stats, output = self.annotate_csv(chunk_size=2)
+        self.assertEqual(stats.rows, 3)
+        self.assertEqual(stats.matched, 2)
+
+        lines = output.splitlines()
+        self.assertEqual(lines[0], 'ward,precinct,note,tract_geoid,'
+            'community_area_number,community_area_name,county_fips,'
+            'county_name')
+        self.assertEqual(lines[1], '39,12,"two')
+        self.assertEqual(lines[2],
+            'lines",17031140302,14,Albany Park,031,Cook')
+        self.assertEqual(lines[4], '99,1,missing,,,,,')
+
+    def test_workers_preserve_order(self):
+        _, serial = self.annotate_csv(chunk_size=1)
+        stats, parallel = self.annotate_csv(chunk_size=1, workers=2)
+        self.assertEqual(stats.workers, 2)
+        self.assertEqual(serial, parallel)
+
+    def test_annotate_jsonl(self):
+        infile = io.StringIO('{"precinct_id": "39012"}\n\n'
+            '{"precinct_id": "1"}\n')
+        outfile = io.StringIO()
+        annotate(infile, outfile, input_format='jsonl',
+            precinct_id_field='precinct_id')
+        rows = [json.loads(line) for line in outfile.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['tract_geoid'], '17031140302')
+        self.assertEqual(rows[0]['community_area_name'], 'Albany Park')
+        self.assertEqual(rows[1]['tract_geoid'], None)
+
+
+class AnnotateCommandTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_annotate_command(self):
+        input_path = os.path.join(self.directory, 'results.csv')
+        output_path = os.path.join(self.directory, 'annotated.jsonl')
+        with io.open(input_path, 'w', newline='') as f:
+            f.write(CSV_INPUT)
+
+        main(['annotate', input_path, '-o', output_path, '--workers', '1',
+            '--quiet'])
+
+        with io.open(output_path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row['tract_geoid'] for row in rows],
+            ['17031140302', '17031222500', None])
@@ -0,0 +1,149 @@
+import functools
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf, skipUnless
+from unittest.mock import patch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from chicago import apportion, get_precincts_from_tract_geoid
+from chicago.apportion import Apportionment, aggregate, get_apportionment
+from chicago.base import LazyDataset
+
+WEIGHTS_CSV = """precinct_id,tract_geoid,weight
+1001,17031000100,0.750000
+1001,17031000200,0.250000
+1002,17031000200,1.000000
+1003,17031840000,1.000000
+"""
+
+
+class ApportionmentTestCase(TestCase):
+    def setUp(self):
+        self.apportionment = Apportionment.from_csv(io.StringIO(WEIGHTS_CSV),
+            sources=['1000', '1001', '1002', '1003'])
+
+    def test_from_csv(self):
+        self.assertEqual(self.apportionment.sources,
+            ['1000', '1001', '1002', '1003'])
+        self.assertEqual(self.apportionment.targets,
+            ['17031000100', '17031000200', '17031840000'])
+        self.assertEqual(self.apportionment.get_weights('1001'),
+            {'17031000100': 0.75, '17031000200': 0.25})
+        self.assertEqual(self.apportionment.get_weights('1000'), {})
+
+    def test_aggregate(self):
+        self.assertEqual(self.apportionment.aggregate([5, 100, 10, 1]),
+            [75.0, 35.0, 1.0])
+        self.assertEqual(self.apportionment.aggregate({1001: 100, '1003': 2}),
+            {'17031000100': 75.0, '17031000200': 25.0, '17031840000': 2.0})
+
+        with patch.object(apportion, 'scipy', None):
+            self.assertEqual(self.apportionment.aggregate([5, 100, 10, 1]),
+                [75.0, 35.0, 1.0])
+
+    def test_aggregate_errors(self):
+        with self.assertRaises(ValueError):
+            self.apportionment.aggregate([1, 2])
+        with self.assertRaises(KeyError):
+            self.apportionment.aggregate({'9999': 1})
+
+    @skipIf(numpy is None, "NumPy is not installed")
+    def test_aggregate_numpy(self):
+        totals = self.apportionment.aggregate(numpy.array([5, 100, 10, 1]))
+        self.assertIsInstance(totals, numpy.ndarray)
+        self.assertEqual(totals.tolist(), [75.0, 35.0, 1.0])
+
+    def test_rollup(self):
+        rolled_up = self.apportionment.rollup(
+            lambda geoid: None if geoid.startswith('170318') else 'city')
+        self.assertEqual(rolled_up.targets, ['city'])
+        self.assertEqual(rolled_up.aggregate([5, 100, 10, 1]), [110.0])
+
+
+class AggregateTestCase(TestCase):
+    def test_tracts(self):
+        totals = aggregate(dict((source, 1) for source in
+            get_apportionment('tracts').sources))
+        if get_apportionment('tracts').weights_filename is None:
+            # Each precinct counts toward the tract with its centroid
+            self.assertEqual(totals['17031140302'],
+                len(get_precincts_from_tract_geoid('17031140302')))
+        self.assertAlmostEqual(sum(totals.values()),
+            len(get_apportionment('tracts').sources))
+
+    def test_community_areas_and_counties(self):
+        self.assertEqual(aggregate({'39012': 5}, to='community_areas')['14'],
+            5.0)
+        self.assertEqual(aggregate({'39012': 5}, to='counties'), {'031': 5.0})
+
+    def test_precinct_keys(self):
+        # Precinct IDs are compared like PRECINCTS.get_by('full_name', ...)
+        expected = aggregate({'01001': 5})
+        self.assertEqual(aggregate({1001: 5}), expected)
+        self.assertEqual(aggregate({'1001': 5}), expected)
+        self.assertEqual(get_apportionment().get_weights(1001),
+            get_apportionment().get_weights('01001'))
+        with self.assertRaises(KeyError):
+            aggregate({'x': 1})
+
+    def test_cook_suburbs(self):
+        sources = get_apportionment('tracts', 'cook_suburbs').sources
+        totals = aggregate([1] * len(sources), geography='cook_suburbs')
+        self.assertEqual(sum(totals), len(sources))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            aggregate({}, to='wards')
+        with self.assertRaises(ValueError):
+            aggregate({}, geography='indiana')
+
+
+class WeightsFileTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'weights.csv')
+        with open(self.path, 'w') as f:
+            f.write(WEIGHTS_CSV)
+
+        patcher = patch.object(apportion, 'CHICAGO_WEIGHTS_CSV_FILENAME',
+            self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(apportion.APPORTIONMENTS, dict(
+            (key, LazyDataset(functools.partial(apportion._load_level, *key)))
+            for key in apportion.APPORTIONMENTS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_weights_used(self):
+        self.assertEqual(get_apportionment().weights_filename, self.path)
+        self.assertEqual(get_apportionment('counties').weights_filename,
+            self.path)
+        self.assertEqual(aggregate({'1001': 100}),
+            {'17031000100': 75.0, '17031000200': 25.0, '17031840000': 0.0})
+        self.assertEqual(get_apportionment('tracts',
+            'cook_suburbs').weights_filename, None)
+
+
+@skipUnless(os.path.exists(apportion.CHICAGO_WEIGHTS_CSV_FILENAME),
+    "The area weights haven't been built")
+class PackagedWeightsTestCase(TestCase):
+    def test_split(self):
+        apportionment = get_apportionment()
+        self.assertEqual(apportionment.weights_filename,
+            apportion.CHICAGO_WEIGHTS_CSV_FILENAME)
+        split = [source for source in apportionment.sources
+            if len(apportionment.get_weights(source)) > 1]
+        self.assertNotEqual(split, [])
+        for source in split[:10]:
+            self.assertAlmostEqual(
+                sum(apportionment.get_weights(source).values()), 1.0)
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+from chicago import COUNTIES, PRECINCTS
+from chicago.illinois.counties import CountyCollection
+from chicago.precincts import PrecinctCollection
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class BackendTestMixin(object):
+    def test_len_and_order(self):
+        self.assertEqual(len(self.precincts), len(PRECINCTS))
+        self.assertEqual([p.full_name for p in self.precincts][:3],
+            [p.full_name for p in PRECINCTS][:3])
+        self.assertEqual(self.precincts[0].full_name, PRECINCTS[0].full_name)
+        self.assertEqual(self.precincts[-1].full_name,
+            PRECINCTS[-1].full_name)
+        self.assertEqual(len(self.precincts[:2]), 2)
+
+    def test_get_by(self):
+        precinct = self.precincts.get_by_full_name(39012)
+        self.assertEqual(precinct.ward, '39')
+        self.assertEqual(self.precincts.get_by_full_name('01001').number,
+            '1')
+        self.assertRaises(KeyError, self.precincts.get_by_full_name, 'x')
+
+    def test_ignore_case(self):
+        self.assertEqual(self.counties.get_by_name('COOK').countyfp, '031')
+        self.assertEqual(self.counties.get_by_fips(31).countyname, 'Cook')
+        self.assertEqual(self.counties.get_by_name('Nope'), None)
+
+    def test_read_only(self):
+        self.assertRaises(ValueError, self.precincts.add_item, PRECINCTS[0])
+
+
+class SQLiteBackendTestCase(BackendTestMixin, TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'chicago.sqlite')
+        PRECINCTS.to_sqlite(path)
+        COUNTIES.to_sqlite(path)
+        self.precincts = PrecinctCollection().from_sqlite(path)
+        self.counties = CountyCollection().from_sqlite(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+@skipIf(pyarrow is None, "pyarrow isn't installed")
+class ParquetBackendTestCase(BackendTestMixin, TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        precincts_path = os.path.join(self.directory, 'precincts.parquet')
+        counties_path = os.path.join(self.directory, 'counties.parquet')
+        PRECINCTS.to_parquet(precincts_path)
+        COUNTIES.to_parquet(counties_path)
+        self.precincts = PrecinctCollection().from_parquet(precincts_path)
+        self.counties = CountyCollection().from_parquet(counties_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TableBackendTestCase(BackendTestMixin, TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        precincts_path = os.path.join(self.directory, 'precincts.table')
+        counties_path = os.path.join(self.directory, 'counties.table')
+        PRECINCTS.to_table(precincts_path)
+        COUNTIES.to_table(counties_path)
+        self.precincts = PrecinctCollection().from_table(precincts_path)
+        self.counties = CountyCollection().from_table(counties_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_filter_by(self):
+        from chicago import COOK_SUBURBAN_PRECINCTS
+        from chicago.cook_suburbs.precincts import (
+            CookSuburbanPrecinctCollection)
+
+        path = os.path.join(self.directory, 'suburban_precincts.table')
+        COOK_SUBURBAN_PRECINCTS.to_table(path)
+        precincts = CookSuburbanPrecinctCollection().from_table(path)
+        self.assertEqual(
+            [p.precinctid for p in precincts.get_by_town_name('evanston')],
+            [p.precinctid for p in
+                COOK_SUBURBAN_PRECINCTS.get_by_town_name('Evanston')])
+        self.assertEqual(precincts.get_by_town_name('Nowhere'), None)
@@ -0,0 +1,174 @@
+import os.path
+import shutil
+import tempfile
+import threading
+import time
+from unittest import TestCase, skipIf
+
+try:
+    import fabfile
+except ImportError:
+    fabfile = None
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def upper(src, dest):
+    _write(dest, _read(src).upper())
+
+
+def join(srcs, dest):
+    _write(dest, '+'.join(_read(src) for src in srcs))
+
+
+@skipIf(fabfile is None, "The fabfile's requirements are not installed")
+class BuildTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state_path = self.path('state.json')
+        _write(self.path('a.txt'), 'a')
+        _write(self.path('b.txt'), 'b')
+        self.log = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def steps(self):
+        a, b = self.path('a.txt'), self.path('b.txt')
+        a_upper, b_upper = self.path('A.txt'), self.path('B.txt')
+        joined = self.path('AB.txt')
+        return [
+            fabfile._Step(upper, inputs=[a], outputs=[a_upper],
+                name='upper_a', src=a, dest=a_upper),
+            fabfile._Step(upper, inputs=[b], outputs=[b_upper],
+                name='upper_b', src=b, dest=b_upper),
+            fabfile._Step(join, inputs=[a_upper, b_upper], outputs=[joined],
+                srcs=[a_upper, b_upper], dest=joined),
+        ]
+
+    def build(self, steps=None, threads=4):
+        return fabfile._Build(steps or self.steps(), self.state_path,
+            threads=threads, log=self.log.append)
+
+    def test_run(self):
+        self.assertEqual(sorted(self.build().run()),
+            ['join', 'upper_a', 'upper_b'])
+        self.assertEqual(_read(self.path('AB.txt')), 'A+B')
+        self.assertEqual(self.build().run(), [])
+
+    def test_input_changed(self):
+        self.build().run()
+        _write(self.path('b.txt'), 'bee')
+        self.assertEqual(self.build().run(), ['upper_b', 'join'])
+        self.assertEqual(_read(self.path('AB.txt')), 'A+BEE')
+
+    def test_output_changed(self):
+        self.build().run()
+        os.remove(self.path('AB.txt'))
+        self.assertEqual(self.build().run(), ['join'])
+
+    def test_parameters_changed(self):
+        self.build().run()
+        steps = self.steps()
+        steps[-1].params['dest'] = self.path('AB2.txt')
+        steps[-1].outputs = [self.path('AB2.txt')]
+        self.assertEqual(self.build(steps).run(), ['join'])
+
+    def test_plan(self):
+        self.assertEqual([(name, action) for name, action, reason in
+                self.build().plan()],
+            [('upper_a', 'run'), ('upper_b', 'run'), ('join', 'run')])
+        self.build().run()
+        _write(self.path('a.txt'), 'aa')
+        self.assertEqual([(name, action) for name, action, reason in
+                self.build().plan()],
+            [('upper_a', 'run'), ('upper_b', 'skip'), ('join', 'maybe')])
+        # Planning doesn't run anything
+        self.assertEqual(_read(self.path('A.txt')), 'A')
+
+    def test_concurrent(self):
+        # Each step waits for the other, so they have to run at once
+        barrier = threading.Barrier(2, timeout=5)
+
+        def touch(dest):
+            barrier.wait()
+            _write(dest, '')
+
+        steps = [fabfile._Step(touch, outputs=[self.path(name)], name=name,
+            dest=self.path(name)) for name in ('one', 'two')]
+        self.assertEqual(sorted(self.build(steps).run()), ['one', 'two'])
+
+    def test_exclusive(self):
+        lock = threading.Lock()
+        active = []
+        overlaps = []
+
+        def touch(dest):
+            with lock:
+                active.append(dest)
+                overlaps.append((dest, len(active),
+                    threading.current_thread() is threading.main_thread()))
+            time.sleep(0.05)
+            with lock:
+                active.remove(dest)
+            _write(dest, '')
+
+        steps = [fabfile._Step(touch, outputs=[self.path(name)], name=name,
+                exclusive=name.startswith('fork'), dest=self.path(name))
+            for name in ('one', 'fork_a', 'two', 'fork_b', 'three')]
+        self.assertEqual(len(self.build(steps).run()), 5)
+        # Exclusive steps run alone, in the main thread
+        for dest, count, main_thread in overlaps:
+            if 'fork' in dest:
+                self.assertEqual((count, main_thread), (1, True))
+
+    def test_failure(self):
+        def fail(dest):
+            raise RuntimeError("Failed")
+
+        steps = self.steps()
+        steps[1] = fabfile._Step(fail, inputs=[self.path('b.txt')],
+            outputs=[self.path('B.txt')], name='upper_b',
+            dest=self.path('B.txt'))
+        with self.assertRaises(RuntimeError):
+            self.build(steps).run()
+        self.assertFalse(os.path.exists(self.path('AB.txt')))
+        # Steps that finished are recorded
+        self.assertEqual(self.build().run(), ['upper_b', 'join'])
+
+    def test_cycle(self):
+        steps = [
+            fabfile._Step(upper, inputs=[self.path('x')],
+                outputs=[self.path('y')], name='x_to_y'),
+            fabfile._Step(upper, inputs=[self.path('y')],
+                outputs=[self.path('x')], name='y_to_x'),
+        ]
+        with self.assertRaises(ValueError):
+            self.build(steps).run()
+
+    def test_crosswalk_steps(self):
+        build = fabfile._Build(fabfile._merge_steps(
+            fabfile._crosswalk_steps(), fabfile._geometry_steps()),
+            self.state_path)
+        order = build.topological_order()
+        self.assertLess(order.index('build_county_fips_crosswalk'),
+            order.index('generate_county_tracts_geojson'))
+        self.assertLess(order.index('generate_county_tracts_geojson'),
+            order.index('generate_suburban_cook_precinct_tract_crosswalk'))
+        self.assertEqual(order.count('download_chicago_tracts'), 1)
+        # The crosswalk steps fork worker processes
+        self.assertEqual(sorted(name for name in order
+                if build.steps[name].exclusive),
+            ['generate_chicago_precinct_tract_crosswalk',
+             'generate_suburban_cook_precinct_tract_crosswalk'])
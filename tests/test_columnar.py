@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipIf
+
+from chicago import PRECINCTS, TRACTS
+from chicago.precincts import PrecinctCollection
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class ImportTestCase(TestCase):
+    def test_not_imported(self):
+        # pyarrow and pandas take longer to import than the package
+        output = subprocess.check_output([sys.executable, '-c',
+            'import sys, chicago; '
+            'print(sorted(set(["pyarrow", "pandas"]) & set(sys.modules)))'])
+        self.assertEqual(output.decode('utf-8').strip(), '[]')
+
+
+@skipIf(pyarrow is None, "pyarrow isn't installed")
+class ArrowTestCase(TestCase):
+    def test_to_arrow(self):
+        table = PRECINCTS.to_arrow()
+        self.assertEqual(table.num_rows, len(PRECINCTS))
+        self.assertEqual(table.column_names, PRECINCTS.get_model().fields)
+        self.assertTrue(pyarrow.types.is_dictionary(
+            table.schema.field('ward').type))
+        self.assertFalse(pyarrow.types.is_dictionary(
+            table.schema.field('full_name').type))
+        self.assertEqual(table.column('full_name')[0].as_py(),
+            PRECINCTS[0].full_name)
+        self.assertEqual(table.column('ward')[0].as_py(), PRECINCTS[0].ward)
+
+    def test_unique_interned_fields(self):
+        table = TRACTS.to_arrow()
+        self.assertTrue(pyarrow.types.is_dictionary(
+            table.schema.field('countyfp').type))
+        # Interned to share them with the precincts, but every one is unique
+        for field in ('geoid', 'name'):
+            self.assertEqual(table.schema.field(field).type, pyarrow.string())
+
+    def test_table_to_arrow(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'precincts.table')
+            PRECINCTS.to_table(path)
+            precincts = PrecinctCollection().from_table(path)
+            table = precincts.to_arrow()
+            self.assertTrue(table.equals(PRECINCTS.to_arrow()))
+            self.assertTrue(pyarrow.types.is_dictionary(
+                table.schema.field('ward').type))
+            # Only the ward numbers are in the dictionary
+            self.assertEqual(len(table.column('ward').chunk(0).dictionary),
+                50)
+            del table
+            precincts._backend.table.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+@skipIf(pandas is None, "pandas isn't installed")
+class DataFrameTestCase(TestCase):
+    def test_to_dataframe(self):
+        df = TRACTS.to_dataframe()
+        self.assertEqual(len(df), len(TRACTS))
+        self.assertEqual(list(df.columns), TRACTS.get_model().fields)
+        self.assertEqual(str(df['countyfp'].dtype), 'category')
+        # Tract GEOIDs and names are interned, but unique
+        self.assertNotEqual(str(df['geoid'].dtype), 'category')
+        self.assertNotEqual(str(df['name'].dtype), 'category')
+        self.assertEqual(df['geoid'][0], TRACTS[0].geoid)
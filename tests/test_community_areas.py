@@ -15,6 +15,11 @@ class CommunityAreaTestCase(TestCase):
         self.assertEqual(ca.name, "Logan Square")
         self.assertEqual(ca.number, "22")
 
+    def test_get_by_number_missing(self):
+        self.assertRaises(KeyError, COMMUNITY_AREAS.get_by_number, 78)
+        self.assertRaises(KeyError, COMMUNITY_AREAS.get_by_number, 'x')
+        self.assertRaises(KeyError, COMMUNITY_AREAS.get_by_number, -1)
+
     def test_iter(self):
         filtered = [ca for ca in COMMUNITY_AREAS
                     if ca.name == "Logan Square"]
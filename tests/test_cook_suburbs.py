@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from chicago.cook_suburbs.precincts import (COOK_SUBURBAN_CROSSWALK,
+    COOK_SUBURBAN_PRECINCTS, get_suburban_cook_precincts_from_tract_geoid,
+    get_suburban_cook_tract_from_precinct_number)
+
+
+class CookSuburbanPrecinctTestCase(TestCase):
+    def test_get_by_precinct_id(self):
+        precinct = COOK_SUBURBAN_PRECINCTS.get_by_precinct_id(7000003)
+        self.assertEqual(precinct.town, 'BARRINGTON')
+        self.assertEqual(precinct.objectid, '1')
+
+    def test_get_by_town_name(self):
+        precincts = COOK_SUBURBAN_PRECINCTS.get_by_town_name('Barrington')
+        self.assertTrue(len(precincts) > 1)
+        self.assertEqual(COOK_SUBURBAN_PRECINCTS.get_by_town_name('Nope'),
+            None)
+
+
+class CookSuburbanCrosswalkTestCase(TestCase):
+    def test_rows(self):
+        self.assertEqual(len(COOK_SUBURBAN_CROSSWALK), 1599)
+        self.assertEqual(COOK_SUBURBAN_CROSSWALK[0], {
+            'precinct_number': '7000003',
+            'precinct_objectid': '1',
+            'tract_geoid': '17031804202',
+        })
+
+    def test_slice(self):
+        self.assertEqual(COOK_SUBURBAN_CROSSWALK[:2],
+            [COOK_SUBURBAN_CROSSWALK[0], COOK_SUBURBAN_CROSSWALK[1]])
+        self.assertEqual(COOK_SUBURBAN_CROSSWALK[-1],
+            list(COOK_SUBURBAN_CROSSWALK)[-1])
+
+    def test_get_tract_from_precinct_number(self):
+        self.assertEqual(get_suburban_cook_tract_from_precinct_number(1),
+            '17031804202')
+        self.assertEqual(get_suburban_cook_tract_from_precinct_number(
+            '7000003', precinct_key='precinct_number'), '17031804202')
+        self.assertEqual(get_suburban_cook_tract_from_precinct_number('x'),
+            None)
+        # IDs match exactly, like they did when the rows were scanned
+        self.assertEqual(get_suburban_cook_tract_from_precinct_number('01'),
+            None)
+        self.assertEqual(get_suburban_cook_tract_from_precinct_number(1,
+            precinct_key='nope'), None)
+
+    def test_get_precincts_from_tract_geoid(self):
+        objectids = get_suburban_cook_precincts_from_tract_geoid(17031804202)
+        self.assertIn('1', objectids)
+        numbers = get_suburban_cook_precincts_from_tract_geoid(
+            '17031804202', precinct_key='precinct_number')
+        self.assertIn('7000003', numbers)
+        self.assertEqual(len(numbers), len(objectids))
+        self.assertEqual(get_suburban_cook_precincts_from_tract_geoid('1'),
+            [])
+        self.assertEqual(get_suburban_cook_precincts_from_tract_geoid(
+            '017031804202'), [])
+        self.assertEqual(get_suburban_cook_precincts_from_tract_geoid(
+            17031804202, precinct_key='nope'), [None] * len(objectids))
@@ -0,0 +1,159 @@
+import contextlib
+import io
+import json
+import os.path
+import shutil
+import tempfile
+import threading
+from unittest import TestCase, skipIf
+
+try:
+    import fabfile
+except ImportError:
+    fabfile = None
+
+try:
+    import shapely
+except ImportError:
+    shapely = None
+
+TRACT_PROPERTIES = (('GEOID', 'geoid'),)
+PRECINCT_PROPERTIES = (('idpct', 'precinct_number'),)
+CROSSWALK_TRACT_PROPERTIES = (('geoid', 'tract_geoid'),)
+
+
+def _square(x, y, size):
+    return {'type': 'Polygon', 'coordinates': [[[x, y], [x + size, y],
+        [x + size, y + size], [x, y + size], [x, y]]]}
+
+
+def _feature(geometry, **properties):
+    return {'type': 'Feature', 'properties': properties, 'geometry': geometry}
+
+
+def _write_features(path, features):
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+
+@skipIf(fabfile is None or shapely is None,
+    "The fabfile's requirements are not installed")
+class IncrementalCrosswalkTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tracts_path = self.path('tracts.geojson')
+        self.precincts_path = self.path('precincts.geojson')
+        self.dest = self.path('crosswalk.csv')
+        self.fingerprints_path = self.path('crosswalk.fingerprints.json')
+        # Tracts 1 to 4 in a 2x2 grid
+        _write_features(self.tracts_path, [
+            _feature(_square(x, y, 1), GEOID=str(1 + x + 2 * y))
+            for y in range(2) for x in range(2)])
+        self.precincts = [
+            _feature(_square(x + 0.1, y + 0.1, 0.2), idpct=str(i))
+            for i, (x, y) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1)])]
+        _write_features(self.precincts_path, self.precincts)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def generate(self, dest=None, fingerprints_path=True):
+        if fingerprints_path is True:
+            fingerprints_path = self.fingerprints_path
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fabfile._generate_precinct_tract_crosswalk(
+                self.tracts_path, self.precincts_path, dest or self.dest,
+                TRACT_PROPERTIES, PRECINCT_PROPERTIES,
+                CROSSWALK_TRACT_PROPERTIES, processes=1,
+                id_field='precinct_number',
+                fingerprints_path=fingerprints_path)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def assert_matches_full_run(self):
+        full_dest = self.path('full.csv')
+        self.generate(full_dest, fingerprints_path=None)
+        self.assertEqual(self.read(self.dest), self.read(full_dest))
+
+    def test_unchanged(self):
+        self.assertEqual(self.generate(), 4)
+        output = self.read(self.dest)
+        self.assertEqual(self.generate(), 0)
+        self.assertEqual(self.read(self.dest), output)
+
+    def test_changed_precincts(self):
+        self.generate()
+        old_rows = fabfile._read_csv_rows(self.dest)
+
+        # Redraw precinct 1 into tract 4, drop precinct 2 and add precinct 4
+        self.precincts[1]['geometry'] = _square(1.5, 1.5, 0.2)
+        del self.precincts[2]
+        self.precincts.append(_feature(_square(0.5, 1.5, 0.2), idpct='4'))
+        _write_features(self.precincts_path, self.precincts)
+
+        self.assertEqual(self.generate(), 2)
+        self.assert_matches_full_run()
+        self.assertEqual(fabfile._crosswalk_diff(old_rows,
+                fabfile._read_csv_rows(self.dest), 'precinct_number'), [
+            ('1', '2', '4'),
+            ('2', '3', None),
+            ('4', None, '3'),
+        ])
+
+    def test_tracts_changed(self):
+        self.generate()
+        _write_features(self.tracts_path, [
+            _feature(_square(0, 0, 2), GEOID='5')])
+        self.assertEqual(self.generate(), 4)
+        self.assert_matches_full_run()
+
+    def test_crosswalk_edited(self):
+        self.generate()
+        with open(self.dest, 'a') as f:
+            f.write('9,1\n')
+        self.assertEqual(self.generate(), 4)
+        self.assert_matches_full_run()
+
+    def test_concurrent_runs(self):
+        # A second crosswalk with different tracts and properties, like the
+        # Chicago and suburban crosswalks built side by side
+        other_tracts = self.path('other_tracts.geojson')
+        _write_features(other_tracts, [
+            _feature(_square(0, 0, 2), TRACTCE='5')])
+        # Enough precincts for several chunks
+        _write_features(self.precincts_path, [
+            _feature(_square(0.01 * (i % 190), 0.01 * (i // 190), 0.005),
+                idpct=str(i))
+            for i in range(500)])
+        errors = []
+
+        def generate(tracts_path, tract_properties, tract_columns, dest):
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for i in range(5):
+                        fabfile._generate_precinct_tract_crosswalk(
+                            tracts_path, self.precincts_path, dest,
+                            tract_properties, PRECINCT_PROPERTIES,
+                            tract_columns, processes=1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=generate, args=(self.tracts_path,
+                TRACT_PROPERTIES, CROSSWALK_TRACT_PROPERTIES, self.dest)),
+            threading.Thread(target=generate, args=(other_tracts,
+                (('TRACTCE', 'tractce'),), (('tractce', 'tract_geoid'),),
+                self.path('other.csv'))),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(set(row['tract_geoid'] for row in
+            fabfile._read_csv_rows(self.path('other.csv'))), set(['5']))
@@ -0,0 +1,124 @@
+import os.path
+import shutil
+import tempfile
+import threading
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    ThreadingHTTPServer = None
+
+try:
+    import fabfile
+except ImportError:
+    fabfile = None
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    Serve ``server.files``, a dict of paths to ``(body, etag)`` pairs, with
+    conditional and range requests.  If ``server.truncate`` is set, full
+    responses are cut off half way through.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        try:
+            body, etag = self.server.files[self.path]
+        except KeyError:
+            self.send_error(404)
+            return
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == etag:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            if start >= len(body):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start,
+                len(body) - 1, len(body)))
+            body = body[start:]
+        else:
+            self.send_response(200)
+
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.server.truncate:
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@skipIf(fabfile is None or ThreadingHTTPServer is None,
+    "The fabfile's requirements are not installed")
+class DownloadFileTestCase(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FileHandler)
+        self.server.files = {
+            '/tracts.zip': (os.urandom(64 * 1024), '"v1"'),
+        }
+        self.server.requests = []
+        self.server.truncate = False
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.directory = tempfile.mkdtemp()
+        self.dest = os.path.join(self.directory, 'tracts.zip')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def url(self):
+        return 'http://127.0.0.1:{}/tracts.zip'.format(self.server.server_port)
+
+    def read_dest(self):
+        with open(self.dest, 'rb') as f:
+            return f.read()
+
+    def test_download(self):
+        self.assertTrue(fabfile._download_file(self.url(), self.dest))
+        self.assertEqual(self.read_dest(), self.server.files['/tracts.zip'][0])
+        self.assertFalse(os.path.exists(self.dest + '.part'))
+
+    def test_not_modified(self):
+        fabfile._download_file(self.url(), self.dest)
+        self.assertFalse(fabfile._download_file(self.url(), self.dest))
+        self.assertEqual(self.server.requests[-1].get('If-None-Match'), '"v1"')
+        self.assertEqual(self.read_dest(), self.server.files['/tracts.zip'][0])
+
+        self.server.files['/tracts.zip'] = (b'changed', '"v2"')
+        self.assertTrue(fabfile._download_file(self.url(), self.dest))
+        self.assertEqual(self.read_dest(), b'changed')
+
+    @patch.object(fabfile, 'DOWNLOAD_CHUNK_SIZE', 1024)
+    def test_resume(self):
+        self.server.truncate = True
+        with self.assertRaises(Exception):
+            fabfile._download_file(self.url(), self.dest)
+        self.assertFalse(os.path.exists(self.dest))
+        partial_size = os.path.getsize(self.dest + '.part')
+        self.assertTrue(partial_size > 0)
+
+        self.server.truncate = False
+        self.assertTrue(fabfile._download_file(self.url(), self.dest))
+        self.assertEqual(self.server.requests[-1].get('Range'),
+            'bytes={}-'.format(partial_size))
+        self.assertEqual(self.read_dest(), self.server.files['/tracts.zip'][0])
@@ -0,0 +1,151 @@
+import os.path
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from chicago import geocoder
+from chicago.base import LazyDataset
+from chicago.geometry import decode_layer, encode_features, read_geometry
+from chicago.spatial import STRtree
+
+
+def _square(min_lon, min_lat, size):
+    return [[min_lon, min_lat], [min_lon + size, min_lat],
+        [min_lon + size, min_lat + size], [min_lon, min_lat + size],
+        [min_lon, min_lat]]
+
+
+def _feature(feature_id, geometry_type, coordinates):
+    return {
+        'properties': {'id': feature_id},
+        'geometry': {'type': geometry_type, 'coordinates': coordinates},
+    }
+
+
+# A square with a square hole, a square next to it, and two separate squares
+# in one feature
+FEATURES = [
+    _feature('32', 'Polygon', [_square(-87.7, 41.8, 0.1),
+        _square(-87.68, 41.82, 0.02)]),
+    _feature('35', 'Polygon', [_square(-87.6, 41.8, 0.1)]),
+    _feature('8', 'MultiPolygon', [[_square(-87.7, 41.95, 0.05)],
+        [_square(-87.6, 41.95, 0.05)]]),
+]
+
+POINTS = [
+    ((41.85, -87.65), '32'),
+    ((41.83, -87.67), None),  # In the hole
+    ((41.85, -87.55), '35'),
+    ((41.97, -87.68), '8'),
+    ((41.97, -87.58), '8'),
+    ((41.97, -87.63), None),
+    ((40.0, -90.0), None),
+]
+
+
+class STRtreeTestCase(TestCase):
+    def test_query_point(self):
+        boxes = [(x, y, x + 1, y + 1) for x in range(20) for y in range(20)]
+        tree = STRtree(boxes, node_capacity=4)
+        self.assertEqual([boxes[i] for i in tree.query_point(5.5, 7.5)],
+            [(5, 7, 6, 8)])
+        self.assertEqual(len(tree.query_point(5, 7)), 4)
+        self.assertEqual(tree.query_point(-1, -1), [])
+        self.assertEqual(len(tree.query_box((2.5, 2.5, 4.5, 3.5))), 6)
+        self.assertEqual(STRtree([]).query_point(0, 0), [])
+
+
+class GeometryLayerTestCase(TestCase):
+    def setUp(self):
+        self.layer = decode_layer(encode_features(FEATURES, 'id'))
+
+    def test_locate(self):
+        self.assertEqual(len(self.layer), 3)
+        for (lat, lon), feature_id in POINTS:
+            self.assertEqual(self.layer.locate(lat, lon), feature_id)
+
+    def test_bounds(self):
+        bounds = self.layer.bounds(2)
+        self.assertAlmostEqual(bounds[0], -87.7)
+        self.assertAlmostEqual(bounds[3], 42.0)
+
+    def test_locate_many(self):
+        lats = [point[0][0] for point in POINTS]
+        lons = [point[0][1] for point in POINTS]
+        self.assertEqual(self.layer.locate_many(lats, lons),
+            [feature_id for point, feature_id in POINTS])
+        self.assertRaises(ValueError, self.layer.locate_many, lats, lons[:-1])
+
+    def test_locate_many_without_numpy(self):
+        lats = [point[0][0] for point in POINTS]
+        lons = [point[0][1] for point in POINTS]
+        with patch('chicago.geometry.numpy', None):
+            self.assertEqual(self.layer.locate_many(lats, lons),
+                [feature_id for point, feature_id in POINTS])
+            self.assertRaises(ValueError, self.layer.locate_many, lats,
+                lons[:-1])
+
+    @skipIf(numpy is None, "NumPy is not installed")
+    def test_locate_many_numpy(self):
+        rng = numpy.random.RandomState(0)
+        lats = rng.uniform(41.75, 42.05, 2000)
+        lons = rng.uniform(-87.75, -87.45, 2000)
+        feature_ids = self.layer.locate_many(lats, lons)
+        self.assertIsInstance(feature_ids, numpy.ndarray)
+        self.assertEqual(feature_ids.tolist(), [self.layer.locate(lat, lon)
+            for lat, lon in zip(lats, lons)])
+
+
+class GeocoderTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'community_areas.geom'),
+                'wb') as f:
+            f.write(encode_features(FEATURES, 'id'))
+
+        patcher = patch.object(geocoder, 'GEOMETRY_DIRECTORY', self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(geocoder.GEOMETRIES, dict(
+            (layer, LazyDataset(lambda layer=layer:
+                geocoder.load_geometry(layer))) for layer in geocoder.LAYERS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_geometry(self):
+        layer = read_geometry(geocoder.get_geometry_filename('community_areas'))
+        self.assertEqual(layer.ids, ['32', '35', '8'])
+
+    def test_locate(self):
+        located = geocoder.locate(41.85, -87.65, 'community_areas')
+        self.assertEqual(located['community_areas'].name, 'Loop')
+        self.assertEqual(geocoder.locate(40.0, -90.0, ['community_areas']),
+            {'community_areas': None})
+
+    def test_locate_many(self):
+        names = geocoder.locate_many([41.85, 41.85, 40.0],
+            [-87.65, -87.55, -90.0], 'community_areas', attr='name',
+            missing='')
+        self.assertEqual(names, ['Loop', 'Douglas', ''])
+
+    def test_missing_geometry(self):
+        self.assertEqual(geocoder.available_layers(), ['community_areas'])
+        with self.assertRaisesRegex(IOError, 'fab build_geometries'):
+            geocoder.locate(41.85, -87.65, 'tracts')
+        with self.assertRaisesRegex(IOError, 'fab build_geometries'):
+            geocoder.locate(41.85, -87.65, ['community_areas', 'counties'])
+        with self.assertRaisesRegex(IOError, 'fab build_geometries'):
+            geocoder.locate_many([41.85], [-87.65], 'tracts')
+
+    def test_unknown_layer(self):
+        with self.assertRaises(ValueError):
+            geocoder.locate(41.85, -87.65, 'wards')
@@ -0,0 +1,68 @@
+import io
+import json
+from unittest import TestCase
+
+from chicago.geojson import FeatureWriter, iter_features
+
+FEATURES = [
+    {
+        'type': 'Feature',
+        'properties': {'GEOID': '17031010100', 'ALAND': 379950,
+            'NAME': 'Census Tract 101, "Rogers Park"'},
+        'geometry': {'type': 'Polygon', 'coordinates': [[[-87.6772, 42.0194],
+            [-87.6697, 42.0193], [-87.6693, 42.0128], [-87.6772, 42.0194]]]},
+    },
+    {
+        'type': 'Feature',
+        'properties': {'GEOID': '17031010201', 'ALAND': 1.5e-7, 'NAME': None},
+        'geometry': None,
+    },
+]
+
+
+class IterFeaturesTestCase(TestCase):
+    def read(self, text, chunk_size=5):
+        return list(iter_features(io.StringIO(text), chunk_size=chunk_size))
+
+    def test_iter_features(self):
+        text = json.dumps({'type': 'FeatureCollection', 'features': FEATURES})
+        # Small chunks split keys, strings and numbers between reads
+        for chunk_size in (1, 3, 7, 64, 1 << 16):
+            self.assertEqual(self.read(text, chunk_size), FEATURES)
+
+    def test_member_order(self):
+        text = json.dumps({'features': FEATURES, 'crs': {'type': 'name',
+            'properties': {'name': 'EPSG:4326'}}, 'bbox': [1, 2, 3, 4.5],
+            'type': 'FeatureCollection'}, indent=2)
+        self.assertEqual(self.read(text), FEATURES)
+
+    def test_empty(self):
+        self.assertEqual(self.read('{}'), [])
+        self.assertEqual(self.read(
+            '{"type": "FeatureCollection", "features": [ ]}'), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.read('[]')
+        with self.assertRaises(ValueError):
+            self.read('{"features": [{"type": "Feature"} {}]}')
+        with self.assertRaises(ValueError):
+            self.read('{"features": [{"type": "Feature"')
+
+
+class FeatureWriterTestCase(TestCase):
+    def test_write(self):
+        out = io.StringIO()
+        with FeatureWriter(out) as writer:
+            for feature in FEATURES:
+                writer.write(feature)
+        self.assertEqual(out.getvalue(), json.dumps({
+            'type': 'FeatureCollection', 'features': FEATURES}))
+        self.assertEqual(list(iter_features(io.StringIO(out.getvalue()))),
+            FEATURES)
+
+    def test_write_empty(self):
+        out = io.StringIO()
+        FeatureWriter(out).close()
+        self.assertEqual(out.getvalue(), json.dumps({
+            'type': 'FeatureCollection', 'features': []}))
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from chicago import (COMMUNITY_AREAS, COOK_SUBURBAN_PRECINCTS, COUNTIES,
+    PRECINCTS, TRACTS, ancestors, descendants, get_rollup)
+from chicago.hierarchy import GeographyHierarchy
+from chicago.community_areas import CommunityArea
+from chicago.illinois.counties import County
+from chicago.precincts import Precinct
+from chicago.tracts import Tract
+
+
+class HierarchyTestCase(TestCase):
+    def test_ancestors(self):
+        precinct = PRECINCTS.get_by_full_name('39012')
+        tract = TRACTS.get_by_geoid('17031140302')
+        cook = COUNTIES.get_by_fips('031')
+        albany_park = COMMUNITY_AREAS.get_by_number(14)
+        self.assertEqual(ancestors(precinct), [tract, albany_park, cook])
+        self.assertEqual(ancestors(('precinct', 39012), 'county'), [cook])
+        self.assertEqual(ancestors(albany_park), [cook])
+        self.assertEqual(ancestors(cook), [])
+
+    def test_suburban_ancestors(self):
+        precinct = COOK_SUBURBAN_PRECINCTS.get_by_precinct_id('7000003')
+        tract, county = ancestors(precinct)
+        self.assertIsInstance(tract, Tract)
+        self.assertEqual(tract.countyfp, '031')
+        self.assertEqual(tract.commarea_num, None)
+        self.assertEqual(county.countyname, 'Cook')
+
+    def test_descendants(self):
+        precincts = descendants(('community_area', 14), level='precinct')
+        self.assertTrue(precincts)
+        for precinct in precincts:
+            self.assertIsInstance(precinct, Precinct)
+            self.assertIn(COMMUNITY_AREAS.get_by_number(14),
+                ancestors(precinct))
+
+        cook = COUNTIES.get_by_fips(31)
+        self.assertEqual(len(descendants(cook, 'community_area')), 77)
+        self.assertEqual(len(descendants(cook, 'suburban_precinct')),
+            len(COOK_SUBURBAN_PRECINCTS))
+        self.assertEqual(descendants(('county', '001')), [])
+
+    def test_rollup(self):
+        rollup = get_rollup('precinct', 'community_area')
+        self.assertEqual(rollup['39012'], ('14',))
+        self.assertIs(get_rollup('precinct', 'community_area'), rollup)
+        self.assertEqual(len(rollup), len(PRECINCTS))
+        self.assertEqual(get_rollup('suburban_precinct', 'county')['7000003'],
+            ('031',))
+
+    def test_unknown(self):
+        self.assertRaises(KeyError, ancestors, ('precinct', 99999))
+        self.assertRaises(KeyError, ancestors, ('tract', 'x'))
+        self.assertRaises(ValueError, ancestors, ('ward', 1))
+        self.assertRaises(ValueError, descendants, ('county', 31), 'ward')
+        self.assertRaises(TypeError, ancestors, 'precinct')
+
+    def test_build(self):
+        hierarchy = GeographyHierarchy()
+        hierarchy.add('county', County(countyfp='031'))
+        hierarchy.add('community_area', CommunityArea(number='1'),
+            [('county', 31)])
+        hierarchy.add('tract', Tract(geoid='17031010100'),
+            [('community_area', 1)])
+        hierarchy.build()
+        self.assertEqual([c.countyfp for c in hierarchy.ancestors(
+            ('tract', '17031010100'), 'county')], ['031'])
+
+        hierarchy.add('tract', Tract(geoid='17031010200'),
+            [('community_area', 2)])
+        self.assertRaises(ValueError, hierarchy.build)
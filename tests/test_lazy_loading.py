@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import chicago
+from chicago.base import LazyDataset
+
+
+class LazyDatasetTestCase(TestCase):
+    def test_loads_on_first_use(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return ['a', 'b']
+
+        dataset = LazyDataset(loader, 'LETTERS')
+        self.assertFalse(dataset.loaded)
+        self.assertEqual(calls, [])
+
+        self.assertEqual(len(dataset), 2)
+        self.assertEqual(dataset[0], 'a')
+        self.assertEqual(list(dataset), ['a', 'b'])
+        self.assertTrue(dataset.loaded)
+        self.assertEqual(calls, [1])
+
+    def test_attribute_access(self):
+        dataset = LazyDataset(lambda: {'a': 1}, 'DICT')
+        self.assertEqual(dataset.get('a'), 1)
+
+
+class PreloadTestCase(TestCase):
+    def test_preload(self):
+        chicago.preload(['COUNTIES', 'community_areas'])
+        self.assertTrue(chicago.COUNTIES.loaded)
+        self.assertTrue(chicago.COMMUNITY_AREAS.loaded)
+
+    def test_preload_all(self):
+        chicago.preload()
+        for dataset in chicago.DATASETS.values():
+            self.assertTrue(dataset.loaded)
+
+    def test_preload_unknown(self):
+        self.assertRaises(ValueError, chicago.preload, ['NOPE'])
+
+
+class ImportTestCase(TestCase):
+    def test_numpy_not_imported(self):
+        # NumPy takes several times as long to import as the package
+        output = subprocess.check_output([sys.executable, '-c',
+            'import sys, chicago; '
+            'chicago.PRECINCTS.get_many_by("full_name", ["1001"]); '
+            'print("numpy" in sys.modules)'])
+        self.assertEqual(output.decode('utf-8').strip(), 'False')
@@ -0,0 +1,125 @@
+import os
+import random
+import shutil
+import tempfile
+from unittest import TestCase
+
+from chicago import COOK_SUBURBAN_PRECINCTS, NEIGHBORHOODS, PRECINCTS, TRACTS
+from chicago.base import ItemRange
+from chicago.cook_suburbs.precincts import (CookSuburbanPrecinct,
+    CookSuburbanPrecinctCollection)
+from chicago.tracts import Tract, TractCollection
+
+
+def _precincts(ids):
+    return [CookSuburbanPrecinct(town='TOWN', precinctid=str(precinctid),
+        objectid=str(i)) for i, precinctid in enumerate(ids)]
+
+
+class OrderingTestCase(TestCase):
+    def test_prefix(self):
+        tracts = TRACTS.filter_by_prefix('geoid', '17031')
+        self.assertIsInstance(tracts, ItemRange)
+        self.assertEqual(len(tracts), len(TRACTS))
+        self.assertEqual(len(TRACTS.filter_by_prefix('geoid', '17043')), 0)
+
+        geoids = [t.geoid for t in TRACTS.filter_by_prefix('geoid',
+            '170318')]
+        self.assertEqual(geoids, sorted(t.geoid for t in TRACTS
+            if t.geoid.startswith('170318')))
+
+    def test_int_prefix(self):
+        # Full names are zero-padded, so ward 2's start with '02'
+        for prefix in ('2', '02', '0', '390'):
+            full_names = [p.full_name for p in PRECINCTS.filter_by_prefix(
+                'full_name', prefix)]
+            self.assertEqual(full_names, [p.full_name for p in PRECINCTS
+                if p.full_name.startswith(prefix)])
+        self.assertEqual(list(PRECINCTS.filter_by_prefix('full_name', 'x')),
+            [])
+
+    def test_int_prefix_lengths(self):
+        collection = CookSuburbanPrecinctCollection(_precincts(
+            [1, 7, 9, 70, 71, 77, 80, 700, 779, 780, 7000]))
+        self.assertEqual([p.precinctid for p in collection.filter_by_prefix(
+            'precinctid', 7)], ['7', '70', '71', '77', '700', '779', '780',
+            '7000'])
+
+    def test_wards(self):
+        precincts = PRECINCTS.filter_by_wards(20, 29)
+        self.assertEqual([p.full_name for p in precincts],
+            [p.full_name for p in PRECINCTS if 20 <= int(p.ward) <= 29])
+        self.assertEqual(precincts[0].full_name, '20001')
+        self.assertEqual(set(p.ward for p in PRECINCTS.filter_by_wards(39)),
+            set(['39']))
+
+    def test_township(self):
+        precincts = COOK_SUBURBAN_PRECINCTS.filter_by_township(70)
+        self.assertTrue(precincts)
+        for precinct in precincts:
+            self.assertTrue(precinct.precinctid.startswith('70'))
+
+    def test_range(self):
+        names = [n.name for n in NEIGHBORHOODS.filter_by_range('name', 'A',
+            'B')]
+        self.assertEqual(names, sorted(n.name for n in NEIGHBORHOODS
+            if 'A' <= n.name <= 'B'))
+        self.assertEqual(len(TRACTS.filter_by_range('geoid')), len(TRACTS))
+        self.assertEqual(len(TRACTS.filter_by_range('geoid', 2, 1)), 0)
+        self.assertRaises(ValueError, TRACTS.filter_by_range, 'name')
+
+    def test_item_range(self):
+        precincts = PRECINCTS.filter_by_prefix('full_name', '2')
+        items = list(precincts)
+        self.assertEqual(precincts[-1], items[-1])
+        self.assertEqual(precincts[40:50], items[40:50])
+        self.assertRaises(IndexError, precincts.__getitem__, len(items))
+
+    def test_incremental_sort(self):
+        ids = [7000000 + i for i in range(500)]
+        shuffled = list(ids)
+        random.Random(0).shuffle(shuffled)
+
+        collection = CookSuburbanPrecinctCollection(_precincts(shuffled[:200]))
+        collection.add_items(_precincts(shuffled[200:210]))
+        collection.add_items(_precincts(shuffled[210:]))
+        collection.add_item(_precincts([6999999])[0])
+        self.assertEqual([int(p.precinctid) for p in collection],
+            [6999999] + ids)
+        self.assertEqual(list(collection._sort_keys), [6999999] + ids)
+        self.assertEqual(collection.get_by_precinct_id('7000123').precinctid,
+            '7000123')
+
+    def test_equal_keys_keep_order(self):
+        first = Tract(geoid='17031010100', name='first')
+        second = Tract(geoid='17031010100', name='second')
+        collection = TractCollection([first])
+        collection.add_items([second])
+        self.assertEqual([t.name for t in collection], ['first', 'second'])
+
+
+class BackendOrderingTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_table(self):
+        path = os.path.join(self.directory, 'tracts.table')
+        TRACTS.to_table(path)
+        tracts = TractCollection().from_table(path)
+        self.assertEqual([t.geoid for t in tracts.filter_by_prefix('geoid',
+            '170318')], [t.geoid for t in TRACTS.filter_by_prefix('geoid',
+            '170318')])
+        self.assertEqual(len(tracts.filter_by_range('geoid', 17031010100,
+            17031020000)), len(TRACTS.filter_by_range('geoid', 17031010100,
+            17031020000)))
+
+    def test_sqlite(self):
+        path = os.path.join(self.directory, 'tracts.db')
+        TRACTS.to_sqlite(path)
+        tracts = TractCollection().from_sqlite(path)
+        self.assertEqual([t.geoid for t in tracts.filter_by_prefix('geoid',
+            '1703184')], [t.geoid for t in TRACTS.filter_by_prefix('geoid',
+            '1703184')])
@@ -0,0 +1,125 @@
+from unittest import TestCase, skipIf
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from chicago import (PRECINCTS, TRACTS, get_precincts_from_tract_geoid,
+    get_tract_from_precinct_id, get_tract_from_ward_and_precinct)
+from chicago.snapshot import shared_tables_enabled
+
+
+class PrecinctTestCase(TestCase):
+    def test_get_by_full_name(self):
+        precinct = PRECINCTS.get_by_full_name(39012)
+        self.assertEqual(precinct.ward, '39')
+        self.assertEqual(precinct.number, '12')
+
+    def test_get_precincts_from_tract_geoid(self):
+        precincts = get_precincts_from_tract_geoid(17031140302)
+        self.assertIn('39012', [p.full_name for p in precincts])
+        for precinct in precincts:
+            self.assertEqual(precinct.census_tract_geoid, '17031140302')
+        self.assertEqual(precincts, sorted(precincts,
+            key=lambda p: int(p.full_name)))
+
+        self.assertEqual(get_precincts_from_tract_geoid('nope'), [])
+
+    def test_get_tract_from_precinct_id(self):
+        tract = get_tract_from_precinct_id('39012')
+        self.assertEqual(tract.geoid, '17031140302')
+        self.assertEqual(get_tract_from_precinct_id('99999'), None)
+
+    def test_get_tract_from_ward_and_precinct(self):
+        tract = get_tract_from_ward_and_precinct(39, 12)
+        self.assertEqual(tract.geoid, '17031140302')
+        self.assertEqual(get_tract_from_ward_and_precinct('39', '012'), tract)
+        self.assertEqual(get_tract_from_ward_and_precinct(39, 1012), None)
+        self.assertEqual(get_tract_from_ward_and_precinct('x', 12), None)
+
+    def test_pack_ward_precinct(self):
+        from chicago.precincts import pack_ward_precinct
+
+        self.assertEqual(pack_ward_precinct(1, 1), 1001)
+        self.assertEqual(pack_ward_precinct('39', '012'), 39012)
+        self.assertRaises(ValueError, pack_ward_precinct, 1, 1000)
+        precinct = PRECINCTS.get_by_full_name(pack_ward_precinct(1, 1))
+        self.assertEqual(precinct.full_name, '01001')
+
+
+class ChicagoCrosswalkTestCase(TestCase):
+    def test_deduplicated(self):
+        geoids = [tract.geoid for tract in TRACTS]
+        self.assertEqual(len(geoids), len(set(geoids)))
+        self.assertEqual(len(PRECINCTS), 2069)
+
+    def test_shared_objects(self):
+        precinct = PRECINCTS.get_by_full_name('39012')
+        tract = get_tract_from_precinct_id('39012')
+        self.assertEqual(tract, TRACTS.get_by_geoid(tract.geoid))
+        self.assertEqual(precinct.census_tract_geoid, tract.geoid)
+
+    @skipIf(shared_tables_enabled(),
+        "Shared tables return a new view from each lookup")
+    def test_shared_identity(self):
+        precinct = PRECINCTS.get_by_full_name('39012')
+        tract = get_tract_from_precinct_id('39012')
+        self.assertTrue(tract is TRACTS.get_by_geoid(tract.geoid))
+        self.assertTrue(precinct.census_tract_geoid is tract.geoid)
+
+
+class CollectionIndexTestCase(TestCase):
+    def test_get_by(self):
+        tract = TRACTS.get_by('geoid', 17031140302)
+        self.assertEqual(tract.geoid, '17031140302')
+        self.assertRaises(KeyError, TRACTS.get_by, 'geoid', 'nope')
+        self.assertEqual(TRACTS.get_by('geoid', 'nope', None), None)
+
+    def test_filter_by(self):
+        precincts = PRECINCTS.filter_by('full_name', '39012')
+        self.assertEqual(len(precincts), 1)
+        self.assertEqual(PRECINCTS.filter_by('full_name', 'nope'), [])
+
+    def test_unindexed_field(self):
+        self.assertRaises(ValueError, PRECINCTS.get_by, 'ward', '39')
+
+
+class BatchLookupTestCase(TestCase):
+    def test_get_many_by(self):
+        precincts = PRECINCTS.get_many_by('full_name', ['39012', 'nope'])
+        self.assertEqual(precincts[0].ward, '39')
+        self.assertEqual(precincts[1], None)
+
+        geoids = PRECINCTS.get_many_by('full_name', ['39012', 'nope'],
+            attr='census_tract_geoid', missing='')
+        self.assertEqual(geoids, ['17031140302', ''])
+
+        self.assertRaises(KeyError, PRECINCTS.get_many_by, 'full_name',
+            ['39012', 'nope'], errors='raise')
+
+    def test_get_tracts_from_precinct_ids(self):
+        from chicago import get_tracts_from_precinct_ids
+
+        self.assertEqual(get_tracts_from_precinct_ids(['39012', 'nope'],
+            attr='geoid'), ['17031140302', None])
+
+    def test_get_tracts_from_wards_and_precincts(self):
+        from chicago import get_tracts_from_wards_and_precincts
+
+        geoids, commarea_nums = get_tracts_from_wards_and_precincts(
+            iter([39, 99]), (12, 1), attr=('geoid', 'commarea_num'))
+        self.assertEqual(geoids, ['17031140302', None])
+        self.assertEqual(commarea_nums, ['14', None])
+
+        self.assertRaises(ValueError, get_tracts_from_wards_and_precincts,
+            [39], [12, 13])
+
+    @skipIf(numpy is None, "NumPy isn't installed")
+    def test_numpy_keys(self):
+        from chicago import get_tracts_from_wards_and_precincts
+
+        geoids = get_tracts_from_wards_and_precincts(numpy.array([39, 99]),
+            numpy.array([12, 1]), attr='geoid')
+        self.assertTrue(isinstance(geoids, numpy.ndarray))
+        self.assertEqual(geoids.tolist(), ['17031140302', None])
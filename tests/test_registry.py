@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import chicago
+from chicago import registry
+from chicago.backends import TableBackend
+from chicago.cook_suburbs.precincts import (COOK_SUBURBAN_PRECINCTS,
+    COOK_SUBURBAN_PRECINCT_CSV_FILENAME)
+from chicago.snapshot import load_table
+
+
+class RegistryTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Vintages are loaded from binary tables built in the snapshot
+        # directory
+        patcher = patch.dict(os.environ, {
+            'CHICAGO_SNAPSHOT_DIR': os.path.join(self.directory, 'snapshots'),
+            'CHICAGO_SNAPSHOTS': '1',
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._old_datasets = dict(registry._datasets)
+        self._old_files = dict(
+            registry.REGISTRY['cook_suburban_precincts'].files)
+
+        # A later vintage, with the towns renamed
+        self.path_2020 = os.path.join(self.directory, 'precincts_2020.csv')
+        with open(COOK_SUBURBAN_PRECINCT_CSV_FILENAME) as f_in:
+            with open(self.path_2020, 'w') as f_out:
+                for line in f_in:
+                    f_out.write(line.replace('BARRINGTON', 'BARRINGTON HILLS'))
+        chicago.register_vintage('cook_suburban_precincts', 2020,
+            self.path_2020)
+
+    def tearDown(self):
+        registry._datasets.clear()
+        registry._datasets.update(self._old_datasets)
+        registry.REGISTRY['cook_suburban_precincts'].files = self._old_files
+        shutil.rmtree(self.directory)
+
+    def test_vintages(self):
+        self.assertEqual(chicago.vintages('cook_suburban_precincts'),
+            [2016, 2020])
+        self.assertEqual(chicago.vintages('tracts'), [2010])
+        self.assertRaises(ValueError, chicago.vintages, 'nope')
+        self.assertRaises(ValueError, chicago.dataset,
+            'cook_suburban_precincts', 1999)
+
+    def test_dataset(self):
+        precincts = chicago.dataset('cook_suburban_precincts', vintage=2016)
+        self.assertFalse(precincts.loaded)
+        self.assertIs(chicago.dataset('cook_suburban_precincts'), precincts)
+
+        self.assertEqual(len(precincts), len(COOK_SUBURBAN_PRECINCTS))
+        self.assertIsInstance(precincts._backend, TableBackend)
+        self.assertEqual(precincts.get_by_precinct_id('7000003').town,
+            'BARRINGTON')
+        self.assertEqual([p.precinctid for p in precincts][:10],
+            [p.precinctid for p in COOK_SUBURBAN_PRECINCTS][:10])
+
+        later = chicago.dataset('cook_suburban_precincts', '2020')
+        self.assertEqual(later.get_by_precinct_id('7000003').town,
+            'BARRINGTON HILLS')
+        self.assertEqual(precincts.get_by_town_name('Barrington Hills'), None)
+
+    def test_tracts_and_precincts(self):
+        tracts = chicago.dataset('tracts', 2010)
+        self.assertEqual(len(tracts), len(chicago.TRACTS))
+        self.assertEqual(tracts.get_by_geoid('17031842400').commarea_num,
+            chicago.TRACTS.get_by_geoid('17031842400').commarea_num)
+        precincts = chicago.dataset('precincts')
+        self.assertEqual(precincts.get_by_full_name(39012).ward, '39')
+
+    def test_table_cached(self):
+        registered = registry.REGISTRY['cook_suburban_precincts']
+        builds = []
+
+        def build(path):
+            builds.append(path)
+            return registered.collection_class().from_csv(path)
+
+        for i in range(2):
+            collection = load_table('test', self.path_2020,
+                registered.collection_class,
+                lambda: build(self.path_2020))
+            self.assertEqual(collection.get_by_precinct_id('7000003').town,
+                'BARRINGTON HILLS')
+        self.assertEqual(len(builds), 1)
+
+        # Changing the CSV rebuilds the table
+        with open(self.path_2020, 'a') as f:
+            f.write(',,,9999999,9999999,,,NEW,,,9999,,,\n')
+        collection = load_table('test', self.path_2020,
+            registered.collection_class, lambda: build(self.path_2020))
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(collection.get_by_precinct_id('9999999').town, 'NEW')
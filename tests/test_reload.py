@@ -0,0 +1,219 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from chicago import CHICAGO_CROSSWALK, PRECINCTS, TRACTS, load_together
+from chicago.base import LazyDataset
+from chicago.neighborhoods import NeighborhoodCollection
+from chicago.watch import DatasetWatcher
+
+HEADER = 'SEC_NEIGH,PRI_NEIGH,SHAPE_AREA,SHAPE_LEN\n'
+
+
+class TempDatasetMixin(object):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'neighborhoods.csv')
+        self.write(['Logan Square', 'Humboldt Park'])
+        self.dataset = LazyDataset(
+            lambda: NeighborhoodCollection().from_csv(self.path),
+            'NEIGHBORHOODS', sources=[self.path])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, names):
+        with open(self.path, 'w') as f:
+            f.write(HEADER)
+            for name in names:
+                f.write('X,{},0,0\n'.format(name))
+
+
+class ReloadTestCase(TempDatasetMixin, TestCase):
+    def test_reload(self):
+        old = self.dataset.load()
+        self.write(['Logan Square', 'Humboldt Park', 'Pilsen'])
+        new = self.dataset.reload()
+
+        self.assertIs(self.dataset.load(), new)
+        self.assertEqual(len(self.dataset), 3)
+        self.assertEqual(self.dataset.get_by_name('pilsen').name, 'Pilsen')
+        self.assertEqual(self.dataset.search('pilsn')[0].name, 'Pilsen')
+        # Readers holding the old copy aren't affected
+        self.assertEqual(len(old), 2)
+        self.assertEqual(old.get_by_name('pilsen'), None)
+
+    def test_failed_reload(self):
+        old = self.dataset.load()
+        calls = []
+        self.dataset.on_reload(lambda dataset, error: calls.append(error))
+        os.remove(self.path)
+
+        self.assertRaises(IOError, self.dataset.reload)
+        self.assertIs(self.dataset.load(), old)
+        self.assertIsInstance(calls[0], IOError)
+
+        self.write(['Pilsen'])
+        self.dataset.reload()
+        self.assertEqual(calls[1], None)
+
+    def test_background_reload(self):
+        self.dataset.load()
+        self.write(['Pilsen'])
+        thread = self.dataset.reload(background=True)
+        thread.join()
+        self.assertEqual([n.name for n in self.dataset], ['Pilsen'])
+
+    def test_background_error(self):
+        self.dataset.load()
+        os.remove(self.path)
+        reported = []
+        with patch.object(threading, 'excepthook',
+                lambda args: reported.append(args.exc_type)):
+            self.dataset.reload(background=True).join()
+        # Without callbacks, the error is reported rather than dropped
+        self.assertEqual(reported, [FileNotFoundError])
+
+    def test_consistent_reads(self):
+        self.dataset.load()
+        small = ['Pilsen']
+        large = ['Logan Square', 'Humboldt Park', 'Pilsen', 'Uptown']
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                collection = self.dataset.load()
+                if len(list(collection)) != len(collection):
+                    errors.append(len(collection))
+
+        readers = [threading.Thread(target=read) for i in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(20):
+            self.write(large if i % 2 else small)
+            self.dataset.reload()
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_dependents(self):
+        precincts = PRECINCTS.load()
+        tracts = TRACTS.load()
+        CHICAGO_CROSSWALK.reload()
+        self.assertIsNot(PRECINCTS.load(), precincts)
+        self.assertIsNot(TRACTS.load(), tracts)
+        self.assertEqual(len(PRECINCTS), len(precincts))
+        crosswalk, precincts = load_together(CHICAGO_CROSSWALK, PRECINCTS)
+        self.assertIs(precincts, crosswalk.precincts)
+
+
+class CascadeTestCase(TestCase):
+    def setUp(self):
+        # B is built from A, and C from both A and B
+        self.version = 0
+        self.builds = []
+        self.a = LazyDataset(self.build_a, 'A')
+        self.b = LazyDataset(lambda: {'a': self.a.load()}, 'B')
+        self.c = LazyDataset(self.build_c, 'C')
+        self.a.add_dependent(self.b)
+        self.a.add_dependent(self.c)
+        self.b.add_dependent(self.c)
+
+    def build_a(self):
+        if self.version < 0:
+            raise ValueError("Bad version")
+        return {'version': self.version}
+
+    def build_c(self):
+        self.builds.append(self.version)
+        return {'a': self.a.load(), 'b': self.b.load()}
+
+    def test_reload_once(self):
+        self.c.load()
+        self.version = 1
+        self.a.reload()
+        # C is only rebuilt once, from the new copies of A and B
+        self.assertEqual(self.builds, [0, 1])
+        a, b, c = load_together(self.a, self.b, self.c)
+        self.assertEqual(a['version'], 1)
+        self.assertIs(b['a'], a)
+        self.assertIs(c['a'], a)
+        self.assertIs(c['b'], b)
+
+    def test_unloaded_dependents(self):
+        self.a.load()
+        self.a.reload()
+        self.assertFalse(self.b.loaded)
+        self.assertFalse(self.c.loaded)
+
+    def test_failed_reload(self):
+        old = load_together(self.a, self.b, self.c)
+        errors = []
+        self.a.on_reload(lambda dataset, error: errors.append(error))
+        self.version = -1
+        self.assertRaises(ValueError, self.a.reload)
+        for new, old_obj in zip(load_together(self.a, self.b, self.c), old):
+            self.assertIs(new, old_obj)
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_published_together(self):
+        self.c.load()
+        stop = threading.Event()
+        mismatches = []
+
+        def read():
+            while not stop.is_set():
+                a, b, c = load_together(self.a, self.b, self.c)
+                if b['a'] is not a or c['b'] is not b:
+                    mismatches.append(a['version'])
+
+        readers = [threading.Thread(target=read) for i in range(4)]
+        for reader in readers:
+            reader.start()
+        for version in range(1, 50):
+            self.version = version
+            self.a.reload()
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(mismatches, [])
+
+
+class DatasetWatcherTestCase(TempDatasetMixin, TestCase):
+    def test_check(self):
+        calls = []
+        watcher = DatasetWatcher([self.dataset],
+            callback=lambda dataset, error: calls.append(error))
+        self.assertEqual(watcher.check(), [])
+
+        # Not loaded yet, so there's nothing to reload
+        self.write(['Pilsen'])
+        watcher.check()
+        self.assertEqual(watcher.check(), [])
+        self.assertFalse(self.dataset.loaded)
+
+        self.dataset.load()
+        self.write(['Pilsen', 'Uptown'])
+        # Waits for the file to stop changing
+        self.assertEqual(watcher.check(), [])
+        self.assertEqual(watcher.check(), [self.dataset])
+        self.assertEqual(len(self.dataset), 2)
+        self.assertEqual(calls, [None])
+        self.assertEqual(watcher.check(), [])
+
+    def test_start(self):
+        reloaded = threading.Event()
+        self.dataset.load()
+        watcher = DatasetWatcher([self.dataset], interval=0.01,
+            callback=lambda dataset, error: reloaded.set()).start()
+        try:
+            self.write(['Pilsen'])
+            self.assertTrue(reloaded.wait(10))
+            self.assertEqual(len(self.dataset), 1)
+        finally:
+            watcher.stop()
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+import chicago
+from chicago import (COMMUNITY_AREAS, COOK_SUBURBAN_PRECINCTS, COUNTIES,
+    NEIGHBORHOODS)
+from chicago.search import NameIndex, normalize
+
+
+class NameIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = NameIndex((name, i) for i, name in enumerate(
+            ['Logan Square', 'Lincoln Square', 'Humboldt Park', 'Grant Park',
+             'Humboldt Park']))
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  O'Hare -- Airport "), 'o hare airport')
+
+    def test_exact(self):
+        match = self.index.search('humboldt park')[0]
+        self.assertEqual(match.name, 'Humboldt Park')
+        self.assertEqual(match.score, 1.0)
+        self.assertEqual(match.items, [2, 4])
+        self.assertEqual(match.item, 2)
+        self.assertEqual(len(self.index), 4)
+
+    def test_prefix(self):
+        # The query covers more of the shorter name
+        matches = self.index.search('sq')
+        self.assertEqual([m.name for m in matches][:2],
+            ['Logan Square', 'Lincoln Square'])
+        self.assertEqual(self.index.search('logan sq')[0].name, 'Logan Square')
+        self.assertGreater(self.index.search('logan squ')[0].score,
+            self.index.search('logan sq')[0].score)
+
+    def test_typos(self):
+        self.assertEqual(self.index.search('Humbolt Park')[0].name,
+            'Humboldt Park')
+        self.assertEqual(self.index.search('lgoan square')[0].name,
+            'Logan Square')
+
+    def test_limits(self):
+        self.assertEqual(len(self.index.search('park', limit=1)), 1)
+        self.assertEqual(self.index.search('zzzz'), [])
+        self.assertEqual(self.index.search(' '), [])
+        for match in self.index.search('park', min_score=0.7):
+            self.assertGreaterEqual(match.score, 0.7)
+
+
+class CollectionSearchTestCase(TestCase):
+    def test_collections(self):
+        self.assertEqual(NEIGHBORHOODS.search('Humbolt Park')[0].name,
+            'Humboldt Park')
+        self.assertEqual(COMMUNITY_AREAS.search('logan sq')[0].item.number,
+            '22')
+        self.assertEqual(COUNTIES.search('dupage')[0].name, 'DuPage')
+
+        barrington = COOK_SUBURBAN_PRECINCTS.search('barington')[0]
+        self.assertEqual(barrington.name, 'BARRINGTON')
+        self.assertEqual(len(barrington.items), len(
+            COOK_SUBURBAN_PRECINCTS.get_by_town_name('barrington')))
+
+        self.assertRaises(ValueError, chicago.TRACTS.search, 'x')
+
+    def test_get_by_name(self):
+        self.assertEqual(COMMUNITY_AREAS.get_by_name('logan square').number,
+            '22')
+        self.assertEqual(NEIGHBORHOODS.get_by_name('HUMBOLDT PARK').name,
+            'Humboldt Park')
+        self.assertEqual(NEIGHBORHOODS.get_by_name('Nowhere'), None)
+
+    def test_search_all(self):
+        matches = chicago.search('lincoln sq')
+        self.assertEqual(set(m.dataset for m in matches[:2]),
+            set(['COMMUNITY_AREAS', 'NEIGHBORHOODS']))
+        self.assertEqual(matches, sorted(matches, key=lambda m: -m.score))
+        self.assertEqual([m.dataset for m in chicago.search('cook',
+            datasets=['counties'])], ['COUNTIES'])
+        self.assertRaises(ValueError, chicago.search, 'x', ['nope'])
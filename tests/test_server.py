@@ -0,0 +1,167 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+from unittest import TestCase
+
+from chicago import COUNTIES
+from chicago.server import (LookupService, _refresh, bind, http_response,
+    start_server)
+
+
+class LookupServiceTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = LookupService(cache_size=2)
+        cls.count = cls.service.preserialize()
+
+    def get(self, path):
+        status, body = self.service.get(path)
+        return status, json.loads(body.decode('utf-8'))
+
+    def test_items(self):
+        self.assertEqual(self.get('/community_areas/22'),
+            (200, {'name': 'Logan Square', 'number': '22'}))
+        self.assertEqual(self.get('/counties/31')[1]['countyname'], 'Cook')
+        self.assertEqual(self.get('/neighborhoods/Humboldt%20Park')[1],
+            {'name': 'Humboldt Park'})
+        self.assertEqual(self.get('/precincts/39012')[1]['ward'], '39')
+        self.assertEqual(self.get('/cook_suburban_precincts/7000003')[1][
+            'town'], 'BARRINGTON')
+
+    def test_relations(self):
+        self.assertEqual(self.get('/precincts/39012/tract')[1]['geoid'],
+            '17031140302')
+        status, precincts = self.get('/tracts/17031140302/precincts')
+        self.assertIn('39012', [p['full_name'] for p in precincts])
+        self.assertEqual(self.get('/cook_suburban_precincts/7000003/tract'),
+            (200, {'tract_geoid': '17031804202'}))
+        status, precincts = self.get(
+            '/tracts/17031804202/cook_suburban_precincts')
+        self.assertIn('7000003', [p['precinctid'] for p in precincts])
+
+    def test_preserialized(self):
+        self.assertGreater(self.count, 5000)
+        self.assertIn('/precincts/39012/tract', self.service._preserialized)
+        self.assertIn('/counties/031', self.service._preserialized)
+
+    def test_errors(self):
+        self.assertEqual(self.get('/precincts/99999'),
+            (404, {'error': 'Not found', 'status': 404}))
+        self.assertEqual(self.get('/nope/1')[0], 404)
+        self.assertEqual(self.get('/precincts/x/tract')[0], 404)
+        self.assertEqual(self.get('/search')[0], 400)
+        self.assertEqual(self.service.respond('DELETE', '/precincts/1')[0],
+            405)
+
+    def test_cache(self):
+        for path in ('/precincts/01001?a', '/precincts/01001?b',
+                '/precincts/01001?c'):
+            self.service.get(path)
+        self.assertEqual(list(self.service._cache),
+            ['/precincts/01001?b', '/precincts/01001?c'])
+
+    def test_search(self):
+        status, matches = self.get('/search?q=logan+sq&limit=1')
+        self.assertEqual(matches[0]['name'], 'Logan Square')
+        self.assertEqual(matches[0]['dataset'], 'COMMUNITY_AREAS')
+
+    def test_batch(self):
+        status, body = self.service.respond('POST', '/batch',
+            b'["/counties/31", "/precincts/99999", "/community_areas/1"]')
+        self.assertEqual(status, 200)
+        results = json.loads(body.decode('utf-8'))
+        self.assertEqual(results[0]['countyname'], 'Cook')
+        self.assertEqual(results[1]['status'], 404)
+        self.assertEqual(results[2]['name'], 'Rogers Park')
+
+        status, body = self.service.respond('POST', '/batch',
+            b'{"paths": ["/counties/31"]}')
+        self.assertEqual(len(json.loads(body.decode('utf-8'))), 1)
+        self.assertEqual(self.service.batch(b'nope')[0], 400)
+        self.assertEqual(self.service.batch(b'[1]')[0], 400)
+        self.assertEqual(self.service.batch(json.dumps(
+            ['/counties/31'] * 1001).encode('utf-8'))[0], 413)
+
+    def test_refresh(self):
+        service = LookupService()
+        service.preserialize()
+        responses = service._preserialized
+        service.get('/precincts/01001?a')
+        callback = _refresh(service)
+
+        callback(COUNTIES, ValueError())
+        self.assertIs(service._preserialized, responses)
+        callback(COUNTIES, None)
+        self.assertIsNot(service._preserialized, responses)
+        self.assertEqual(len(service._preserialized), len(responses))
+        self.assertEqual(len(service._cache), 0)
+
+    def test_http_response(self):
+        self.assertEqual(http_response(200, b'{}', close=True),
+            b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            b'Content-Length: 2\r\nConnection: close\r\n\r\n{}')
+
+
+class ServerTestCase(TestCase):
+    def setUp(self):
+        self.service = LookupService()
+        self.sock = bind(port=0)
+        self.port = self.sock.getsockname()[1]
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(start_server(self.service,
+            self.sock))
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def test_keep_alive(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port,
+            timeout=10)
+        connection.request('GET', '/community_areas/22')
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'),
+            'application/json')
+        self.assertEqual(json.loads(response.read().decode('utf-8'))['name'],
+            'Logan Square')
+
+        # The same connection serves the next request
+        connection.request('POST', '/batch', body='["/precincts/39012"]')
+        response = connection.getresponse()
+        self.assertEqual(json.loads(response.read().decode('utf-8'))[0][
+            'full_name'], '39012')
+
+        connection.request('GET', '/precincts/99999')
+        response = connection.getresponse()
+        self.assertEqual(response.status, 404)
+        response.read()
+        connection.close()
+
+    def raw_request(self, head):
+        with socket.create_connection(('127.0.0.1', self.port),
+                timeout=10) as sock:
+            sock.sendall(head)
+            response = b''
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    return response
+                response += data
+
+    def test_content_length(self):
+        for length in (b'abc', b'-5'):
+            response = self.raw_request(b'POST /batch HTTP/1.1\r\n'
+                b'Content-Length: ' + length + b'\r\n\r\n')
+            self.assertTrue(response.startswith(b'HTTP/1.1 400 '), response)
+
+        response = self.raw_request(b'POST /batch HTTP/1.1\r\n'
+            b'Content-Length: 2000000\r\n\r\n')
+        self.assertTrue(response.startswith(b'HTTP/1.1 413 '), response)
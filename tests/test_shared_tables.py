@@ -0,0 +1,118 @@
+import gc
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+import chicago
+from chicago.community_areas import CommunityArea, load_community_areas
+from chicago.cook_suburbs.precincts import (CookSuburbanPrecinct,
+    CookSuburbanPrecinctCollection)
+
+SMAPS_ROLLUP = '/proc/self/smaps_rollup'
+
+
+def _private_dirty_kb():
+    """
+    Return this process's private dirty memory: pages it has written,
+    including the ones copied from its parent on write after a fork
+    """
+    with open(SMAPS_ROLLUP) as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1])
+    raise ValueError("No Private_Dirty in {}".format(SMAPS_ROLLUP))
+
+
+def _touch(collection):
+    for item in collection:
+        item.town, item.precinctid
+    for i in range(0, len(collection), 7):
+        collection.get_by_precinct_id(str(7000000 + i))
+
+
+def _worker_growth(collection, workers=4):
+    """
+    Fork ``workers`` processes that each read every item of ``collection``,
+    and return how much private memory each one gained, in KB
+    """
+    gc.collect()
+    children = []
+    for i in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                before = _private_dirty_kb()
+                _touch(collection)
+                os.write(write_fd, str(_private_dirty_kb() - before).encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    growth = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, 'rb') as f:
+            growth.append(int(f.read()))
+        os.waitpid(pid, 0)
+    return growth
+
+
+class SharedTablesTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = patch.dict(os.environ, {
+            'CHICAGO_SNAPSHOT_DIR': self.directory,
+            'CHICAGO_SNAPSHOTS': '1',
+            'CHICAGO_SHARED_TABLES': '1',
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_shared(self):
+        community_areas = load_community_areas()
+        self.assertEqual(community_areas._backend.__class__.__name__,
+            'TableBackend')
+        logan_square = community_areas.get_by_number(22)
+        self.assertIsInstance(logan_square, CommunityArea)
+        self.assertEqual(logan_square.name, 'Logan Square')
+        self.assertEqual(community_areas[21], logan_square)
+        self.assertNotEqual(community_areas[0], logan_square)
+        self.assertRaises(AttributeError, setattr, logan_square, 'name', 'x')
+
+        copy = pickle.loads(pickle.dumps(logan_square))
+        self.assertIs(type(copy), CommunityArea)
+        self.assertEqual(copy.name, 'Logan Square')
+
+        # Iterating matches the in-memory collection
+        self.assertEqual([ca.name for ca in community_areas],
+            [ca.name for ca in chicago.COMMUNITY_AREAS])
+
+    @skipIf(not hasattr(os, 'fork') or not os.path.exists(SMAPS_ROLLUP),
+        "Needs fork() and /proc/self/smaps_rollup")
+    def test_forked_workers_share_table(self):
+        models = CookSuburbanPrecinctCollection(
+            CookSuburbanPrecinct(town='TOWN {}'.format(i % 300),
+                precinctid=str(7000000 + i), objectid=str(i))
+            for i in range(50000))
+        path = os.path.join(self.directory, 'precincts.table')
+        models.to_table(path)
+
+        # Reading models in a worker writes their reference counts, which
+        # copies the pages they're on into the worker
+        model_growth = _worker_growth(models)
+        del models
+
+        # Reading a table only creates short-lived views
+        table = CookSuburbanPrecinctCollection().from_table(path)
+        table_growth = _worker_growth(table)
+
+        self.assertGreater(min(model_growth), 5000)
+        self.assertLess(max(table_growth), min(model_growth) / 3)
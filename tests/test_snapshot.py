@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from chicago import snapshot
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = patch.dict(os.environ, {
+            'CHICAGO_SNAPSHOT_DIR': self.directory,
+            'CHICAGO_SNAPSHOTS': '1',
+            'CHICAGO_SHARED_TABLES': '0',
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.source = os.path.join(self.directory, 'source.csv')
+        with open(self.source, 'w') as f:
+            f.write('a,b\n1,2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_snapshot(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {'built': len(builds)}
+
+        data = snapshot.load_snapshot('test', self.source, build)
+        self.assertEqual(data, {'built': 1})
+        self.assertTrue(os.path.exists(snapshot.get_snapshot_path('test')))
+
+        data = snapshot.load_snapshot('test', self.source, build)
+        self.assertEqual(data, {'built': 1})
+        self.assertEqual(len(builds), 1)
+
+    def test_stale_snapshot(self):
+        snapshot.write_snapshot('test', self.source, 'old')
+        self.assertEqual(snapshot.read_snapshot('test', self.source), 'old')
+
+        with open(self.source, 'w') as f:
+            f.write('a,b\n3,4\n')
+
+        self.assertEqual(snapshot.read_snapshot('test', self.source), None)
+        data = snapshot.load_snapshot('test', self.source, lambda: 'new')
+        self.assertEqual(data, 'new')
+
+    def test_collection_snapshot(self):
+        from chicago.community_areas import load_community_areas
+
+        load_community_areas()
+        community_areas = load_community_areas()
+        self.assertEqual(len(community_areas), 77)
+        self.assertEqual(community_areas[0].name, "Rogers Park")
+        self.assertEqual(community_areas.get_by_number(22).name,
+            "Logan Square")